@@ -1,26 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+import time
+from datetime import timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from .schemas import RegisterRequest, RegisterResponse, UserResponse, LoginRequest, LoginResponse, RefreshTokenRequest, RefreshTokenResponse
-from .database import get_db
-from .crud import create_user, authenticate_user
+from .schemas import RegisterRequest, RegisterResponse, UserResponse, LoginRequest, LoginResponse, RefreshTokenRequest, RefreshTokenResponse, BulkRegisterResponse, RevocationListResponse, RevokedFamily, ProgramStudentsResponse
+from .database import get_db, get_read_db
+from .crud import (
+    create_user_async, authenticate_user_async, get_user_by_registration_number, bulk_register_users,
+    start_token_family, rotate_token_family, revoke_token_family, list_revoked_families,
+    list_program_student_ids,
+)
 from .models import User
-from .backend_auth_utilities import decode_token, get_current_user, create_access_token, create_refresh_token  # you need JWT helper functions
+from .backend_auth_utilities import decode_token, get_user_by_id, create_access_token, create_refresh_token, require_admin, require_instructor, require_service, oauth2_scheme  # you need JWT helper functions
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+
+def _issue_tokens(db: Session, user: User):
+    """Start a new refresh-token family (one per login) and return (access, refresh)"""
+    family = start_token_family(db, user.id)
+    claims = {"sub": str(user.id), "role": user.role, "fam": family.id}
+    access_token = create_access_token(claims)
+    refresh_token = create_refresh_token({**claims, "jti": family.current_jti, "typ": "refresh"})
+    return access_token, refresh_token
+
+
 @router.post("/register", response_model=RegisterResponse)
-def register(user: RegisterRequest, db: Session = Depends(get_db)):
+async def register(user: RegisterRequest, db: Session = Depends(get_db)):
     # Check if email already exists
-    if db.query(User).filter(User.registrationNumber == user.registrationNumber).first():
+    if await run_in_threadpool(get_user_by_registration_number, db, user.registrationNumber):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # Create user in DB
-    new_user: User = create_user(db, user)
-
-    # Generate JWT tokens (replace with your JWT logic)
-    access_token = create_access_token({"sub": str(new_user.id)})
-    refresh_token = create_refresh_token({"sub": str(new_user.id)})
+    # Create user in DB (bcrypt runs in the hashing pool)
+    new_user: User = await create_user_async(db, user)
 
+    # built before _issue_tokens commits and expires the loaded attributes
     user_data = UserResponse(
         id=new_user.id,
         registrationNumber=new_user.registrationNumber,
@@ -31,6 +48,9 @@ def register(user: RegisterRequest, db: Session = Depends(get_db)):
         newsletter=new_user.newsletter
     )
 
+    # Generate JWT tokens
+    access_token, refresh_token = await run_in_threadpool(_issue_tokens, db, new_user)
+
     return RegisterResponse(
         access_token=access_token,
         refresh_token=refresh_token,
@@ -39,17 +59,32 @@ def register(user: RegisterRequest, db: Session = Depends(get_db)):
     )
     
     
+def _open_csv(file: UploadFile) -> csv.DictReader:
+    """Wrap the upload in a DictReader and read its header row (blocking file I/O)"""
+    rows = csv.DictReader(io.TextIOWrapper(file.file, encoding="utf-8-sig", newline=""))
+    if not rows.fieldnames or "registrationNumber" not in rows.fieldnames:
+        raise HTTPException(status_code=400, detail="CSV must have a header row with registrationNumber")
+    return rows
+
+
+@router.post("/register/bulk", response_model=BulkRegisterResponse,
+             dependencies=[Depends(require_admin)])
+async def bulk_register(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """
+    Register a cohort from a CSV upload with the columns
+    first_name,last_name,registrationNumber,password[,role,program,newsletter].
+    Returns per-row errors and import throughput.
+    """
+    rows = await run_in_threadpool(_open_csv, file)
+    return await bulk_register_users(db, rows)
+
+
 @router.post("/login", response_model=LoginResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    user = authenticate_user(db, data.registrationNumber, data.password)
+async def login(data: LoginRequest, db: Session = Depends(get_db)):
+    user = await authenticate_user_async(db, data.registrationNumber, data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
-    access_token = create_access_token({"sub": str(user.id),
-                                        "role": user.role})
-    refresh_token = create_refresh_token({"sub": str(user.id),
-                                          "role": user.role})
-
     user_data = UserResponse(
         id=user.id,
         registrationNumber=user.registrationNumber,
@@ -59,6 +94,8 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
         newsletter=user.newsletter
     )
 
+    access_token, refresh_token = await run_in_threadpool(_issue_tokens, db, user)
+
     return LoginResponse(
         access_token=access_token,
         refresh_token=refresh_token,
@@ -70,7 +107,9 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
 @router.post("/refresh", response_model=RefreshTokenResponse)
 def refresh_token(data: RefreshTokenRequest, db: Session = Depends(get_db)):
     """
-    Accepts a refresh token and returns a new access token.
+    Accepts a refresh token and returns a new access token and a rotated
+    refresh token. Reusing an already rotated refresh token revokes the
+    whole session.
     """
     try:
         # Decode refresh token
@@ -79,14 +118,63 @@ def refresh_token(data: RefreshTokenRequest, db: Session = Depends(get_db)):
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        # Verify user exists
-        user = db.query(get_current_user.__annotations__['return']).filter_by(id=user_id).first()
+        # Verify user exists (served from the user cache when warm)
+        user = get_user_by_id(db, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
+        claims = {"sub": str(user.id), "role": user.role}
+        new_refresh_token = None
+        family_id = payload.get("fam")
+        if family_id:
+            if payload.get("typ") != "refresh":
+                raise HTTPException(status_code=401, detail="Not a refresh token")
+            new_jti = rotate_token_family(db, family_id, payload.get("jti"))
+            if not new_jti:
+                raise HTTPException(status_code=401, detail="Refresh token reused")
+            claims["fam"] = family_id
+            new_refresh_token = create_refresh_token({**claims, "jti": new_jti, "typ": "refresh"})
+
         # Generate new access token
-        access_token = create_access_token({"sub": str(user.id)})
-        return RefreshTokenResponse(access_token=access_token, token_type="bearer")
+        access_token = create_access_token(claims)
+        return RefreshTokenResponse(access_token=access_token, token_type="bearer",
+                                    refresh_token=new_refresh_token)
     
     except Exception:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired refresh token")     
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired refresh token")
+
+
+@router.post("/logout")
+def logout(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """Revoke the caller's session: its refresh token and every access token issued from it"""
+    payload = decode_token(token)
+    family_id = payload.get("fam")
+    if family_id:
+        revoke_token_family(db, family_id)
+    return {"message": "Logged out successfully"}
+
+
+@router.get("/revocations", response_model=RevocationListResponse,
+            dependencies=[Depends(require_service)])
+def list_revocations(since: Optional[float] = None, db: Session = Depends(get_db)):
+    """
+    Revoked sessions that still have unexpired tokens, optionally only those
+    revoked after `since` (epoch seconds). Polled by the other services,
+    which authenticate with the shared SERVICE_TOKEN.
+    """
+    server_time = time.time()
+    families = list_revoked_families(db, since)
+    return RevocationListResponse(
+        revoked=[
+            RevokedFamily(family_id=f.id, expires_at=f.expires_at.replace(tzinfo=timezone.utc).timestamp())
+            for f in families
+        ],
+        server_time=server_time,
+    )
+
+
+@router.get("/programs/{program}/students", response_model=ProgramStudentsResponse,
+            dependencies=[Depends(require_instructor)])
+def list_program_students(program: str, db: Session = Depends(get_read_db)):
+    """Student ids of a program cohort; used by the course service for bulk enrollment"""
+    return ProgramStudentsResponse(program=program, student_ids=list_program_student_ids(db, program))
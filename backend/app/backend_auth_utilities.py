@@ -3,15 +3,24 @@ Authentication and Utility Functions for FastAPI Backend
 Handles JWT tokens, password hashing, and role-based permissions.
 """
 
+import asyncio
+import hmac
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, List
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
+from shared.revocation import revocations, SERVICE_TOKEN
+from shared.token_cache import VerifiedTokenCache
 from .models import User
 from .database import get_db
+from .user_cache import user_cache
 
 # ============================================================================
 # CONFIGURATION
@@ -40,6 +49,86 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify if plain password matches the hashed password"""
     return pwd_context.verify(plain_password, hashed_password)
 
+# ============================================================================
+# PASSWORD HASHING POOL
+# ============================================================================
+
+# bcrypt costs ~250 ms of CPU per call. Inside a sync route that holds a
+# Starlette threadpool slot for the whole time, so a login burst starves every
+# other route. The async helpers below run bcrypt in a process pool sized to
+# the machine and reject new work once the backlog is full, so overload shows
+# up as a fast 503 instead of a slow timeout.
+# HASH_POOL_WORKERS=0 falls back to the threadpool (the old behaviour).
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", os.cpu_count() or 1))
+HASH_POOL_MAX_PENDING = int(os.getenv("HASH_POOL_MAX_PENDING", max(HASH_POOL_WORKERS, 1) * 16))
+HASH_POOL_RETRY_AFTER_SECONDS = 1
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_pending_hash_jobs = 0
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    """Return the bcrypt process pool, creating it on first use"""
+    global _hash_pool
+    if _hash_pool is None:
+        # spawn, not fork: the parent is a running event loop with threads
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=HASH_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _hash_pool
+
+def shutdown_hash_pool() -> None:
+    """Stop the bcrypt workers (called on application shutdown)"""
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+async def _run_hash_job(fn, *args):
+    global _pending_hash_jobs
+    if _pending_hash_jobs >= HASH_POOL_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry shortly",
+            headers={"Retry-After": str(HASH_POOL_RETRY_AFTER_SECONDS)},
+        )
+    # only touched from the event loop thread, so no lock is needed
+    _pending_hash_jobs += 1
+    try:
+        return await _submit_hash_job(fn, *args)
+    finally:
+        _pending_hash_jobs -= 1
+
+async def _submit_hash_job(fn, *args):
+    if HASH_POOL_WORKERS <= 0:
+        return await run_in_threadpool(fn, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_pool(), fn, *args)
+
+def _hash_many(passwords: List[str]) -> List[str]:
+    return [hash_password(p) for p in passwords]
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the bcrypt pool without blocking the event loop"""
+    return await _run_hash_job(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the bcrypt pool without blocking the event loop"""
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+async def hash_passwords_async(passwords: List[str]) -> List[str]:
+    """
+    Hash a batch of passwords, split into one chunk per pool worker.
+    Used by bulk imports; bypasses the login backlog limit because it never
+    has more than one chunk per worker in flight.
+    """
+    if not passwords:
+        return []
+    chunk_size = -(-len(passwords) // max(HASH_POOL_WORKERS, 1))
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    results = await asyncio.gather(*(_submit_hash_job(_hash_many, chunk) for chunk in chunks))
+    return [hashed for chunk in results for hashed in chunk]
+
 # ============================================================================
 # JWT UTILITIES
 # ============================================================================
@@ -56,11 +145,17 @@ def create_refresh_token(data: dict) -> str:
     expire = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     return create_access_token(data, expires_delta=expire)
 
+# Verified claims are cached until the token's `exp` (see shared/token_cache.py)
+_token_cache = VerifiedTokenCache(SECRET_KEY, ALGORITHM)
+
 def decode_token(token: str) -> dict:
     """Decode and verify JWT token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        claims = _token_cache.decode(token)
+        if revocations.is_token_revoked(claims):
+            raise JWTError("Token has been revoked")
+        # copy so callers can't mutate the cached claims
+        return dict(claims)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -72,21 +167,33 @@ def decode_token(token: str) -> dict:
 # AUTHENTICATION DEPENDENCIES
 # ============================================================================
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Extract current user from JWT and fetch from database"""
-    payload = decode_token(token)
+def get_user_by_id(db: Session, user_id: str) -> Optional[User]:
+    """Return a user record, served from the in-process user cache when warm"""
+    user = user_cache.get(user_id)
+    if user is None:
+        db_user = db.query(User).filter(User.id == user_id).first()
+        if not db_user:
+            return None
+        user = user_cache.put(db_user)
+    return user
+
+def _user_from_payload(payload: dict, db: Session) -> User:
     user_id: str = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> User:
+    """Extract current user from JWT and fetch it (cached) from the database"""
+    return _user_from_payload(decode_token(token), db)
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Check if the current user is active (extendable in the future)"""
     return current_user
@@ -109,7 +216,18 @@ class RoleChecker:
     def __init__(self, allowed_roles: List[str]):
         self.allowed_roles = allowed_roles
 
-    def __call__(self, current_user: User = Depends(get_current_active_user)) -> User:
+    def __call__(self, token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+        payload = decode_token(token)
+        # The token's role claim is enough to turn a request away without
+        # looking the user up; an allowed claim is still checked against the
+        # (cached) user record so demotions take effect.
+        claimed_role = payload.get("role")
+        if claimed_role is not None and claimed_role not in self.allowed_roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions"
+            )
+        current_user = get_current_active_user(_user_from_payload(payload, db))
         if current_user.role not in self.allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -121,3 +239,23 @@ class RoleChecker:
 require_student = RoleChecker(["student"])
 require_instructor = RoleChecker(["instructor", "admin"])
 require_admin = RoleChecker(["admin"])
+
+# ============================================================================
+# SERVICE-TO-SERVICE ACCESS
+# ============================================================================
+
+def require_service(x_service_token: Optional[str] = Header(None)) -> None:
+    """
+    Dependency for routes only the other services may call: the request must
+    carry the shared SERVICE_TOKEN in the X-Service-Token header.
+    """
+    if not SERVICE_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service access is not configured (SERVICE_TOKEN is unset)"
+        )
+    if not x_service_token or not hmac.compare_digest(x_service_token, SERVICE_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid service token"
+        )
@@ -1,17 +1,28 @@
+import time
 import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from .models import User
-from .schemas import RegisterRequest
-from .backend_auth_utilities import hash_password, verify_password
+from shared.revocation import revocations
+from .models import User, RefreshTokenFamily
+from .schemas import RegisterRequest, BulkRegisterRow, BulkRegisterError, BulkRegisterResponse
+from .backend_auth_utilities import (
+    hash_password, verify_password, hash_password_async, verify_password_async, hash_passwords_async,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+)
 from fastapi import HTTPException as HttpException
+from fastapi.concurrency import run_in_threadpool
 
-def create_user(db: Session, user_data: RegisterRequest):
+def create_user(db: Session, user_data: RegisterRequest, hashed_password: Optional[str] = None):
     db_user = User(
         id=str(uuid.uuid4()),
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         registrationNumber=user_data.registrationNumber,
-        password=hash_password(user_data.password),
+        password=hashed_password or hash_password(user_data.password),
         role=user_data.role,
         newsletter=user_data.newsletter,
     )
@@ -21,10 +32,263 @@ def create_user(db: Session, user_data: RegisterRequest):
     return db_user
 
 
+def get_user_by_registration_number(db: Session, registrationNumber: str) -> Optional[User]:
+    return db.query(User).filter(User.registrationNumber == registrationNumber).first()
+
+
 def authenticate_user(db: Session, registrationNumber: str, password: str):
-    user = db.query(User).filter(User.registrationNumber == registrationNumber).first()
+    user = get_user_by_registration_number(db, registrationNumber)
     if not user:
         raise HttpException(status_code=400, detail="Invalid registration number or password")
     if not verify_password(password, user.password):
         raise HttpException(status_code=400, detail="Invalid registration number or password")
-    return user
\ No newline at end of file
+    return user
+
+
+# The auth service uses a sync Session; the async variants below hash in
+# the bcrypt pool and run each query and commit in the threadpool, so
+# neither blocks the event loop.
+
+async def create_user_async(db: Session, user_data: RegisterRequest):
+    hashed = await hash_password_async(user_data.password)
+    return await run_in_threadpool(create_user, db, user_data, hashed)
+
+
+async def authenticate_user_async(db: Session, registrationNumber: str, password: str):
+    user = await run_in_threadpool(get_user_by_registration_number, db, registrationNumber)
+    if not user:
+        raise HttpException(status_code=400, detail="Invalid registration number or password")
+    if not await verify_password_async(password, user.password):
+        raise HttpException(status_code=400, detail="Invalid registration number or password")
+    return user
+
+
+# -----------------------
+# REFRESH-TOKEN FAMILIES
+# -----------------------
+
+def _epoch(dt: datetime) -> float:
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def start_token_family(db: Session, user_id: str) -> RefreshTokenFamily:
+    now = datetime.utcnow()
+    family = RefreshTokenFamily(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        current_jti=str(uuid.uuid4()),
+        created_at=now,
+        expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(family)
+    db.commit()
+    return family
+
+
+def rotate_token_family(db: Session, family_id: str, presented_jti: Optional[str]) -> Optional[str]:
+    """
+    Replace the family's current refresh token with a new one in a single
+    UPDATE and return the new jti. Presenting any other (already rotated)
+    refresh token means it was replayed, so the whole family is revoked.
+    """
+    now = datetime.utcnow()
+    new_jti = str(uuid.uuid4())
+    updated = db.query(RefreshTokenFamily).filter(
+        RefreshTokenFamily.id == family_id,
+        RefreshTokenFamily.current_jti == presented_jti,
+        RefreshTokenFamily.revoked_at.is_(None),
+        RefreshTokenFamily.expires_at > now,
+    ).update(
+        {
+            RefreshTokenFamily.current_jti: new_jti,
+            RefreshTokenFamily.expires_at: now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    if updated:
+        return new_jti
+    revoke_token_family(db, family_id)
+    return None
+
+
+def revoke_token_family(db: Session, family_id: str) -> Optional[RefreshTokenFamily]:
+    family = db.query(RefreshTokenFamily).filter(RefreshTokenFamily.id == family_id).first()
+    if not family:
+        return None
+    if family.revoked_at is None:
+        family.revoked_at = datetime.utcnow()
+        db.commit()
+    # the auth service sees its own revocations immediately; other services
+    # pick them up from GET /auth/revocations
+    revocations.add(family.id, _epoch(family.expires_at))
+    return family
+
+
+def list_revoked_families(db: Session, since: Optional[float] = None) -> List[RefreshTokenFamily]:
+    """Revoked families whose tokens have not all expired yet, optionally revoked after `since`"""
+    query = db.query(RefreshTokenFamily).filter(
+        RefreshTokenFamily.revoked_at.isnot(None),
+        RefreshTokenFamily.expires_at > datetime.utcnow(),
+    )
+    if since is not None:
+        query = query.filter(
+            RefreshTokenFamily.revoked_at >= datetime.fromtimestamp(since, tz=timezone.utc).replace(tzinfo=None)
+        )
+    return query.all()
+
+
+def load_revocations(db: Session) -> int:
+    """Fill the in-process revocation filter from the database (on startup)"""
+    families = list_revoked_families(db)
+    revocations.add_many((family.id, _epoch(family.expires_at)) for family in families)
+    return len(families)
+
+
+# -----------------------
+# BULK (COHORT) REGISTRATION
+# -----------------------
+
+BULK_REGISTER_BATCH_SIZE = 500
+
+
+def list_program_student_ids(db: Session, program: str) -> List[str]:
+    """Ids of every student in `program`, from the users.program index"""
+    rows = db.query(User.id).filter(User.program == program, User.role == "student").order_by(User.id)
+    return [user_id for user_id, in rows]
+
+
+def _existing_registration_numbers(db: Session, numbers: List[str]) -> set:
+    rows = db.query(User.registrationNumber).filter(User.registrationNumber.in_(numbers)).all()
+    return {number for (number,) in rows}
+
+
+def _insert_users(db: Session, rows: List[dict]) -> bool:
+    """INSERT one batch and commit; False (rolled back) if a number is taken"""
+    try:
+        db.execute(insert(User), rows)
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+async def _insert_registration_batch(
+    db: Session, batch: List[Tuple[int, BulkRegisterRow]], errors: List[BulkRegisterError]
+) -> int:
+    """Insert one batch in a single transaction; returns the number of users created"""
+    existing = await run_in_threadpool(
+        _existing_registration_numbers, db, [row.registrationNumber for _, row in batch]
+    )
+    for attempt in range(2):
+        fresh = []
+        for line, row in batch:
+            if row.registrationNumber in existing:
+                errors.append(BulkRegisterError(
+                    row=line, registrationNumber=row.registrationNumber,
+                    detail="Registration number already registered",
+                ))
+            else:
+                fresh.append(row)
+        if not fresh:
+            return 0
+
+        hashed = await hash_passwords_async([row.password for row in fresh])
+        inserted = await run_in_threadpool(_insert_users, db, [
+            {
+                "id": str(uuid.uuid4()),
+                "first_name": row.first_name,
+                "last_name": row.last_name,
+                "registrationNumber": row.registrationNumber,
+                "password": password,
+                "role": row.role,
+                "program": row.program,
+                "newsletter": row.newsletter,
+            }
+            for row, password in zip(fresh, hashed)
+        ])
+        if inserted:
+            return len(fresh)
+        if attempt:
+            raise HttpException(status_code=409, detail="Registration numbers changed during the import; retry it")
+        # someone registered one of these numbers since the duplicate
+        # check; re-check and insert the rest
+        batch = [(line, row) for line, row in batch if row.registrationNumber not in existing]
+        existing = await run_in_threadpool(
+            _existing_registration_numbers, db, [row.registrationNumber for _, row in batch]
+        )
+    return 0
+
+
+def _read_batch(
+    rows: Iterator[Tuple[int, dict]], batch_size: int, seen: set, errors: List[BulkRegisterError]
+) -> Tuple[int, List[Tuple[int, BulkRegisterRow]]]:
+    """
+    Read and validate rows until `batch_size` of them are ready to insert or
+    the input ends; returns (rows read, valid rows). Runs in the threadpool,
+    since reading the upload is blocking file I/O.
+    """
+    processed = 0
+    batch: List[Tuple[int, BulkRegisterRow]] = []
+    for line, raw in rows:
+        processed += 1
+        cleaned = {k: v.strip() for k, v in raw.items() if k and v is not None and v.strip() != ""}
+        try:
+            row = BulkRegisterRow(**cleaned)
+        except ValidationError as e:
+            fields = ", ".join(str(err["loc"][0]) for err in e.errors())
+            errors.append(BulkRegisterError(
+                row=line, registrationNumber=cleaned.get("registrationNumber"),
+                detail=f"Invalid or missing fields: {fields}",
+            ))
+            continue
+        if row.registrationNumber in seen:
+            errors.append(BulkRegisterError(
+                row=line, registrationNumber=row.registrationNumber,
+                detail="Duplicate registration number in file",
+            ))
+            continue
+        seen.add(row.registrationNumber)
+
+        batch.append((line, row))
+        if len(batch) >= batch_size:
+            break
+    return processed, batch
+
+
+async def bulk_register_users(
+    db: Session, rows: Iterable[dict], batch_size: int = BULK_REGISTER_BATCH_SIZE
+) -> BulkRegisterResponse:
+    """
+    Register users from an iterable of CSV-style dicts (e.g. csv.DictReader).
+    Rows are validated and de-duplicated as they stream in, then checked
+    against the registrationNumber index, hashed in parallel and inserted
+    one batch per transaction. Bad rows are reported, not fatal. Reading,
+    queries and commits run in the threadpool and hashing in the bcrypt
+    pool, so a large import does not hold up other requests.
+    """
+    started = time.perf_counter()
+    created = 0
+    processed = 0
+    errors: List[BulkRegisterError] = []
+    seen = set()
+    numbered = enumerate(rows, start=2)  # line 1 is the CSV header
+
+    while True:
+        count, batch = await run_in_threadpool(_read_batch, numbered, batch_size, seen, errors)
+        processed += count
+        if batch:
+            created += await _insert_registration_batch(db, batch, errors)
+        if len(batch) < batch_size:
+            break
+
+    elapsed = time.perf_counter() - started
+    errors.sort(key=lambda err: err.row)
+    return BulkRegisterResponse(
+        created=created,
+        failed=len(errors),
+        errors=errors,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+    )
@@ -1,17 +1,25 @@
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
+from shared.db import make_engine, make_read_engine, create_missing_indexes
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# WAL, pragmas and pool sizes come from the shared engine factory
+engine = make_engine(DATABASE_URL)
+read_engine = make_read_engine(DATABASE_URL, engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
+# Unlike the other services, auth still uses a sync Session. Sync (`def`)
+# routes get it on Starlette's threadpool. The `async def` routes that await
+# bcrypt (register, login, bulk register) must run every query and commit
+# through run_in_threadpool, or they block the event loop for all requests.
+
 # Dependency for routes
 def get_db():
     db = SessionLocal()
@@ -19,3 +27,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency for read-only (GET) routes; uses the query-only pool when
+# DB_READ_POOL=1, otherwise the same engine as get_db
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
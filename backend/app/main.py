@@ -1,10 +1,13 @@
 from fastapi import FastAPI
-from app.database import Base, engine
-from app.models import User
+from app.database import Base, engine, SessionLocal, create_missing_indexes
 from app.auth import router as auth_router
+from app.backend_auth_utilities import get_hash_pool, shutdown_hash_pool, HASH_POOL_WORKERS
+from app.crud import load_revocations
 from fastapi.middleware.cors import CORSMiddleware
 
 Base.metadata.create_all(bind=engine)
+# create_all skips indexes on tables that already exist
+create_missing_indexes(Base.metadata, engine)
 
 app = FastAPI(title="MUST LMS Backend")
 
@@ -18,6 +21,23 @@ app.add_middleware(
 
 app.include_router(auth_router)
 
+@app.on_event("startup")
+def start_password_pool():
+    if HASH_POOL_WORKERS > 0:
+        get_hash_pool()
+
+@app.on_event("startup")
+def load_revoked_sessions():
+    db = SessionLocal()
+    try:
+        load_revocations(db)
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def stop_password_pool():
+    shutdown_hash_pool()
+
 @app.get("/")
 def root():
     return {"message": "Welcome to the MUST LMS API!"}
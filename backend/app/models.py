@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, String, Boolean, DateTime
 from .database import Base
 
 class User(Base):
@@ -9,5 +9,19 @@ class User(Base):
     registrationNumber = Column(String, unique=True, index=True, nullable=False)
     password = Column(String, nullable=False)
     role = Column(String, default="student")
-    program = Column(String, nullable=True)
+    program = Column(String, nullable=True, index=True)  # cohort lookups for bulk enrollment
     newsletter = Column(Boolean, default=True)
+
+
+class RefreshTokenFamily(Base):
+    """
+    One login session. Every token issued for it carries the family id in its
+    `fam` claim; `current_jti` is the only refresh token that may be used next.
+    """
+    __tablename__ = "refresh_token_families"
+    id = Column(String, primary_key=True, index=True)
+    user_id = Column(String, nullable=False, index=True)
+    current_jti = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True, index=True)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, List
 
 # Request body for registration
 class RegisterRequest(BaseModel):
@@ -43,7 +43,41 @@ class LoginResponse(BaseModel):
 class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
-# Response for refresh token
+# Response for refresh token (refresh tokens are rotated on every use)
 class RefreshTokenResponse(BaseModel):
     access_token: str
-    token_type: str    
+    token_type: str
+    refresh_token: Optional[str] = None
+
+# Revoked refresh-token families, polled by the other services
+class RevokedFamily(BaseModel):
+    family_id: str
+    expires_at: float  # epoch seconds; the family can be forgotten after this
+
+class RevocationListResponse(BaseModel):
+    revoked: List[RevokedFamily]
+    server_time: float    
+
+
+# One CSV row of a bulk (cohort) registration
+class BulkRegisterRow(RegisterRequest):
+    program: Optional[str] = None
+
+class BulkRegisterError(BaseModel):
+    row: int  # line number in the uploaded CSV (the header is line 1)
+    registrationNumber: Optional[str] = None
+    detail: str
+
+# Response for bulk registration
+class BulkRegisterResponse(BaseModel):
+    created: int
+    failed: int
+    errors: List[BulkRegisterError]
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+# Students of one program, for cohort enrollment by the course service
+class ProgramStudentsResponse(BaseModel):
+    program: str
+    student_ids: List[str]
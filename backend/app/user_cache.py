@@ -0,0 +1,100 @@
+"""
+In-process cache of user records for the auth service.
+
+get_current_user used to query the users table on every authenticated call.
+UserCache keeps recently seen users for USER_CACHE_TTL_SECONDS so warm
+requests resolve identity without a DB round trip. Entries are dropped
+when a user row is inserted, updated or deleted through the ORM: once at
+flush and again after the commit. Until the commit, a concurrent request
+still reads the old row and may cache it again, and the second eviction
+removes it. The TTL bounds how stale a record can get through any other
+path.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from .models import User
+
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", 300))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+
+
+def _snapshot(user: User) -> User:
+    """Copy a user's columns into a transient User that belongs to no session"""
+    return User(**{column.name: getattr(user, column.name) for column in User.__table__.columns})
+
+
+class UserCache:
+    """Bounded LRU of user records with a per-entry TTL"""
+
+    def __init__(self, ttl_seconds: int = USER_CACHE_TTL_SECONDS, maxsize: int = USER_CACHE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple[float, User]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[User]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if now >= expires_at:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def put(self, user: User) -> User:
+        """Cache a snapshot of `user` and return it"""
+        snapshot = _snapshot(user)
+        with self._lock:
+            self._entries[snapshot.id] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+# ids of users flushed in a session's open transaction
+_FLUSHED_USERS = "flushed_user_ids"
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User):
+    user_cache.invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_FLUSHED_USERS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session):
+    for user_id in session.info.pop(_FLUSHED_USERS, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_flushed_users(session: Session):
+    session.info.pop(_FLUSHED_USERS, None)
@@ -1,14 +1,14 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.assessments import Assessment, Question
 from schemas.assessments import AssessmentCreate
 
 # crud/assessments.py
-from sqlalchemy.orm import Session
 from models.assessments import Assessment
 from schemas.assessments import AssessmentCreate
 from datetime import datetime
 
-def create_assessment(db: Session, data: AssessmentCreate, instructor_id: str):
+async def create_assessment(db: AsyncSession, data: AssessmentCreate, instructor_id: str):
 
     # Normalize due_date input
     due_date = data.due_date
@@ -37,24 +37,24 @@ def create_assessment(db: Session, data: AssessmentCreate, instructor_id: str):
     )
 
     db.add(assessment)
-    db.commit()
-    db.refresh(assessment)
+    await db.commit()
+    await db.refresh(assessment)
 
     return assessment
 
 
-def get_assessments_for_instructor(db: Session, instructor_id: str):
-    return db.query(Assessment).filter(Assessment.instructor_id == instructor_id).all()
+async def get_assessments_for_instructor(db: AsyncSession, instructor_id: str):
+    return (await db.scalars(select(Assessment).where(Assessment.instructor_id == instructor_id))).all()
 
-def get_assessment(db: Session, assessment_id: int, instructor_id: str):
-    return db.query(Assessment).filter(
+async def get_assessment(db: AsyncSession, assessment_id: int, instructor_id: str):
+    return await db.scalar(select(Assessment).where(
         Assessment.id == assessment_id,
         Assessment.instructor_id == instructor_id
-    ).first()
+    ))
 
 # crud/assessments.py (excerpt)
-def update_assessment(db: Session, assessment_id: int, instructor_id: str, data):
-    assessment = get_assessment(db, assessment_id, instructor_id)
+async def update_assessment(db: AsyncSession, assessment_id: int, instructor_id: str, data):
+    assessment = await get_assessment(db, assessment_id, instructor_id)
     if not assessment:
         return None
 
@@ -68,7 +68,7 @@ def update_assessment(db: Session, assessment_id: int, instructor_id: str, data)
         if hasattr(assessment, key) and value is not None:
             setattr(assessment, key, value)
 
-    db.commit()
-    db.refresh(assessment)
+    await db.commit()
+    await db.refresh(assessment)
     return assessment
 
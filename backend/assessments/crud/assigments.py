@@ -1,9 +1,10 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from schemas.assigments import AssignmentCreate
 from models.assigments import Assignment
 
 # CREATE
-def create_assignment(db: Session, data: AssignmentCreate, instructor_id: str):
+async def create_assignment(db: AsyncSession, data: AssignmentCreate, instructor_id: str):
     # ensure module_id is None if empty
     module_id = data.module_id if data.module_id not in ("", None) else None
 
@@ -39,29 +40,29 @@ def create_assignment(db: Session, data: AssignmentCreate, instructor_id: str):
         instructor_id=instructor_id
     )
     db.add(assignment)
-    db.commit()
-    db.refresh(assignment)
+    await db.commit()
+    await db.refresh(assignment)
     return assignment
 
 
 # GET ALL BY INSTRUCTOR
-def get_assignments_for_instructor(db: Session, instructor_id: str):
-    return db.query(Assignment).filter(Assignment.instructor_id == instructor_id).all()
+async def get_assignments_for_instructor(db: AsyncSession, instructor_id: str):
+    return (await db.scalars(select(Assignment).where(Assignment.instructor_id == instructor_id))).all()
 
 # GET ONE
-def get_assignment(db: Session, assignment_id: str, instructor_id: str):
-    return db.query(Assignment).filter(
+async def get_assignment(db: AsyncSession, assignment_id: str, instructor_id: str):
+    return await db.scalar(select(Assignment).where(
         Assignment.id == assignment_id,
         Assignment.instructor_id == instructor_id
-    ).first()
+    ))
 # UPDATE
-def update_assignment(db: Session, assignment_id: str, instructor_id: str, data:    dict):
-    assignment = get_assignment(db, assignment_id, instructor_id)
+async def update_assignment(db: AsyncSession, assignment_id: str, instructor_id: str, data:    dict):
+    assignment = await get_assignment(db, assignment_id, instructor_id)
     if not assignment:
         return None
     for key, value in data.items():
         if value is not None:
             setattr(assignment, key, value)
-    db.commit()
-    db.refresh(assignment)
+    await db.commit()
+    await db.refresh(assignment)
     return assignment
\ No newline at end of file
@@ -1,6 +1,8 @@
 # crud/questions.py
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from models.assessments import Question
 from schemas.assessments import QuestionCreate, QuestionUpdate
 from typing import List, Dict, Any
@@ -40,7 +42,7 @@ def delete_physical_file(filename: str | None):
 # ===============================
 # CRUD
 # ===============================
-def create_question(db: Session, assessment_id: int, q: QuestionCreate) -> Question:
+async def create_question(db: AsyncSession, assessment_id: int, q: QuestionCreate) -> Question:
     question = Question(
         assessment_id=assessment_id,
         type=q.type,
@@ -55,25 +57,25 @@ def create_question(db: Session, assessment_id: int, q: QuestionCreate) -> Quest
         correct_order=q.correct_order,
     )
     db.add(question)
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    await db.refresh(question)
     return attach_file_url(question)
 
 
-def get_question(db: Session, question_id: int) -> Question | None:
-    q = db.query(Question).filter(Question.id == question_id).first()
+async def get_question(db: AsyncSession, question_id: int) -> Question | None:
+    q = await db.scalar(select(Question).where(Question.id == question_id))
     return attach_file_url(q) if q else None
 
 
-def list_questions_for_assessment(db: Session, assessment_id: int):
-    questions = db.query(Question).filter(
+async def list_questions_for_assessment(db: AsyncSession, assessment_id: int):
+    questions = (await db.scalars(select(Question).where(
         Question.assessment_id == assessment_id
-    ).all()
+    ))).all()
     return [attach_file_url(q) for q in questions]
 
 
-def update_question(db: Session, question_id: int, qdata: Dict[str, Any]) -> Question | None:
-    question = db.query(Question).filter(Question.id == question_id).first()
+async def update_question(db: AsyncSession, question_id: int, qdata: Dict[str, Any]) -> Question | None:
+    question = await db.scalar(select(Question).where(Question.id == question_id))
     if not question:
         return None
 
@@ -81,33 +83,33 @@ def update_question(db: Session, question_id: int, qdata: Dict[str, Any]) -> Que
         if hasattr(question, key) and val is not None:
             setattr(question, key, val)
 
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    await db.refresh(question)
     return attach_file_url(question)
 
 
-def delete_question(db: Session, question_id: int) -> bool:
+async def delete_question(db: AsyncSession, question_id: int) -> bool:
     """
     Deletes BOTH:
     - DB record
     - Uploaded file (if exists)
     """
-    question = db.query(Question).filter(Question.id == question_id).first()
+    question = await db.scalar(select(Question).where(Question.id == question_id))
     if not question:
         return False
 
     delete_physical_file(question.reference_file)
 
-    db.delete(question)
-    db.commit()
+    await db.delete(question)
+    await db.commit()
     return True
 
 
 # ===============================
 # FILE UPLOAD
 # ===============================
-def upload_question_file(db: Session, question_id: int, file: UploadFile):
-    question = db.query(Question).filter(Question.id == question_id).first()
+async def upload_question_file(db: AsyncSession, question_id: int, file: UploadFile):
+    question = await db.scalar(select(Question).where(Question.id == question_id))
     if not question:
         return None
 
@@ -118,26 +120,30 @@ def upload_question_file(db: Session, question_id: int, file: UploadFile):
     filename = f"question_{question_id}_{int(time.time())}{ext}"
     file_path = os.path.join(UPLOAD_DIR, filename)
 
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    def _save():
+        with open(file_path, "wb") as buffer:
+            shutil.copyfileobj(file.file, buffer)
+
+    # blocking file I/O stays off the event loop
+    await run_in_threadpool(_save)
 
     question.reference_file = filename
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    await db.refresh(question)
 
     return attach_file_url(question)
 
 
-def delete_question_file(db: Session, question_id: int) -> bool:
-    question = db.query(Question).filter(Question.id == question_id).first()
+async def delete_question_file(db: AsyncSession, question_id: int) -> bool:
+    question = await db.scalar(select(Question).where(Question.id == question_id))
     if not question or not question.reference_file:
         return False
 
     delete_physical_file(question.reference_file)
 
     question.reference_file = None
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    await db.refresh(question)
 
     return True
 
@@ -145,8 +151,8 @@ def delete_question_file(db: Session, question_id: int) -> bool:
 # ===============================
 # SYNC (SAFE)
 # ===============================
-def sync_questions_for_assessment(
-    db: Session,
+async def sync_questions_for_assessment(
+    db: AsyncSession,
     assessment_id: int,
     questions: List[QuestionUpdate]
 ):
@@ -157,9 +163,9 @@ def sync_questions_for_assessment(
     - Deletes missing (and files)
     """
 
-    existing = db.query(Question).filter(
+    existing = (await db.scalars(select(Question).where(
         Question.assessment_id == assessment_id
-    ).all()
+    ))).all()
 
     existing_map = {q.id: q for q in existing}
     incoming_ids = set()
@@ -190,19 +196,19 @@ def sync_questions_for_assessment(
                 correct_order=q.correct_order,
             )
             db.add(new_q)
-            db.flush()
+            await db.flush()
             results.append(new_q)
 
     # Delete removed questions + files
     for q in existing:
         if q.id not in incoming_ids:
             delete_physical_file(q.reference_file)
-            db.delete(q)
+            await db.delete(q)
 
-    db.commit()
+    await db.commit()
 
-    final = db.query(Question).filter(
+    final = (await db.scalars(select(Question).where(
         Question.assessment_id == assessment_id
-    ).all()
+    ))).all()
 
     return [attach_file_url(q) for q in final]
@@ -1,19 +1,36 @@
-from sqlalchemy import create_engine
+import os
+import sys
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+# backend/ holds the `shared` package used by every service
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.db import make_engine, make_read_engine, make_async_engine, make_async_read_engine  # noqa: E402
 
 DATABASE_URL = "sqlite:///./assessment.db"
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# WAL, pragmas and pool sizes come from the shared engine factory.
+# The sync engine is used for create_all and offline scripts; routes use
+# the async (aiosqlite) engine below.
+engine = make_engine(DATABASE_URL)
+read_engine = make_read_engine(DATABASE_URL, engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+async_engine = make_async_engine(DATABASE_URL)
+async_read_engine = make_async_read_engine(DATABASE_URL, async_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency for read-only (GET) routes; uses the query-only pool when
+# DB_READ_POOL=1, otherwise the same engine as get_db
+async def get_read_db():
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
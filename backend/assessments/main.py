@@ -5,6 +5,7 @@ from database import Base, engine
 from routers.assigments import router as assignment_router
 from routers.assessments import router as assessment_router
 from routers import questions as questions_router
+from utils.auth import start_revocation_sync, stop_revocation_sync
 
 Base.metadata.create_all(bind=engine)
 
@@ -27,3 +28,12 @@ app.mount("/static/questions", StaticFiles(directory="uploads/questions"), name=
 app.include_router(assignment_router)
 app.include_router(assessment_router)
 app.include_router(questions_router.router)
+
+# Keeps the in-memory token revocation filter in step with the auth service
+@app.on_event("startup")
+def start_token_revocation_sync():
+    start_revocation_sync()
+
+@app.on_event("shutdown")
+def stop_token_revocation_sync():
+    stop_revocation_sync()
@@ -26,7 +26,9 @@ class Assessment(Base):
     updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
 
 
-    questions = relationship("Question", back_populates="assessment", cascade="all, delete-orphan")
+    # selectin: AssessmentResponse always includes questions, and async
+    # sessions cannot lazy-load them on attribute access
+    questions = relationship("Question", back_populates="assessment", cascade="all, delete-orphan", lazy="selectin")
 
 
 class Question(Base):
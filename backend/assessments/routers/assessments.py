@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from schemas.assessments import AssessmentCreate, AssessmentResponse
 from crud.assessments import create_assessment, get_assessments_for_instructor, get_assessment, update_assessment
@@ -10,43 +10,43 @@ router = APIRouter(prefix="/assessments", tags=["Assessments"])
 get_current_instructor = require_role(["instructor", "admin"])
 
 @router.post("", response_model=AssessmentResponse)
-def create_assessment_route(
+async def create_assessment_route(
     data: AssessmentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     token_data = Depends(get_current_instructor)
 ):
     instructor_id = token_data.sub
-    return create_assessment(db, data, instructor_id)
+    return await create_assessment(db, data, instructor_id)
 
 @router.get("", response_model=list[AssessmentResponse])
-def get_instructor_assessments(
-    db: Session = Depends(get_db),
+async def get_instructor_assessments(
+    db: AsyncSession = Depends(get_db),
     token_data = Depends(get_current_instructor)
 ):
     instructor_id = token_data.sub
-    return get_assessments_for_instructor(db, instructor_id)
+    return await get_assessments_for_instructor(db, instructor_id)
 
 @router.get("/{assessment_id}", response_model=AssessmentResponse)
-def get_assessment_route(
+async def get_assessment_route(
     assessment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     token_data = Depends(get_current_instructor)
 ):
     instructor_id = token_data.sub
-    assessment = get_assessment(db, assessment_id, instructor_id)
+    assessment = await get_assessment(db, assessment_id, instructor_id)
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     return assessment
 
 @router.put("/{assessment_id}", response_model=AssessmentResponse)
-def update_assessment_route(
+async def update_assessment_route(
     assessment_id: int,
     data: AssessmentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     token_data = Depends(get_current_instructor)
 ):
     instructor_id = token_data.sub
-    assessment = update_assessment(db, assessment_id, instructor_id, data)
+    assessment = await update_assessment(db, assessment_id, instructor_id, data)
 
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
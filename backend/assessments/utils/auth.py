@@ -1,10 +1,17 @@
 # utils/auth.py
+import os
+import sys
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
+from jose import JWTError
 from typing import Optional
 from pydantic import BaseModel
 
+# backend/ holds the `shared` package used by every service
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared.token_cache import VerifiedTokenCache  # noqa: E402
+from shared.revocation import revocations, start_revocation_sync, stop_revocation_sync  # noqa: E402,F401
+
 # ============================================================================
 # CONFIGURATION  (IMPORTANT: Same secret + algorithm as your Auth Service)
 # ============================================================================
@@ -24,16 +31,24 @@ class TokenData(BaseModel):
 # ============================================================================
 # TOKEN DECODER
 # ============================================================================
+# Verified tokens are cached until their `exp`; a repeat request with the same
+# token skips the signature check and TokenData construction.
+_token_cache = VerifiedTokenCache(
+    SECRET_KEY, ALGORITHM,
+    build=lambda payload: TokenData(sub=payload.get("sub"), role=payload.get("role")),
+)
+
 def decode_token(token: str) -> TokenData:
     """
     Decode JWT token and return user data.
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        role = payload.get("role")
-
-        return TokenData(sub=user_id, role=role)
+        claims, td = _token_cache.decode_with_claims(token)
+        # revoked sessions come from the in-memory filter kept in sync with
+        # the auth service, never from a lookup on the request path
+        if revocations.is_token_revoked(claims):
+            raise JWTError("Token has been revoked")
+        return td
 
     except JWTError:
         raise HTTPException(
@@ -45,7 +60,7 @@ def decode_token(token: str) -> TokenData:
 # ============================================================================
 # GET CURRENT USER (NO DATABASE NEEDED)
 # ============================================================================
-def get_current_user_token(
+async def get_current_user_token(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> TokenData:
     """
@@ -66,7 +81,7 @@ def require_role(allowed_roles: list):
     """
     Restrict endpoints to certain user roles.
     """
-    def wrapper(td: TokenData = Depends(get_current_user_token)):
+    async def wrapper(td: TokenData = Depends(get_current_user_token)):
         if td.role not in allowed_roles:
             raise HTTPException(
                 status_code=403,
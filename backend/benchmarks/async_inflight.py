@@ -0,0 +1,140 @@
+"""
+In-flight request capacity of one worker: sync Session routes vs AsyncSession.
+
+Builds two copies of the same read route over one SQLite file. One uses a
+sync `def` handler with a sync Session, the way the services used to. That
+handler runs on Starlette's threadpool (40 threads by default). The other
+uses an `async def` handler with an AsyncSession from
+shared.db.make_async_engine. Both are driven in-process with
+--concurrency simultaneous clients through httpx's ASGI transport.
+
+For each variant it reports throughput, p50/p99 latency and the peak number
+of requests that were inside a handler at the same time.
+
+Run from the backend directory:
+    python -m benchmarks.async_inflight --concurrency 500 --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import Column, Integer, MetaData, String, Table, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from shared.db import make_async_engine, make_engine
+
+metadata = MetaData()
+courses = Table(
+    "bench_courses", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("title", String, nullable=False),
+    Column("category", String, nullable=False),
+)
+
+ROWS = 5000
+
+
+class InFlight:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        self.current -= 1
+
+
+def build_sync_app(url: str, gauge: InFlight) -> FastAPI:
+    SessionLocal = sessionmaker(bind=make_engine(url), autoflush=False)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+
+    @app.get("/courses/{category}")
+    def list_courses(category: str, db=Depends(get_db)):
+        with gauge:
+            rows = db.execute(select(courses).where(courses.c.category == category).limit(20)).all()
+            return [{"id": r.id, "title": r.title} for r in rows]
+
+    return app
+
+
+def build_async_app(url: str, gauge: InFlight) -> FastAPI:
+    AsyncSessionLocal = async_sessionmaker(make_async_engine(url), autoflush=False, expire_on_commit=False)
+
+    async def get_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/courses/{category}")
+    async def list_courses(category: str, db=Depends(get_db)):
+        with gauge:
+            rows = (await db.execute(select(courses).where(courses.c.category == category).limit(20))).all()
+            return [{"id": r.id, "title": r.title} for r in rows]
+
+    return app
+
+
+async def drive(app: FastAPI, concurrency: int, total: int):
+    latencies = []
+    remaining = iter(range(total))
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def client_loop():
+            for n in remaining:
+                started = time.perf_counter()
+                resp = await client.get(f"/courses/cat-{n % 50}")
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return total / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main(concurrency: int, total: int):
+    tmp_dir = tempfile.mkdtemp(prefix="async_bench_")
+    url = f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+    seed_engine = make_engine(url)
+    metadata.create_all(seed_engine)
+    with seed_engine.begin() as conn:
+        conn.execute(insert(courses), [{"id": i, "title": f"course-{i}", "category": f"cat-{i % 50}"} for i in range(ROWS)])
+    seed_engine.dispose()
+
+    for label, build in (("sync Session", build_sync_app), ("AsyncSession", build_async_app)):
+        gauge = InFlight()
+        rps, p50, p99 = asyncio.run(drive(build(url, gauge), concurrency, total))
+        print(
+            f"{label:<14} req/sec={rps:8.1f} p50={p50 * 1000:7.1f}ms "
+            f"p99={p99 * 1000:7.1f}ms peak_in_flight={gauge.peak}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.concurrency, args.requests)
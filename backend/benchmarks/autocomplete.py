@@ -0,0 +1,110 @@
+"""
+Course autocomplete: in-memory prefix index vs SQLite per keystroke.
+
+Seeds --rows published courses, loads app.autocomplete.CourseIndex and
+replays the keystrokes of a few typed queries ("d", "da", "dat", ...)
+against:
+
+  * index - CourseIndex.search (bisect over sorted arrays, no I/O)
+  * fts   - search.search_courses, the FTS5 prefix query
+  * like  - code LIKE 'q%' OR title LIKE '%q%'
+
+Run from the backend directory:
+    python -m benchmarks.autocomplete --rows 20000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# createCourse is its own top-level `app` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+
+from app import models, search  # noqa: E402
+from app.autocomplete import CourseIndex  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+SUBJECTS = ["Databases", "Data Structures", "Calculus", "Statistics", "Networks", "Compilers", "Painting",
+            "Economics", "Philosophy", "Genetics", "Robotics", "Accounting", "Marketing", "Poetry"]
+WORDS = ["Introduction to", "Advanced", "Applied", "Modern", "Foundations of", "Topics in", "Practical"]
+TYPED = ["data str", "intro", "CS12", "robo", "statistics"]
+
+
+def seed(url: str, rows: int):
+    engine = make_engine(url)
+    models.Base.metadata.create_all(engine)
+    search.create_search_index(engine)
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Course), [{
+            "id": str(uuid.uuid4()), "code": f"{rng.choice(['CS', 'MA', 'AR', 'EC'])}{i:05d}",
+            "title": f"{rng.choice(WORDS)} {rng.choice(SUBJECTS)} {i}", "course_type": "normal",
+            "duration": "12", "instructor_id": "bench", "is_published": True,
+        } for i in range(rows)])
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+
+
+async def timed(fn, prefixes, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        for prefix in prefixes:
+            started = time.perf_counter()
+            await fn(prefix)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, max(timings) * 1000
+
+
+async def run(url: str, limit: int, repeat: int):
+    engine = make_async_engine(url)
+    prefixes = [text[:n] for text in TYPED for n in range(1, len(text) + 1)]
+    async with AsyncSession(engine) as db:
+        index = CourseIndex()
+        started = time.perf_counter()
+        await index.load(db)
+        print(f"index load  {(time.perf_counter() - started) * 1000:8.1f}ms (startup / reload after a foreign write)")
+
+        async def from_index(prefix):
+            return index.search(prefix, limit)
+
+        async def fts(prefix):
+            return await search.search_courses(db, prefix, limit=limit)
+
+        async def like(prefix):
+            return (await db.execute(
+                select(models.Course.id, models.Course.code, models.Course.title)
+                .where(models.Course.is_published == True)
+                .where(or_(models.Course.code.ilike(f"{prefix}%"), models.Course.title.ilike(f"%{prefix}%")))
+                .order_by(models.Course.title)
+                .limit(limit)
+            )).all()
+
+        print(f"{len(prefixes)} keystrokes x {repeat}, limit {limit}:  median / worst")
+        for name, fn in (("index", from_index), ("fts", fts), ("like", like)):
+            median, worst = await timed(fn, prefixes, repeat)
+            print(f"  {name:6}{median:9.3f}ms {worst:9.3f}ms")
+    await engine.dispose()
+
+
+def main(rows: int, limit: int, repeat: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='autocomplete_bench_'), 'courses.db')}"
+    seed(url, rows)
+    asyncio.run(run(url, limit, repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.limit, args.repeat)
@@ -0,0 +1,83 @@
+"""
+Cohort enrollment: one request per student vs the bulk endpoint.
+
+Seeds a temporary createCourse database with two uncapped courses and
+enrolls --students students in each:
+
+  * per student - crud.create_enrollment once per student, each with its
+                  own statement and commit (what N calls to
+                  POST /courses/{id}/enroll cost, minus HTTP)
+  * bulk        - crud.bulk_create_enrollments: one set query, one
+                  executemany, one commit
+
+Run from the backend directory:
+    python -m benchmarks.bulk_enrollment --students 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+# createCourse is its own top-level `app` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+
+from app import crud, models, schemas, seats  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+
+def seed(url: str) -> list:
+    engine = make_engine(url)
+    models.Base.metadata.create_all(engine)
+    seats.prepare_seat_counters(engine)
+    course_ids = [str(uuid.uuid4()) for _ in range(2)]
+    with engine.begin() as conn:
+        conn.execute(insert(models.Course), [{
+            "id": course_id, "code": f"C{i}", "title": f"Course {i}", "course_type": "normal",
+            "duration": "12", "instructor_id": "bench", "is_published": True,
+        } for i, course_id in enumerate(course_ids)])
+    engine.dispose()
+    return course_ids
+
+
+async def one_by_one(Session, course_id: str, student_ids: list):
+    async with Session() as db:
+        for student_id in student_ids:
+            await crud.create_enrollment(db, schemas.EnrollmentCreate(course_id=course_id, student_id=student_id))
+
+
+async def bulk(Session, course_id: str, student_ids: list):
+    async with Session() as db:
+        summary = await crud.bulk_create_enrollments(db, course_id, student_ids)
+    assert summary.enrolled == len(student_ids), summary.enrolled
+
+
+async def run(url: str, course_ids: list, students: int):
+    engine = make_async_engine(url)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    student_ids = [f"student-{i}" for i in range(students)]
+    for label, fn, course_id in (("per student", one_by_one, course_ids[0]), ("bulk", bulk, course_ids[1])):
+        started = time.perf_counter()
+        await fn(Session, course_id, student_ids)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<12} {students} students in {elapsed:7.3f}s ({students / elapsed:9.0f}/s)")
+    await engine.dispose()
+
+
+def main(students: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bulk_enroll_bench_'), 'courses.db')}"
+    course_ids = seed(url)
+    asyncio.run(run(url, course_ids, students))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.students)
@@ -0,0 +1,83 @@
+"""
+Catalogue read latency with and without the response cache.
+
+Starts the real createCourse app against a temporary courses.db seeded with
+--rows published courses, then times GET /api/courses/student?limit=50
+through httpx's ASGI transport in three modes:
+
+  * uncached   - the cache is disabled, so every request queries and serializes
+  * cached     - 200 served from the response cache
+  * revalidate - the client sends If-None-Match and gets a 304 with no body
+
+Run from the backend directory:
+    python -m benchmarks.catalogue_cache --rows 5000 --requests 500
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+from sqlalchemy import insert
+
+# createCourse is its own top-level `app` package, and its database URL is
+# relative to the working directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+os.chdir(tempfile.mkdtemp(prefix="catalogue_cache_bench_"))
+
+from app import models  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.response_cache import catalogue_cache  # noqa: E402
+
+
+def seed(rows: int):
+    with engine.begin() as conn:
+        conn.execute(insert(models.Course), [{
+            "id": str(uuid.uuid4()), "code": f"C{i:06d}", "title": f"Course {i}",
+            "description": "An introduction to the subject. " * 10, "category": f"category-{i % 12}",
+            "level": "bachelor", "course_type": "normal", "duration": "12", "instructor_id": "bench",
+            "is_published": True, "tags_json": '["one", "two"]',
+        } for i in range(rows)])
+
+
+async def run(total: int):
+    url = "/api/courses/student?limit=50"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def timed(label: str, headers=None, expect=200):
+            timings = []
+            for _ in range(total):
+                started = time.perf_counter()
+                resp = await client.get(url, headers=headers)
+                timings.append(time.perf_counter() - started)
+                assert resp.status_code == expect, resp.status_code
+            print(f"{label:<12} median={statistics.median(timings) * 1000:7.3f}ms  p99={sorted(timings)[int(total * .99) - 1] * 1000:7.3f}ms")
+            return resp
+
+        maxsize = catalogue_cache.maxsize
+        catalogue_cache.maxsize = 0
+        catalogue_cache.clear()
+        await timed("uncached")
+        catalogue_cache.maxsize = maxsize
+        resp = await timed("cached")
+        await timed("revalidate", headers={"If-None-Match": resp.headers["etag"]}, expect=304)
+
+
+def main(rows: int, total: int):
+    models.Base.metadata.create_all(engine)
+    seed(rows)
+    asyncio.run(run(total))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    main(args.rows, args.requests)
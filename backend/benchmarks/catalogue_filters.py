@@ -0,0 +1,181 @@
+"""
+Query plans and latency for the course catalogue filters.
+
+Seeds --rows courses into a temporary database built from createCourse's own
+models, so it carries exactly the indexes the service declares. It then runs
+the real query builders from createCourse/app/crud.py
+(student_filtered_courses_query, my_filtered_courses_query) for a set of
+filter combinations. For each combination it records:
+
+  * EXPLAIN QUERY PLAN for the first keyset page
+  * the median latency of fetching that page
+  * whether the plan walks the whole table (SCAN, with or without an index)
+    or needs a temp B-tree for ORDER BY
+
+--output writes the results as JSON. --baseline compares a run against an
+earlier JSON file and exits non-zero if a combination now scans the table,
+now sorts, or is more than --max-slowdown times slower.
+
+Run from the backend directory:
+    python -m benchmarks.catalogue_filters --rows 50000 --output plans.json
+    python -m benchmarks.catalogue_filters --baseline plans.json
+    python -m benchmarks.catalogue_filters --drop-indexes   # before/after comparison
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import String, bindparam, insert
+
+# createCourse is its own top-level `app` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+
+from app import crud, models  # noqa: E402
+from shared.db import make_engine  # noqa: E402
+from shared.pagination import keyset  # noqa: E402
+
+CATEGORIES = [f"category-{i}" for i in range(12)]
+DEPARTMENTS = [f"department-{i}" for i in range(20)]
+LEVELS = ["beginner", "intermediate", "advanced"]
+TYPES = ["lecture", "lab", "seminar", "online"]
+DURATIONS = [f"{w} weeks" for w in (4, 6, 8, 10, 12, 14, 16, 24)]
+INSTRUCTORS = [str(uuid.uuid4()) for _ in range(500)]
+
+STUDENT_FILTERS = ("category", "department", "level", "course_type", "duration")
+PAGE_SIZE = 50
+
+
+def seed(engine, rows: int):
+    models.Base.metadata.create_all(engine)
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    # timestamps go in as text, bypassing the DateTime bind processor
+    stmt = insert(models.Course).values(
+        created_at=bindparam("created_at", type_=String),
+        updated_at=bindparam("updated_at", type_=String),
+    )
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "code": f"C{i:06d}",
+                "title": f"Course {i}",
+                "category": rng.choice(CATEGORIES),
+                "department": rng.choice(DEPARTMENTS),
+                "level": rng.choice(LEVELS),
+                "course_type": rng.choice(TYPES),
+                "duration": rng.choice(DURATIONS),
+                "instructor_id": rng.choice(INSTRUCTORS),
+                "is_published": rng.random() < 0.8,
+                # same text form SQLite writes for server_default=func.now()
+                "created_at": (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"),
+                "updated_at": (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            })
+            if len(batch) == 10000:
+                conn.execute(stmt, batch)
+                batch = []
+        if batch:
+            conn.execute(stmt, batch)
+        conn.exec_driver_sql("ANALYZE")
+
+
+def drop_catalogue_indexes(engine):
+    with engine.begin() as conn:
+        for index in models.Course.__table__.indexes:
+            if index.name.startswith("ix_courses_published") or index.name.startswith("ix_courses_instructor_filters"):
+                conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+
+
+def combinations():
+    """Every single filter, every pair, all five together, and none"""
+    sample = {"category": CATEGORIES[3], "department": DEPARTMENTS[7], "level": LEVELS[1],
+              "course_type": TYPES[2], "duration": DURATIONS[4]}
+    for size in (0, 1, 2, 5):
+        for names in itertools.combinations(STUDENT_FILTERS, size):
+            filters = {name: None for name in STUDENT_FILTERS}
+            filters.update({name: sample[name] for name in names})
+            yield "student:" + ("+".join(names) or "none"), crud.student_filtered_courses_query(**filters)
+    yield "instructor:all-four", crud.my_filtered_courses_query(
+        INSTRUCTORS[0], sample["category"], sample["department"], sample["level"], sample["course_type"],
+    )
+
+
+def measure(conn, query, repeat: int):
+    page = keyset(query, crud.COURSE_ORDER, limit=PAGE_SIZE)
+    compiled = page.compile(conn, compile_kwargs={"literal_binds": True})
+    plan = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")]
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(page).all()
+        timings.append(time.perf_counter() - started)
+    return {
+        "plan": plan,
+        "full_scan": any(step.startswith("SCAN") for step in plan),
+        "temp_sort": any("TEMP B-TREE" in step for step in plan),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+    }
+
+
+def compare(results: dict, baseline: dict, max_slowdown: float) -> list:
+    problems = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if now["full_scan"] and not before["full_scan"]:
+            problems.append(f"{name}: now a full table scan")
+        if now["temp_sort"] and not before["temp_sort"]:
+            problems.append(f"{name}: now sorts with a temp B-tree")
+        if before["median_ms"] > 0 and now["median_ms"] > before["median_ms"] * max_slowdown:
+            problems.append(f"{name}: {before['median_ms']}ms -> {now['median_ms']}ms")
+    return problems
+
+
+def main(args):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='catalogue_bench_'), 'courses.db')}"
+    engine = make_engine(url)
+    seed(engine, args.rows)
+    if args.drop_indexes:
+        drop_catalogue_indexes(engine)
+
+    results = {}
+    with engine.connect() as conn:
+        for name, query in combinations():
+            results[name] = measure(conn, query, args.repeat)
+            r = results[name]
+            flags = ("SCAN " if r["full_scan"] else "") + ("SORT" if r["temp_sort"] else "")
+            print(f"{name:<56} {r['median_ms']:>8.3f}ms {flags:<9} {' | '.join(r['plan'])}")
+    engine.dispose()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rows": args.rows, "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(results, json.load(f)["results"], args.max_slowdown)
+        for problem in problems:
+            print("REGRESSION", problem)
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write plans and timings to this JSON file")
+    parser.add_argument("--baseline", help="compare against a JSON file written by --output")
+    parser.add_argument("--max-slowdown", type=float, default=2.0)
+    parser.add_argument("--drop-indexes", action="store_true", help="run without the catalogue filter indexes")
+    main(parser.parse_args())
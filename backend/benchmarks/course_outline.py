@@ -0,0 +1,126 @@
+"""
+Learner sidebar: per-module lesson calls vs the cached course outline.
+
+Seeds a course with --modules modules of --lessons lessons each, every
+lesson carrying --blocks content blocks of text, then times building the
+sidebar with
+
+  * per-module - get_course_modules, then get_lessons_by_module for each
+                 module, serialized as LessonResponse (what the frontend
+                 fetched before: every lesson's full JSON columns)
+  * outline    - crud.get_course_outline: modules plus selectinload of the
+                 lesson header columns only
+  * cached     - crud.get_course_outline_json on a warm outline_cache
+
+Run from the backend directory:
+    python -m benchmarks.course_outline --modules 20 --lessons 30
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from pydantic import TypeAdapter
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# module_lesson modules import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "module_lesson"))
+
+import crud  # noqa: E402
+from database import Base  # noqa: E402
+from models.lessons import Lesson  # noqa: E402
+from models.modules import Module  # noqa: E402
+from outline import outline_cache  # noqa: E402
+from schemas import LessonResponse  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+SETTINGS = {
+    "discussion": {"enabled": True, "prompt": "Discuss"},
+    "progressSettings": {"completion": True, "timeSpent": True, "quizScore": True},
+    "accessibility": {"darkMode": False, "fontSize": "medium", "transcriptEnabled": True, "transcriptText": "t" * 2000},
+    "feedbackSettings": {"ratings": True, "reviews": True, "customQuestions": []},
+}
+
+_lessons_json = TypeAdapter(list[LessonResponse])
+
+
+def seed(url: str, modules: int, lessons: int, blocks: int) -> str:
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    course_id = str(uuid.uuid4())
+    module_ids = [str(uuid.uuid4()) for _ in range(modules)]
+    with engine.begin() as conn:
+        conn.execute(insert(Module), [
+            {"id": module_id, "title": f"Module {m}", "course_id": course_id, "order": m + 1}
+            for m, module_id in enumerate(module_ids)
+        ])
+        conn.execute(insert(Lesson), [{
+            "id": str(uuid.uuid4()), "module_id": module_id, "title": f"Lesson {m}.{i}", "order": i + 1,
+            "contentBlocks": [{"type": "text", "title": f"Block {b}", "content": "lorem ipsum " * 80} for b in range(blocks)],
+            "quizQuestions": [{"id": q, "question": "q" * 200, "options": ["a", "b", "c"], "correctAnswer": 0} for q in range(5)],
+            **SETTINGS,
+        } for m, module_id in enumerate(module_ids) for i in range(lessons)])
+    engine.dispose()
+    return course_id
+
+
+async def timed(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+async def run(url: str, course_id: str, repeat: int):
+    engine = make_async_engine(url)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(1))
+    async with AsyncSession(engine) as db:
+
+        async def per_module():
+            db.expunge_all()
+            modules = await crud.get_course_modules(db, course_id)
+            return [_lessons_json.dump_json(_lessons_json.validate_python(
+                await crud.get_lessons_by_module(db, module.id), from_attributes=True,
+            )) for module in modules]
+
+        async def outline():
+            db.expunge_all()
+            return (await crud.get_course_outline(db, course_id)).model_dump_json()
+
+        async def cached():
+            return await crud.get_course_outline_json(db, course_id)
+
+        outline_cache.clear()
+        await cached()  # warm
+        for name, fn in (("per-module", per_module), ("outline", outline), ("cached", cached)):
+            statements.clear()
+            body = await fn()
+            count = len(statements)
+            size = sum(map(len, body)) if isinstance(body, list) else len(body)
+            print(f"{name:11} {await timed(fn, repeat):8.2f}ms  {count:3} statements  {size / 1024:8.1f} KiB")
+    await engine.dispose()
+
+
+def main(modules: int, lessons: int, blocks: int, repeat: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='outline_bench_'), 'module_service.db')}"
+    course_id = seed(url, modules, lessons, blocks)
+    asyncio.run(run(url, course_id, repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=20)
+    parser.add_argument("--lessons", type=int, default=30)
+    parser.add_argument("--blocks", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    main(args.modules, args.lessons, args.blocks, args.repeat)
@@ -0,0 +1,128 @@
+"""
+Latency of /api/search/courses over a large catalogue.
+
+Seeds --rows courses into a temporary database built from createCourse's
+models and FTS5 triggers. It then times app.search.search_courses, the
+function behind the route, for common, rare, prefix and multi-word queries,
+with and without the category/level filters. For comparison it also times
+the LIKE '%term%' scan the frontend would otherwise need.
+
+Run from the backend directory:
+    python -m benchmarks.course_search --rows 100000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# createCourse is its own top-level `app` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+
+from app import models, search  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+SUBJECTS = ["data", "systems", "network", "algorithm", "database", "security", "learning", "graphics",
+            "compiler", "robotics", "statistics", "calculus", "physics", "chemistry", "biology", "economics"]
+WORDS = ["introduction", "advanced", "applied", "theory", "practice", "design", "analysis", "modern",
+         "foundations", "principles", "methods", "engineering", "science", "management", "research"]
+FILLER = [f"word{i}" for i in range(5000)]
+CATEGORIES = [f"category-{i}" for i in range(12)]
+LEVELS = ["beginner", "intermediate", "advanced"]
+
+
+def seed(engine, rows: int):
+    models.Base.metadata.create_all(engine)
+    search.create_search_index(engine)
+    rng = random.Random(0)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            subject = rng.choice(SUBJECTS)
+            batch.append({
+                "id": str(uuid.uuid4()),
+                "code": f"{subject[:3].upper()}{i:06d}",
+                "title": f"{rng.choice(WORDS).title()} {subject.title()} {rng.choice(WORDS).title()}",
+                "description": " ".join(rng.choice(FILLER) for _ in range(40)) + f" {subject}",
+                "tags_json": f'["{subject}", "{rng.choice(WORDS)}"]',
+                "learning_outcomes": " ".join(rng.choice(FILLER) for _ in range(10)),
+                "category": rng.choice(CATEGORIES),
+                "level": rng.choice(LEVELS),
+                "course_type": "lecture",
+                "duration": "12 weeks",
+                "instructor_id": "bench",
+                "is_published": rng.random() < 0.9,
+            })
+            if len(batch) == 5000:
+                conn.execute(insert(models.Course), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(models.Course), batch)
+
+
+QUERIES = [
+    ("common word", "data", {}),
+    ("common + category", "data", {"category": CATEGORIES[2]}),
+    ("common + category + level", "data", {"category": CATEGORIES[2], "level": "advanced"}),
+    ("two words", "advanced database", {}),
+    ("prefix (as you type)", "netw", {}),
+    ("rare word", "word4242", {}),
+    ("course code", "DAT000123", {}),
+    ("no match", "zzzzqqq", {}),
+]
+
+
+async def run_fts(url: str, repeat: int):
+    engine = make_async_engine(url)
+    async with AsyncSession(engine) as db:
+        for label, text, filters in QUERIES:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                hits = await search.search_courses(db, text, limit=20, **filters)
+                timings.append(time.perf_counter() - started)
+            print(f"FTS5   {label:<28} hits={len(hits):>3} median={statistics.median(timings) * 1000:8.2f}ms")
+    await engine.dispose()
+
+
+def run_like(engine, repeat: int):
+    with engine.connect() as conn:
+        for label, text, _ in QUERIES[:1] + QUERIES[5:6]:
+            pattern = f"%{text}%"
+            query = select(models.Course).where(or_(
+                models.Course.title.ilike(pattern), models.Course.code.ilike(pattern),
+                models.Course.description.ilike(pattern),
+            )).limit(20)
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                conn.execute(query).all()
+                timings.append(time.perf_counter() - started)
+            print(f"LIKE   {label:<28}          median={statistics.median(timings) * 1000:8.2f}ms")
+
+
+def main(rows: int, repeat: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='search_bench_'), 'courses.db')}"
+    engine = make_engine(url)
+    started = time.perf_counter()
+    seed(engine, rows)
+    print(f"seeded {rows} courses (with FTS triggers) in {time.perf_counter() - started:.1f}s")
+    asyncio.run(run_fts(url, repeat))
+    run_like(engine, repeat)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
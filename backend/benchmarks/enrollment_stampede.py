@@ -0,0 +1,115 @@
+"""
+Registration-day load test for POST /api/courses/{id}/enroll.
+
+Starts the real createCourse app against a temporary courses.db, creates
+one course capped at --seats, then fires --students distinct students at
+it, each sending --attempts concurrent enroll requests, all at once
+through httpx's ASGI transport. Afterwards it checks the database:
+
+  * exactly min(seats, students) enrollments exist
+  * no (course_id, student_id) pair appears twice
+  * courses.enrolled_count matches the number of rows
+
+and prints the status-code tally and throughput. Exits non-zero if any
+check fails.
+
+Run from the backend directory:
+    python -m benchmarks.enrollment_stampede --students 2000 --seats 150 --attempts 2
+"""
+
+import argparse
+import asyncio
+import collections
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from jose import jwt
+from sqlalchemy import func, insert, select
+
+# createCourse is its own top-level `app` package, and its database URL is
+# relative to the working directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+os.chdir(tempfile.mkdtemp(prefix="enrollment_bench_"))
+
+from app import models  # noqa: E402
+from app.auth_utils import ALGORITHM, SECRET_KEY  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def token(student_id: str) -> str:
+    expires = datetime.now(timezone.utc) + timedelta(hours=1)
+    return jwt.encode({"sub": student_id, "role": "student", "exp": expires}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def create_course(seats: int) -> str:
+    course_id = str(uuid.uuid4())
+    with engine.begin() as conn:
+        conn.execute(insert(models.Course), [{
+            "id": course_id, "code": "STAMPEDE", "title": "Capped course", "course_type": "normal",
+            "duration": "12", "instructor_id": "bench", "is_published": True, "max_students": seats,
+        }])
+    return course_id
+
+
+async def stampede(course_id: str, students: int, attempts: int) -> collections.Counter:
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits, timeout=None) as client:
+        async def enroll(headers):
+            return (await client.post(f"/api/courses/{course_id}/enroll", headers=headers)).status_code
+
+        requests = [
+            enroll({"Authorization": f"Bearer {token(f'student-{i}')}"})
+            for i in range(students) for _ in range(attempts)
+        ]
+        return collections.Counter(await asyncio.gather(*requests))
+
+
+def check(course_id: str, expected: int) -> list:
+    failures = []
+    with engine.connect() as conn:
+        rows = conn.scalar(select(func.count()).where(models.Enrollment.course_id == course_id))
+        pairs = conn.scalar(
+            select(func.count(func.distinct(models.Enrollment.student_id))).where(models.Enrollment.course_id == course_id)
+        )
+        counter = conn.scalar(select(models.Course.enrolled_count).where(models.Course.id == course_id))
+    if rows != expected:
+        failures.append(f"{rows} enrollments, expected {expected}")
+    if pairs != rows:
+        failures.append(f"{rows - pairs} duplicate enrollments")
+    if counter != rows:
+        failures.append(f"enrolled_count={counter} but {rows} rows")
+    return failures
+
+
+def main(students: int, seats: int, attempts: int):
+    course_id = create_course(seats)
+    started = time.perf_counter()
+    statuses = asyncio.run(stampede(course_id, students, attempts))
+    elapsed = time.perf_counter() - started
+    total = students * attempts
+    print(f"{total} requests in {elapsed:.2f}s ({total / elapsed:.0f} req/s): "
+          + ", ".join(f"{code}={n}" for code, n in sorted(statuses.items())))
+    failures = check(course_id, min(seats, students))
+    if statuses[201] != min(seats, students):
+        failures.append(f"{statuses[201]} requests got 201")
+    for failure in failures:
+        print("FAIL:", failure)
+    if failures:
+        sys.exit(1)
+    print("OK: no duplicates, no overshoot")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--seats", type=int, default=150)
+    parser.add_argument("--attempts", type=int, default=2, help="concurrent requests per student")
+    args = parser.parse_args()
+    main(args.students, args.seats, args.attempts)
@@ -0,0 +1,101 @@
+"""
+Catalogue facet counts: GROUP BY per request vs the course_facet_counts table.
+
+Seeds --rows courses and times both ways of producing the counts that the
+student catalogue shows next to its filters:
+
+  * five GROUP BY queries over the published courses, once per page view
+  * one read of the incrementally maintained counter table
+    (crud.get_facet_counts), after crud.rebuild_facet_counts fills it
+
+Run from the backend directory:
+    python -m benchmarks.facet_counts --rows 100000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# createCourse is its own top-level `app` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+
+from app import crud, models  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+
+def seed(engine, rows: int):
+    models.Base.metadata.create_all(engine)
+    rng = random.Random(0)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            batch.append({
+                "id": str(uuid.uuid4()), "code": f"C{i:06d}", "title": f"Course {i}",
+                "category": f"category-{rng.randrange(12)}", "department": f"department-{rng.randrange(40)}",
+                "level": rng.choice(["beginner", "intermediate", "advanced"]),
+                "course_type": rng.choice(["lecture", "lab", "seminar"]),
+                "duration": f"{rng.choice([4, 8, 12, 16])} weeks",
+                "instructor_id": "bench", "is_published": rng.random() < 0.8,
+            })
+            if len(batch) == 10000:
+                conn.execute(insert(models.Course), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(models.Course), batch)
+
+
+async def group_by_counts(db: AsyncSession) -> dict:
+    counts = {}
+    for facet in crud.FACETS:
+        column = getattr(models.Course, facet)
+        rows = await db.execute(
+            select(column, func.count()).where(models.Course.is_published == True, column.isnot(None)).group_by(column)
+        )
+        counts[facet] = dict(rows.all())
+    return counts
+
+
+async def timed(fn, db, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn(db)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+async def run(url: str, repeat: int):
+    engine = make_async_engine(url)
+    async with AsyncSession(engine) as db:
+        started = time.perf_counter()
+        counter_counts = await crud.rebuild_facet_counts(db)
+        print(f"rebuild_facet_counts        {(time.perf_counter() - started) * 1000:8.2f}ms (one-off)")
+        assert counter_counts == await group_by_counts(db)
+        print(f"GROUP BY on every request   {await timed(group_by_counts, db, repeat):8.2f}ms")
+        print(f"counter table read          {await timed(crud.get_facet_counts, db, repeat):8.2f}ms")
+    await engine.dispose()
+
+
+def main(rows: int, repeat: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='facet_bench_'), 'courses.db')}"
+    engine = make_engine(url)
+    seed(engine, rows)
+    engine.dispose()
+    asyncio.run(run(url, repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
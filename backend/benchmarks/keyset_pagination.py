@@ -0,0 +1,83 @@
+"""
+Deep-page latency: offset(skip).limit(n) vs keyset cursors.
+
+Seeds a courses-like table and times one page fetch at increasing depths
+using both strategies. The keyset query is exactly what
+shared.pagination.keyset builds, backed by the (created_at, id) index.
+
+Run from the backend directory:
+    python -m benchmarks.keyset_pagination --rows 200000 --page-size 50
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, Index, MetaData, String, Table, insert, select
+
+from shared.db import make_engine
+from shared.pagination import encode_cursor, keyset
+
+metadata = MetaData()
+courses = Table(
+    "bench_courses", metadata,
+    Column("id", String, primary_key=True),
+    Column("title", String, nullable=False),
+    # same text form SQLite writes for server_default=func.now()
+    Column("created_at", String, nullable=False),
+    Index("ix_bench_courses_created_id", "created_at", "id"),
+)
+
+ORDER = (courses.c.created_at, courses.c.id)
+
+
+def seed(engine, rows: int):
+    metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            # several rows per second so ties on created_at are exercised
+            batch.append({"id": str(uuid.uuid4()), "title": f"course-{i}", "created_at": (start + timedelta(seconds=i // 4)).strftime("%Y-%m-%d %H:%M:%S")})
+            if len(batch) == 10000:
+                conn.execute(insert(courses), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(courses), batch)
+
+
+def timed(conn, query, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(query).all()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(rows: int, page_size: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='keyset_bench_'), 'bench.db')}"
+    engine = make_engine(url)
+    seed(engine, rows)
+
+    with engine.connect() as conn:
+        print(f"{'depth':>10} {'offset ms':>10} {'keyset ms':>10}")
+        for depth in (0, rows // 100, rows // 10, rows // 2, rows - page_size):
+            offset_query = select(courses).order_by(*ORDER).offset(depth).limit(page_size)
+            # the cursor a client would hold after reading `depth` rows
+            last = conn.execute(select(courses.c.created_at, courses.c.id).order_by(*ORDER).offset(max(depth - 1, 0)).limit(1)).one()
+            cursor = encode_cursor(list(last)) if depth else None
+            keyset_query = keyset(select(courses), ORDER, cursor=cursor, limit=page_size)
+            print(f"{depth:>10} {timed(conn, offset_query) * 1000:>10.2f} {timed(conn, keyset_query) * 1000:>10.2f}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+    main(args.rows, args.page_size)
@@ -0,0 +1,130 @@
+"""
+Paged lesson blocks: time to first screen and payload size.
+
+Seeds one lesson of --blocks content blocks, every fourth a media block
+with a relative upload path, then times:
+
+  * full, rewrite on read - the whole lesson with media URLs made absolute
+                            per request (the GET before this change)
+  * full                  - the whole lesson, URLs already stored absolute
+  * first page            - GET .../blocks?limit=--limit
+  * all pages             - following next_cursor to the end
+
+Run from the backend directory:
+    python -m benchmarks.lesson_blocks --blocks 800 --limit 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# module_lesson modules import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "module_lesson"))
+
+import crud  # noqa: E402
+from database import Base  # noqa: E402
+from lesson_blocks import MEDIA_TYPES, get_block_page, media_url, resolve_media_urls  # noqa: E402
+from models.lessons import Lesson  # noqa: E402
+from models.modules import Module  # noqa: E402
+from schemas import LessonResponse  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+
+def seed(url: str, blocks: int) -> str:
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    module_id, lesson_id = str(uuid.uuid4()), str(uuid.uuid4())
+    with engine.begin() as conn:
+        conn.execute(insert(Module), [{"id": module_id, "title": "Bench", "course_id": "bench"}])
+        conn.execute(insert(Lesson), [{
+            "id": lesson_id, "module_id": module_id, "title": "Lesson", "order": 1,
+            "contentBlocks": [{"type": "image", "content": f"uploads/{b}.png"} if b % 4 == 0 else
+                              {"type": "text", "title": f"Block {b}", "content": "lorem ipsum " * 40}
+                              for b in range(blocks)],
+            "quizQuestions": [],
+            "discussion": {"enabled": True},
+            "progressSettings": {"completion": True, "timeSpent": True, "quizScore": True},
+            "accessibility": {"darkMode": False, "fontSize": "medium", "transcriptEnabled": False},
+            "feedbackSettings": {"ratings": True, "reviews": True},
+        }])
+    engine.dispose()
+    return lesson_id
+
+
+def rewrite_on_read(lesson: dict) -> dict:
+    blocks = []
+    for block in lesson["contentBlocks"]:
+        block = block.copy()
+        content = block.get("content")
+        if content and block.get("type") in MEDIA_TYPES and not content.startswith("http"):
+            block["content"] = media_url(content)
+        blocks.append(block)
+    return {**lesson, "contentBlocks": blocks}
+
+
+async def timed(fn, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, len(body)
+
+
+async def run(url: str, lesson_id: str, limit: int, repeat: int):
+    engine = make_async_engine(url)
+    async with AsyncSession(engine) as db:
+
+        async def full_rewrite():
+            lesson = rewrite_on_read(await crud.get_lesson(db, lesson_id))
+            return LessonResponse.model_validate(lesson).model_dump_json().encode()
+
+        async def full():
+            lesson = await crud.get_lesson(db, lesson_id)
+            return LessonResponse.model_validate(lesson).model_dump_json().encode()
+
+        async def first_page():
+            page = await get_block_page(db, lesson_id, limit=limit)
+            return page.model_dump_json().encode()
+
+        async def all_pages():
+            size, cursor = 0, None
+            while True:
+                page = await get_block_page(db, lesson_id, cursor=cursor, limit=limit)
+                size += len(page.model_dump_json())
+                cursor = page.next_cursor
+                if cursor is None:
+                    return b" " * size
+
+        ms, size = await timed(full_rewrite, repeat)
+        print(f"{'full, rewrite on read':22} {ms:9.2f}ms {size / 1024:10.1f} KiB")
+        # what a write now does once
+        await resolve_media_urls(db, [lesson_id])
+        await db.commit()
+        for name, fn in (("full", full), ("first page", first_page), ("all pages", all_pages)):
+            ms, size = await timed(fn, repeat)
+            print(f"{name:22} {ms:9.2f}ms {size / 1024:10.1f} KiB")
+    await engine.dispose()
+
+
+def main(blocks: int, limit: int, repeat: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='blocks_bench_'), 'module_service.db')}"
+    lesson_id = seed(url, blocks)
+    asyncio.run(run(url, lesson_id, limit, repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=800)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    main(args.blocks, args.limit, args.repeat)
@@ -0,0 +1,122 @@
+"""
+Sparse fieldsets on lesson reads: payload size and latency.
+
+Seeds a module with --lessons lessons of --blocks content blocks each,
+plus a long accessibility transcript, then times the module's lesson
+list and a single lesson:
+
+  * full   - every column loaded, decoded and serialized (no ?fields=)
+  * sparse - ?fields=title,order: load_only() keeps the JSON columns out
+             of the SELECT, and only id, title and order are serialized
+
+Run from the backend directory:
+    python -m benchmarks.lesson_fields --lessons 60 --blocks 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# module_lesson modules import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "module_lesson"))
+
+import crud  # noqa: E402
+from database import Base  # noqa: E402
+from fields import pick  # noqa: E402
+from models.lessons import Lesson  # noqa: E402
+from models.modules import Module  # noqa: E402
+from schemas import LessonResponse  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+SPARSE = ["id", "title", "order"]
+
+_lessons_json = TypeAdapter(list[LessonResponse])
+
+
+def seed(url: str, lessons: int, blocks: int) -> tuple:
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    module_id = str(uuid.uuid4())
+    lesson_ids = [str(uuid.uuid4()) for _ in range(lessons)]
+    with engine.begin() as conn:
+        conn.execute(insert(Module), [{"id": module_id, "title": "Bench", "course_id": "bench"}])
+        conn.execute(insert(Lesson), [{
+            "id": lesson_id, "module_id": module_id, "title": f"Lesson {i}", "order": i + 1,
+            "contentBlocks": [{"type": "text", "title": f"Block {b}", "content": "lorem ipsum " * 40}
+                              for b in range(blocks)],
+            "quizQuestions": [{"id": q, "question": "q" * 200, "options": ["a", "b"], "correctAnswer": 0}
+                              for q in range(10)],
+            "discussion": {"enabled": True},
+            "progressSettings": {"completion": True, "timeSpent": True, "quizScore": True},
+            "accessibility": {"darkMode": False, "fontSize": "medium", "transcriptEnabled": True,
+                              "transcriptText": "transcript " * 2000},
+            "feedbackSettings": {"ratings": True, "reviews": True},
+        } for i, lesson_id in enumerate(lesson_ids)])
+    engine.dispose()
+    return module_id, lesson_ids[0]
+
+
+async def timed(fn, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, len(body)
+
+
+async def run(url: str, module_id: str, lesson_id: str, repeat: int):
+    engine = make_async_engine(url)
+    async with AsyncSession(engine) as db:
+
+        async def list_full():
+            db.expunge_all()
+            lessons = await crud.get_lessons_by_module(db, module_id)
+            return _lessons_json.dump_json(_lessons_json.validate_python(lessons, from_attributes=True))
+
+        async def list_sparse():
+            db.expunge_all()
+            lessons = await crud.get_lessons_by_module(db, module_id, fields=SPARSE)
+            return json.dumps(jsonable_encoder([pick(lesson, SPARSE) for lesson in lessons])).encode()
+
+        async def one_full():
+            db.expunge_all()
+            lesson = await crud.get_lesson(db, lesson_id)
+            return LessonResponse.model_validate(lesson).model_dump_json().encode()
+
+        async def one_sparse():
+            db.expunge_all()
+            lesson = await crud.get_lesson(db, lesson_id, fields=SPARSE)
+            return json.dumps(jsonable_encoder(lesson)).encode()
+
+        for name, fn in (("list full", list_full), ("list sparse", list_sparse),
+                         ("lesson full", one_full), ("lesson sparse", one_sparse)):
+            ms, size = await timed(fn, repeat)
+            print(f"{name:14} {ms:9.2f}ms {size / 1024:10.1f} KiB")
+    await engine.dispose()
+
+
+def main(lessons: int, blocks: int, repeat: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='fields_bench_'), 'module_service.db')}"
+    module_id, lesson_id = seed(url, lessons, blocks)
+    asyncio.run(run(url, module_id, lesson_id, repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lessons", type=int, default=60)
+    parser.add_argument("--blocks", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    main(args.lessons, args.blocks, args.repeat)
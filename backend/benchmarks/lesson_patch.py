@@ -0,0 +1,125 @@
+"""
+Editing one paragraph of a large lesson: full PUT vs JSON-patch.
+
+Seeds a lesson with --blocks content blocks and compares
+
+  * put   - crud.update_lesson with the whole contentBlocks list, as the
+            editor sent it before (validate, re-encode, rewrite the column)
+  * patch - lesson_patch.patch_lesson with a single replace of one block's
+            content, applied in place with json_replace
+
+reporting request body size and latency. It then sends --concurrent
+patches based on the same updated_at at once and checks that exactly
+one of them wins and the rest get a conflict.
+
+Run from the backend directory:
+    python -m benchmarks.lesson_patch --blocks 500
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# module_lesson modules import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "module_lesson"))
+
+import crud  # noqa: E402
+from database import Base  # noqa: E402
+from lesson_patch import PatchConflict, patch_lesson  # noqa: E402
+from models.lessons import Lesson  # noqa: E402
+from models.modules import Module  # noqa: E402
+from schemas import LessonPatch, LessonUpdate, PatchOperation  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+
+def seed(url: str, blocks: int) -> str:
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    module_id, lesson_id = str(uuid.uuid4()), str(uuid.uuid4())
+    with engine.begin() as conn:
+        conn.execute(insert(Module), [{"id": module_id, "title": "Bench", "course_id": "bench"}])
+        conn.execute(insert(Lesson), [{
+            "id": lesson_id, "module_id": module_id, "title": "Big lesson",
+            "contentBlocks": [{"type": "text", "title": f"Block {b}", "content": "lorem ipsum " * 60}
+                              for b in range(blocks)],
+        }])
+    engine.dispose()
+    return lesson_id
+
+
+async def current_version(engine, lesson_id: str):
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        return await db.scalar(select(Lesson.updated_at).where(Lesson.id == lesson_id))
+
+
+async def run(url: str, lesson_id: str, blocks: int, repeat: int, concurrent: int):
+    engine = make_async_engine(url)
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        lesson = await crud.get_lesson_instance(db, lesson_id)
+        content = [dict(block) for block in lesson.contentBlocks]
+
+    timings = {"put": [], "patch": []}
+    sizes = {}
+    for n in range(repeat):
+        target = n % blocks
+        content[target]["content"] = f"edit {n} " * 60
+        body = LessonUpdate(contentBlocks=content).model_dump_json(exclude_unset=True)
+        sizes["put"] = len(body)
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            started = time.perf_counter()
+            await crud.update_lesson(db, lesson_id, LessonUpdate.model_validate_json(body))
+            timings["put"].append(time.perf_counter() - started)
+
+        version = await current_version(engine, lesson_id)
+        body = LessonPatch(updated_at=version, operations=[PatchOperation(
+            op="replace", path=f"/contentBlocks/{target}/content", value=f"patch {n} " * 60,
+        )]).model_dump_json()
+        sizes["patch"] = len(body)
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            started = time.perf_counter()
+            data = LessonPatch.model_validate_json(body)
+            await patch_lesson(db, lesson_id, data.updated_at, data.operations)
+            timings["patch"].append(time.perf_counter() - started)
+
+    for name in ("put", "patch"):
+        print(f"{name:6} {statistics.median(timings[name]) * 1000:8.2f}ms  request body {sizes[name] / 1024:8.1f} KiB")
+
+    version = await current_version(engine, lesson_id)
+
+    async def one(n):
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            try:
+                await patch_lesson(db, lesson_id, version, [PatchOperation(
+                    op="replace", path="/contentBlocks/0/title", value=f"writer {n}",
+                )])
+                return "ok"
+            except PatchConflict:
+                return "conflict"
+
+    outcomes = await asyncio.gather(*(one(n) for n in range(concurrent)))
+    print(f"{concurrent} concurrent patches from one version: "
+          f"{outcomes.count('ok')} applied, {outcomes.count('conflict')} conflicts")
+    await engine.dispose()
+
+
+def main(blocks: int, repeat: int, concurrent: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='patch_bench_'), 'module_service.db')}"
+    lesson_id = seed(url, blocks)
+    asyncio.run(run(url, lesson_id, blocks, repeat, concurrent))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--concurrent", type=int, default=8)
+    args = parser.parse_args()
+    main(args.blocks, args.repeat, args.concurrent)
@@ -0,0 +1,97 @@
+"""
+Login throughput benchmark for the auth service.
+
+Fires concurrent POST /auth/login requests at the app in-process and reports
+logins/sec and latency percentiles, once with bcrypt in the Starlette
+threadpool (HASH_POOL_WORKERS=0, the old behaviour) and once with the bcrypt
+process pool.
+
+Run from the backend directory:
+    python -m benchmarks.login_throughput --requests 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+_tmp_dir = tempfile.mkdtemp(prefix="login_bench_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp_dir}/bench.db")
+
+import httpx  # noqa: E402
+
+from app import backend_auth_utilities as auth_utils  # noqa: E402
+from app.main import app  # noqa: E402
+
+REG_NUMBER = "BENCH/0001"
+PASSWORD = "bench-password"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_mode(label: str, workers: int, total: int, concurrency: int):
+    auth_utils.shutdown_hash_pool()
+    auth_utils.HASH_POOL_WORKERS = workers
+    # the benchmark measures throughput, so never shed load here
+    auth_utils.HASH_POOL_MAX_PENDING = total + concurrency
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # warm up the pool workers and the DB connection
+        await client.post("/auth/login", json={"registrationNumber": REG_NUMBER, "password": PASSWORD})
+
+        latencies = []
+        failures = 0
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one_login():
+            nonlocal failures
+            async with gate:
+                started = time.perf_counter()
+                resp = await client.post(
+                    "/auth/login",
+                    json={"registrationNumber": REG_NUMBER, "password": PASSWORD},
+                )
+                latencies.append(time.perf_counter() - started)
+                if resp.status_code != 200:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_login() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    print(
+        f"{label:<14} workers={workers:<3} logins/sec={total / elapsed:8.1f} "
+        f"p50={statistics.median(latencies) * 1000:8.1f}ms "
+        f"p99={percentile(latencies, 99) * 1000:8.1f}ms failures={failures}"
+    )
+
+
+async def main(total: int, concurrency: int, workers: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/auth/register", json={
+            "first_name": "Bench",
+            "last_name": "User",
+            "registrationNumber": REG_NUMBER,
+            "password": PASSWORD,
+        })
+
+    await run_mode("threadpool", 0, total, concurrency)
+    await run_mode("process pool", workers, total, concurrency)
+    auth_utils.shutdown_hash_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.workers))
@@ -0,0 +1,118 @@
+"""
+Enrollment eligibility: precomputed closure vs a recursive query per request.
+
+Seeds a layered prerequisite DAG (--layers deep, --width courses per
+layer, each course requiring --fanout courses of the layer below) plus a
+student who has completed the bottom half of it, then times the
+eligibility check for a course in the top layer:
+
+  * recursive - WITH RECURSIVE walk of course_prerequisites, then the
+                completed-course anti-join (what each request would cost
+                without the closure table)
+  * closure   - prerequisites.missing_prerequisites: one indexed anti-join
+                of course_prerequisite_closure
+
+Run from the backend directory:
+    python -m benchmarks.prerequisite_check --layers 8 --width 150
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# createCourse is its own top-level `app` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+
+from app import models, prerequisites  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+RECURSIVE_MISSING = text("""
+    WITH RECURSIVE reach(required_id) AS (
+        SELECT prerequisite_id FROM course_prerequisites WHERE course_id = :course_id
+        UNION
+        SELECT edge.prerequisite_id FROM reach JOIN course_prerequisites AS edge ON edge.course_id = reach.required_id
+    )
+    SELECT courses.code FROM reach JOIN courses ON courses.id = reach.required_id
+    WHERE reach.required_id NOT IN (
+        SELECT course_id FROM enrollments WHERE student_id = :student_id AND completed = 1
+    )
+    ORDER BY courses.code
+""")
+
+
+def seed(url: str, layers: int, width: int, fanout: int):
+    engine = make_engine(url)
+    models.Base.metadata.create_all(engine)
+    rng = random.Random(0)
+    grid = [[str(uuid.uuid4()) for _ in range(width)] for _ in range(layers)]
+    with engine.begin() as conn:
+        conn.execute(insert(models.Course), [{
+            "id": course_id, "code": f"L{layer:02d}-{i:04d}", "title": course_id, "course_type": "normal",
+            "duration": "12", "instructor_id": "bench", "is_published": True,
+        } for layer, row in enumerate(grid) for i, course_id in enumerate(row)])
+        conn.execute(insert(models.CoursePrerequisite), [
+            {"course_id": course_id, "prerequisite_id": p}
+            for layer in range(1, layers) for course_id in grid[layer]
+            for p in rng.sample(grid[layer - 1], fanout)
+        ])
+        conn.execute(insert(models.Enrollment), [{
+            "id": str(uuid.uuid4()), "course_id": course_id, "student_id": "bench-student", "completed": True,
+        } for row in grid[: layers // 2] for course_id in row])
+    engine.dispose()
+    return grid[-1][0]
+
+
+async def timed(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+async def run(url: str, course_id: str, repeat: int):
+    engine = make_async_engine(url)
+    async with AsyncSession(engine) as db:
+        started = time.perf_counter()
+        await prerequisites.rebuild_closure(db)
+        rows = await db.scalar(select(func.count()).select_from(models.CoursePrerequisiteClosure))
+        print(f"rebuild_closure      {(time.perf_counter() - started) * 1000:9.2f}ms (one-off, {rows} rows)")
+
+        async def recursive():
+            return list(await db.scalars(RECURSIVE_MISSING, {"course_id": course_id, "student_id": "bench-student"}))
+
+        async def closure():
+            return await prerequisites.missing_prerequisites(db, course_id, "bench-student")
+
+        missing = await closure()
+        assert missing == await recursive()
+        print(f"required courses not yet completed: {len(missing)}")
+        print(f"recursive per request {await timed(recursive, repeat):8.2f}ms")
+        print(f"closure lookup        {await timed(closure, repeat):8.2f}ms")
+    await engine.dispose()
+
+
+def main(layers: int, width: int, fanout: int, repeat: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='prereq_bench_'), 'courses.db')}"
+    course_id = seed(url, layers, width, fanout)
+    asyncio.run(run(url, course_id, repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--layers", type=int, default=8)
+    parser.add_argument("--width", type=int, default=150)
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.layers, args.width, args.fanout, args.repeat)
@@ -0,0 +1,124 @@
+"""
+Lesson drag-and-drop: per-lesson SELECTs vs one CASE-based bulk UPDATE.
+
+Seeds a module with --lessons lessons and reverses their order with
+
+  * per-lesson - the previous reorder_lessons: a SELECT per lesson to set a
+                 temporary order of -1, then another SELECT per lesson for
+                 the final order (2N queries plus the flushed UPDATEs)
+  * bulk       - crud.reorder_lessons: UPDATE ... SET order = CASE id ...
+
+counting the statements each one sends. It then fires --concurrent
+reorders of the same module at once (each a different permutation) and
+checks that the final order is exactly one of them, i.e. no two requests
+were interleaved.
+
+Run from the backend directory:
+    python -m benchmarks.reorder_lessons --lessons 60
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# module_lesson modules import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "module_lesson"))
+
+import crud  # noqa: E402
+from database import Base  # noqa: E402
+from models.lessons import Lesson  # noqa: E402
+from models.modules import Module  # noqa: E402
+from schemas import LessonReorderItem  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+
+def seed(url: str, lessons: int) -> tuple:
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    module_id = str(uuid.uuid4())
+    ids = [str(uuid.uuid4()) for _ in range(lessons)]
+    with engine.begin() as conn:
+        conn.execute(insert(Module), [{"id": module_id, "title": "Bench", "course_id": "bench"}])
+        conn.execute(insert(Lesson), [
+            {"id": lesson_id, "module_id": module_id, "title": f"Lesson {i}", "order": i + 1}
+            for i, lesson_id in enumerate(ids)
+        ])
+    engine.dispose()
+    return module_id, ids
+
+
+async def per_lesson_reorder(db: AsyncSession, module_id: str, lessons_order):
+    for item in lessons_order:
+        lesson = await db.scalar(select(Lesson).where(Lesson.id == item.lesson_id, Lesson.module_id == module_id))
+        if lesson:
+            lesson.order = -1
+    await db.flush()
+    for item in lessons_order:
+        lesson = await db.scalar(select(Lesson).where(Lesson.id == item.lesson_id, Lesson.module_id == module_id))
+        if lesson:
+            lesson.order = item.order
+    await db.commit()
+    return True
+
+
+def as_items(ids):
+    return [LessonReorderItem(lesson_id=lesson_id, order=i + 1) for i, lesson_id in enumerate(ids)]
+
+
+async def final_order(engine, module_id: str) -> list:
+    async with AsyncSession(engine) as db:
+        return list(await db.scalars(select(Lesson.id).where(Lesson.module_id == module_id).order_by(Lesson.order)))
+
+
+async def run(url: str, module_id: str, ids: list, repeat: int, concurrent: int):
+    engine = make_async_engine(url)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    for name, reorder in (("per-lesson", per_lesson_reorder), ("bulk", crud.reorder_lessons)):
+        timings = []
+        for n in range(repeat):
+            target = ids[::-1] if n % 2 == 0 else ids
+            statements.clear()
+            async with AsyncSession(engine) as db:
+                started = time.perf_counter()
+                await reorder(db, module_id, as_items(target))
+                timings.append(time.perf_counter() - started)
+            assert await final_order(engine, module_id) == target
+        print(f"{name:11} {statistics.median(timings) * 1000:8.2f}ms  {len(statements)} statements")
+
+    rng = random.Random(0)
+    permutations = [rng.sample(ids, len(ids)) for _ in range(concurrent)]
+
+    async def one(permutation):
+        async with AsyncSession(engine) as db:
+            await crud.reorder_lessons(db, module_id, as_items(permutation))
+
+    await asyncio.gather(*(one(p) for p in permutations))
+    final = await final_order(engine, module_id)
+    print(f"{concurrent} concurrent reorders: final order is one of them -> {final in permutations}")
+    await engine.dispose()
+
+
+def main(lessons: int, repeat: int, concurrent: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='reorder_bench_'), 'module_service.db')}"
+    module_id, ids = seed(url, lessons)
+    asyncio.run(run(url, module_id, ids, repeat, concurrent))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lessons", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--concurrent", type=int, default=8)
+    args = parser.parse_args()
+    main(args.lessons, args.repeat, args.concurrent)
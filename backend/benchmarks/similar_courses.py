@@ -0,0 +1,108 @@
+"""
+Similar-course batch job: full build vs incremental refresh.
+
+Seeds --rows published courses with synthetic titles, descriptions and
+tags drawn from a few dozen subjects, then:
+
+  1. runs app.build_similar with --full
+  2. edits --changes courses (and unpublishes one) and runs it
+     incrementally
+  3. runs a fresh full build on a copy of the database and reports how
+     many top-k lists the incremental run got exactly right
+
+Run from the backend directory:
+    python -m benchmarks.similar_courses --rows 5000 --changes 10
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import uuid
+
+from sqlalchemy import insert, select, update
+
+# createCourse is its own top-level `app` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+
+from app import models  # noqa: E402
+from app.build_similar import build_similar  # noqa: E402
+from shared.db import make_engine  # noqa: E402
+
+SUBJECTS = [
+    "algebra", "calculus", "statistics", "databases", "networks", "compilers", "robotics", "genetics",
+    "ecology", "chemistry", "optics", "mechanics", "accounting", "marketing", "finance", "economics",
+    "philosophy", "history", "linguistics", "poetry", "painting", "music", "theatre", "law",
+    "psychology", "sociology", "nursing", "anatomy", "geology", "astronomy", "architecture", "design",
+]
+WORDS = ["theory", "practice", "methods", "advanced", "applied", "modern", "foundations", "systems", "analysis", "lab"]
+
+
+def course_text(rng: random.Random):
+    main, other = rng.sample(SUBJECTS, 2)
+    title = f"{rng.choice(WORDS).title()} {main.title()} {rng.choice(WORDS)}"
+    description = " ".join(rng.choice([main] * 4 + [other] * 2 + WORDS) for _ in range(40))
+    return {
+        "title": title, "description": description, "tags_json": json.dumps([main, other]),
+        "category": main, "department": f"dept-{SUBJECTS.index(main) // 4}",
+    }
+
+
+def seed(engine, rows: int):
+    models.Base.metadata.create_all(engine)
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Course), [{
+            "id": str(uuid.uuid4()), "code": f"C{i:06d}", "course_type": "normal", "duration": "12",
+            "instructor_id": "bench", "is_published": True, **course_text(rng),
+        } for i in range(rows)])
+
+
+def lists(engine) -> dict:
+    with engine.connect() as conn:
+        result = {}
+        for course_id, similar_id in conn.execute(
+            select(models.CourseSimilar.course_id, models.CourseSimilar.similar_id)
+            .order_by(models.CourseSimilar.course_id, models.CourseSimilar.rank)
+        ):
+            result.setdefault(course_id, []).append(similar_id)
+        return result
+
+
+def main(rows: int, changes: int):
+    directory = tempfile.mkdtemp(prefix="similar_bench_")
+    path = os.path.join(directory, "courses.db")
+    engine = make_engine(f"sqlite:///{path}")
+    seed(engine, rows)
+    print("full       ", build_similar(engine, full=True))
+
+    rng = random.Random(1)
+    with engine.begin() as conn:
+        ids = conn.scalars(select(models.Course.id).order_by(models.Course.id)).all()
+        picked = rng.sample(ids, changes + 1)
+        for course_id in picked[:-1]:
+            conn.execute(update(models.Course).where(models.Course.id == course_id).values(**course_text(rng)))
+        conn.execute(update(models.Course).where(models.Course.id == picked[-1]).values(is_published=False))
+    print("incremental", build_similar(engine))
+
+    incremental = lists(engine)
+    engine.dispose()
+    copy = os.path.join(directory, "fresh.db")
+    shutil.copy(path, copy)
+    fresh_engine = make_engine(f"sqlite:///{copy}")
+    print("fresh full ", build_similar(fresh_engine, full=True))
+    fresh = lists(fresh_engine)
+    fresh_engine.dispose()
+    same = sum(incremental.get(course_id) == neighbours for course_id, neighbours in fresh.items())
+    print(f"incremental lists identical to a fresh full build: {same}/{len(fresh)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--changes", type=int, default=10)
+    args = parser.parse_args()
+    main(args.rows, args.changes)
@@ -0,0 +1,97 @@
+"""
+Mixed read/write throughput on SQLite, before and after the shared engine factory.
+
+Runs the same workload (threads doing point reads, small range scans and
+single-row write transactions) against a bare create_engine("sqlite:///...")
+and against shared.db.make_engine (WAL, synchronous=NORMAL, busy_timeout,
+mmap, cache_size, pooled connections). Reports operations per second and how
+many operations failed with "database is locked".
+
+Run from the backend directory:
+    python -m benchmarks.sqlite_mixed_rw --threads 16 --seconds 5 --write-ratio 0.2
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select, update
+from sqlalchemy.exc import OperationalError
+
+from shared.db import make_engine
+
+metadata = MetaData()
+items = Table(
+    "bench_items", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("counter", Integer, nullable=False, default=0),
+)
+
+ROWS = 10000
+
+
+def seed(engine):
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(items), [{"id": i, "name": f"item-{i}", "counter": 0} for i in range(ROWS)])
+
+
+def run(engine, threads: int, seconds: float, write_ratio: float):
+    ops = [0] * threads
+    locked = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(n: int):
+        rng = random.Random(n)
+        while time.perf_counter() < deadline:
+            try:
+                if rng.random() < write_ratio:
+                    with engine.begin() as conn:
+                        conn.execute(
+                            update(items).where(items.c.id == rng.randrange(ROWS))
+                            .values(counter=items.c.counter + 1)
+                        )
+                else:
+                    start = rng.randrange(ROWS - 50)
+                    with engine.connect() as conn:
+                        conn.execute(select(items).where(items.c.id.between(start, start + 50))).all()
+                ops[n] += 1
+            except OperationalError:
+                locked[n] += 1
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return sum(ops) / elapsed, sum(locked)
+
+
+def main(threads: int, seconds: float, write_ratio: float):
+    tmp_dir = tempfile.mkdtemp(prefix="sqlite_bench_")
+    engines = {
+        "bare create_engine": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        "shared make_engine": lambda url: make_engine(url, pool_size=threads),
+    }
+    for label, factory in engines.items():
+        url = f"sqlite:///{os.path.join(tmp_dir, label.replace(' ', '_'))}.db"
+        engine = factory(url)
+        seed(engine)
+        ops_per_sec, locked = run(engine, threads, seconds, write_ratio)
+        engine.dispose()
+        print(f"{label:<20} ops/sec={ops_per_sec:10.1f} locked_errors={locked}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+    main(args.threads, args.seconds, args.write_ratio)
@@ -0,0 +1,94 @@
+"""
+Peak memory of /courses/all: full list vs streamed export.
+
+For each table size in --sizes, seeds a temporary createCourse database and
+measures peak Python heap and wall time (both under tracemalloc, which
+slows everything down) for:
+
+  * list    - crud.get_all_courses + CourseOut models + one JSON body
+              (what the non-streaming route does)
+  * ndjson  - shared.streaming.stream_query consumed chunk by chunk, as
+              StreamingResponse would send it
+
+Run from the backend directory:
+    python -m benchmarks.streaming_export --sizes 10000 50000 100000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+# createCourse is its own top-level `app` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+
+from app import courses, crud, models, schemas  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+from shared.streaming import stream_query  # noqa: E402
+
+
+def seed(url: str, rows: int):
+    engine = make_engine(url)
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for start in range(0, rows, 10000):
+            conn.execute(insert(models.Course), [{
+                "id": str(uuid.uuid4()), "code": f"C{i:07d}", "title": f"Course {i}",
+                "description": "An introduction to the subject and its methods. " * 8,
+                "category": "category", "level": "bachelor", "course_type": "normal", "duration": "12",
+                "instructor_id": "bench", "is_published": True, "tags_json": '["one", "two"]',
+            } for i in range(start, min(start + 10000, rows))])
+    engine.dispose()
+
+
+async def as_list(Session):
+    async with Session() as db:
+        items = await crud.get_all_courses(db)
+        adapter = TypeAdapter(List[schemas.CourseOut])
+        return len(adapter.dump_json([schemas.CourseOut.model_validate(c) for c in items]))
+
+
+async def as_stream(Session):
+    response = stream_query(Session, crud.all_courses_query(), courses._course_row_json, "ndjson")
+    sent = 0
+    async for chunk in response.body_iterator:
+        sent += len(chunk)
+    return sent
+
+
+async def measure(fn, Session):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = await fn(Session)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+async def run(sizes):
+    for rows in sizes:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='stream_bench_'), 'courses.db')}"
+        seed(url, rows)
+        engine = make_async_engine(url)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        for label, fn in (("list", as_list), ("ndjson", as_stream)):
+            size, elapsed, peak = await measure(fn, Session)
+            print(f"rows={rows:>7} {label:<7} body={size / 1e6:7.1f}MB peak_heap={peak / 1e6:7.1f}MB time={elapsed:6.2f}s")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000])
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes))
@@ -0,0 +1,107 @@
+"""
+Tag filtering and hydration: JSON text column vs the course_tags table.
+
+Seeds --rows published courses with 1-4 tags each, stored both ways, and
+times one catalogue page (limit 50) for a rare and a common tag:
+
+  * json  - LIKE '%"tag"%' over courses.tags, then json.loads per row
+            (the only way to filter before course_tags existed)
+  * table - crud.student_filtered_courses(tag=...), which looks the tag up
+            in the (tag, course_id) key and loads the page's tags with one
+            selectin query
+
+Run from the backend directory:
+    python -m benchmarks.tag_filter --rows 100000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# createCourse is its own top-level `app` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+
+from app import crud, models  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+COMMON = [f"topic-{i}" for i in range(20)]
+RARE = [f"niche-{i}" for i in range(2000)]
+
+
+def seed(engine, rows: int):
+    models.Base.metadata.create_all(engine)
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        for start in range(0, rows, 10000):
+            courses, links = [], []
+            for i in range(start, min(start + 10000, rows)):
+                course_id = str(uuid.uuid4())
+                tags = list(dict.fromkeys(rng.choice(COMMON if rng.random() < 0.7 else RARE) for _ in range(rng.randint(1, 4))))
+                courses.append({
+                    "id": course_id, "code": f"C{i:07d}", "title": f"Course {i}", "course_type": "normal",
+                    "duration": "12", "instructor_id": "bench", "is_published": True, "tags_json": json.dumps(tags),
+                })
+                links.extend({"tag": t, "course_id": course_id, "position": p} for p, t in enumerate(tags))
+            conn.execute(insert(models.Course), courses)
+            conn.execute(insert(models.CourseTag), links)
+        conn.exec_driver_sql("ANALYZE")
+
+
+async def json_page(db: AsyncSession, tag: str):
+    rows = (await db.execute(
+        select(models.Course.__table__)
+        .where(models.Course.is_published == True, models.Course.tags_json.like(f'%"{tag}"%'))
+        .order_by(models.Course.created_at.desc(), models.Course.id.desc())
+        .limit(50)
+    )).all()
+    return [json.loads(row.tags) for row in rows]
+
+
+async def table_page(db: AsyncSession, tag: str):
+    items = await crud.student_filtered_courses(db, None, None, None, None, None, limit=50, tag=tag)
+    db.expunge_all()
+    return [c.tags for c in items]
+
+
+async def timed(fn, db, tag: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn(db, tag)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+async def run(url: str, repeat: int):
+    engine = make_async_engine(url)
+    async with AsyncSession(engine) as db:
+        for label, tag in (("common tag", COMMON[0]), ("rare tag", RARE[0])):
+            for name, fn in (("json", json_page), ("table", table_page)):
+                print(f"{name:<6} {label:<11} median={await timed(fn, db, tag, repeat):8.2f}ms")
+    await engine.dispose()
+
+
+def main(rows: int, repeat: int):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='tag_bench_'), 'courses.db')}"
+    engine = make_engine(url)
+    seed(engine, rows)
+    engine.dispose()
+    asyncio.run(run(url, repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
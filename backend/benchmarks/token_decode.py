@@ -0,0 +1,66 @@
+"""
+Per-request token verification cost, with and without the verified-JWT cache.
+
+Compares what every service used to do on each request (jwt.decode plus a
+fresh TokenData) against a hit in shared.token_cache.VerifiedTokenCache.
+
+Run from the backend directory:
+    python -m benchmarks.token_decode --iterations 20000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from jose import jwt
+from pydantic import BaseModel
+
+from shared.token_cache import VerifiedTokenCache
+
+SECRET_KEY = "your-secret-key-here-change-in-production"
+ALGORITHM = "HS256"
+
+
+class TokenData(BaseModel):
+    sub: Optional[str] = None
+    role: Optional[str] = None
+
+
+def build(payload: dict) -> TokenData:
+    return TokenData(sub=payload.get("sub"), role=payload.get("role"))
+
+
+def time_per_call(fn, token: str, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn(token)
+    return (time.perf_counter() - started) / iterations
+
+
+def main(iterations: int):
+    token = jwt.encode(
+        {"sub": "student-1", "role": "student", "exp": datetime.utcnow() + timedelta(minutes=30)},
+        SECRET_KEY,
+        algorithm=ALGORITHM,
+    )
+
+    def uncached(t: str) -> TokenData:
+        return build(jwt.decode(t, SECRET_KEY, algorithms=[ALGORITHM]))
+
+    cache = VerifiedTokenCache(SECRET_KEY, ALGORITHM, build=build)
+    cache.decode(token)  # first request pays for verification
+
+    before = time_per_call(uncached, token, iterations)
+    after = time_per_call(cache.decode, token, iterations)
+
+    print(f"jwt.decode + TokenData : {before * 1e6:8.2f} us/request")
+    print(f"cache hit              : {after * 1e6:8.2f} us/request")
+    print(f"saved per request      : {(before - after) * 1e6:8.2f} us ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.iterations)
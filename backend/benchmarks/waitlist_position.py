@@ -0,0 +1,93 @@
+"""
+Waitlist position lookups vs queue length.
+
+For each size in --sizes, seeds a full course with that many queued
+students and times waitlist.get_position for the student at the back of
+the line, against the naive COUNT(*) of entries ahead of them. The ticket
+arithmetic should stay flat as the queue grows; the count grows with it.
+
+Run from the backend directory:
+    python -m benchmarks.waitlist_position --sizes 100 10000 200000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# createCourse is its own top-level `app` package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "createCourse"))
+
+from app import models, seats, waitlist  # noqa: E402
+from shared.db import make_async_engine, make_engine  # noqa: E402
+
+
+def seed(url: str, queued: int) -> str:
+    engine = make_engine(url)
+    models.Base.metadata.create_all(engine)
+    seats.prepare_seat_counters(engine)
+    course_id = str(uuid.uuid4())
+    with engine.begin() as conn:
+        conn.execute(insert(models.Course), [{
+            "id": course_id, "code": "FULL", "title": "Full course", "course_type": "normal",
+            "duration": "12", "instructor_id": "bench", "is_published": True, "max_students": 0,
+        }])
+        for start in range(0, queued, 10000):
+            conn.execute(insert(models.WaitlistEntry), [{
+                "id": str(uuid.uuid4()), "course_id": course_id, "student_id": f"student-{i}", "ticket": i + 1,
+            } for i in range(start, min(start + 10000, queued))])
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    return course_id
+
+
+async def count_ahead(db: AsyncSession, course_id: str, student_id: str) -> int:
+    ticket = select(models.WaitlistEntry.ticket).where(
+        models.WaitlistEntry.course_id == course_id, models.WaitlistEntry.student_id == student_id,
+    ).scalar_subquery()
+    return await db.scalar(select(func.count()).where(
+        models.WaitlistEntry.course_id == course_id, models.WaitlistEntry.ticket <= ticket,
+    ))
+
+
+async def timed(fn, *args, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn(*args)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+async def run(url: str, course_id: str, queued: int, repeat: int):
+    engine = make_async_engine(url)
+    last = f"student-{queued - 1}"
+    async with AsyncSession(engine) as db:
+        position = await waitlist.get_position(db, course_id, last)
+        assert position.position == queued == await count_ahead(db, course_id, last)
+        tickets = await timed(waitlist.get_position, db, course_id, last, repeat=repeat)
+        counted = await timed(count_ahead, db, course_id, last, repeat=repeat)
+    await engine.dispose()
+    print(f"queue={queued:>7}  ticket arithmetic={tickets:7.3f}ms  count(*) ahead={counted:8.3f}ms")
+
+
+def main(sizes, repeat: int):
+    for queued in sizes:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='waitlist_bench_'), 'courses.db')}"
+        course_id = seed(url, queued)
+        asyncio.run(run(url, course_id, queued, repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 200000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
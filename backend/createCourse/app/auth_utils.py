@@ -1,10 +1,17 @@
 # app/auth_utils.py
+import os
+import sys
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
+from jose import JWTError
 from typing import Optional
 from pydantic import BaseModel
 
+# backend/ holds the `shared` package used by every service
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared.token_cache import VerifiedTokenCache  # noqa: E402
+from shared.revocation import revocations, start_revocation_sync, stop_revocation_sync  # noqa: E402,F401
+
 # ==============================
 # CONFIG
 # ==============================
@@ -25,12 +32,21 @@ class TokenData(BaseModel):
 # ==============================
 # TOKEN DECODING FUNCTION
 # ==============================
+# Verified tokens are cached until their `exp`, so repeat requests with the
+# same bearer token skip the signature check and TokenData construction.
+_token_cache = VerifiedTokenCache(
+    SECRET_KEY, ALGORITHM,
+    build=lambda payload: TokenData(sub=payload.get("sub"), role=payload.get("role")),
+)
+
 def decode_token(token: str) -> TokenData:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        role: str = payload.get("role")
-        return TokenData(sub=user_id, role=role)
+        claims, td = _token_cache.decode_with_claims(token)
+        # revoked sessions come from the in-memory filter kept in sync with
+        # the auth service, never from a lookup on the request path
+        if revocations.is_token_revoked(claims):
+            raise JWTError("Token has been revoked")
+        return td
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,7 +57,7 @@ def decode_token(token: str) -> TokenData:
 # ==============================
 # CURRENT USER TOKEN DEPENDENCY
 # ==============================
-def get_current_user_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
+async def get_current_user_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
     token = credentials.credentials
     td = decode_token(token)
     if not td.sub:
@@ -52,7 +68,7 @@ def get_current_user_token(credentials: HTTPAuthorizationCredentials = Depends(s
 # ROLE CHECK DEPENDENCY
 # ==============================
 def require_role(allowed_roles: list):
-    def dependency(td: TokenData = Depends(get_current_user_token)):
+    async def dependency(td: TokenData = Depends(get_current_user_token)):
         if td.role not in allowed_roles:
             raise HTTPException(status_code=403, detail="Insufficient permissions")
         return td
@@ -0,0 +1,155 @@
+# app/autocomplete.py
+"""
+Search-as-you-type over course code and title (GET /api/courses/autocomplete).
+
+CourseIndex keeps published courses in memory as three sorted arrays of
+(normalised key, course id), one per match tier:
+  1. code            "cs1" finds CS101
+  2. whole title     "intro" finds "Introduction to Databases"
+  3. any title word  "data" finds "Introduction to Databases"
+The keys of tier 3 are the title from each word onward, so one bisect per
+tier finds every match, and the matches come out alphabetically. A query
+costs O(tiers * (log n + limit)) and never touches SQLite.
+
+crud applies its own course writes to the index after each commit. The
+writes also bump catalogue_version (see response_cache.py), and the index
+remembers the version it reflects. A version it did not see, e.g. from
+another worker, triggers a full reload from the database on the next
+query. So do AUTOCOMPLETE_MAX_AGE_SECONDS without a reload, which bounds
+staleness after writes that bypass crud.
+"""
+import asyncio
+import os
+import re
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database, models, schemas
+from app.response_cache import catalogue_cache, get_catalogue_version
+
+AUTOCOMPLETE_MAX_AGE_SECONDS = int(os.getenv("AUTOCOMPLETE_MAX_AGE_SECONDS", 300))
+
+router = APIRouter(prefix="/courses", tags=["Autocomplete"])
+
+_SPACE_RE = re.compile(r"\s+")
+_WORD_START_RE = re.compile(r"(?<!\w)\w", re.UNICODE)
+
+
+def normalize(text: str | None) -> str:
+    """Case- and accent-insensitive form used for keys and queries"""
+    text = text or ""
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _SPACE_RE.sub(" ", text.casefold()).strip()
+
+
+def _keys(code: str | None, title: str | None) -> tuple:
+    """(code keys, title keys, word keys) for one course"""
+    title = normalize(title)
+    words = [title[m.start():] for m in _WORD_START_RE.finditer(title)][1:]
+    return [normalize(code)], [title], words
+
+
+class CourseIndex:
+    """Sorted-array prefix index of published courses"""
+
+    def __init__(self):
+        self._tiers = ([], [], [])
+        self._courses: dict = {}  # id -> (code, title)
+        self.version = None
+        self._loaded_at = 0.0
+        self._reload = asyncio.Lock()
+
+    def _insert(self, course_id: str, code: str, title: str) -> None:
+        self._courses[course_id] = (code, title)
+        for tier, keys in zip(self._tiers, _keys(code, title)):
+            for key in keys:
+                insort(tier, (key, course_id))
+
+    def _remove(self, course_id: str) -> None:
+        course = self._courses.pop(course_id, None)
+        if course is None:
+            return
+        for tier, keys in zip(self._tiers, _keys(*course)):
+            for key in keys:
+                i = bisect_left(tier, (key, course_id))
+                if i < len(tier) and tier[i] == (key, course_id):
+                    del tier[i]
+
+    def apply(self, course: models.Course, version: int, deleted: bool = False) -> None:
+        """Mirror a committed course write; `version` is the catalogue version it produced"""
+        if self.version is None or version != self.version + 1:
+            # a write from elsewhere came in between: reload on the next query
+            self.version = None
+            return
+        self._remove(course.id)
+        if course.is_published and not deleted:
+            self._insert(course.id, course.code, course.title)
+        self.version = version
+
+    async def load(self, db: AsyncSession) -> None:
+        """Rebuild from the published courses in the database"""
+        version = await get_catalogue_version(db)
+        rows = (await db.execute(
+            select(models.Course.id, models.Course.code, models.Course.title)
+            .where(models.Course.is_published == True)
+        )).all()
+        tiers = ([], [], [])
+        courses = {}
+        for row in rows:
+            courses[row.id] = (row.code, row.title)
+            for tier, keys in zip(tiers, _keys(row.code, row.title)):
+                tier.extend((key, row.id) for key in keys)
+        for tier in tiers:
+            tier.sort()
+        self._tiers, self._courses = tiers, courses
+        self.version = version
+        self._loaded_at = time.monotonic()
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Reload when another writer moved the catalogue on, or the index is too old"""
+        expired = time.monotonic() - self._loaded_at >= AUTOCOMPLETE_MAX_AGE_SECONDS
+        if self.version is not None and not expired and await catalogue_cache.current_version(db) == self.version:
+            return
+        async with self._reload:
+            # someone else may have reloaded while we waited
+            expired = time.monotonic() - self._loaded_at >= AUTOCOMPLETE_MAX_AGE_SECONDS
+            if self.version is None or expired or await catalogue_cache.current_version(db) != self.version:
+                await self.load(db)
+
+    def search(self, text: str, limit: int = 10) -> List[schemas.CourseSuggestion]:
+        prefix = normalize(text)
+        if not prefix:
+            return []
+        found = {}
+        for tier in self._tiers:
+            i = bisect_left(tier, (prefix,))
+            while i < len(tier) and len(found) < limit and tier[i][0].startswith(prefix):
+                course_id = tier[i][1]
+                if course_id not in found:
+                    code, title = self._courses[course_id]
+                    found[course_id] = schemas.CourseSuggestion(id=course_id, code=code, title=title)
+                i += 1
+            if len(found) >= limit:
+                break
+        return list(found.values())
+
+
+course_index = CourseIndex()
+
+
+@router.get("/autocomplete", response_model=List[schemas.CourseSuggestion])
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(database.get_read_db),
+):
+    await course_index.refresh(db)
+    return course_index.search(q, limit)
@@ -0,0 +1,228 @@
+# app/build_similar.py
+"""
+Batch job that precomputes "similar courses" (served by app.similar).
+
+Each published course becomes a TF-IDF vector over its title, description,
+tags, category and department. Title words and tags weigh more, and
+category and department count as single whole-value terms. Rows are
+L2-normalised, so X @ X.T is the cosine similarity matrix. The product
+is taken in blocks of SIMILAR_BLOCK_ROWS rows, and each block is cut down
+to its top SIMILAR_TOP_K per row with argpartition. One pass over the
+matrix, with memory bounded by block x courses.
+
+Incremental runs (the default) compare a fingerprint of every course's
+text with the one in course_similar_state. They recompute only:
+  * courses that are new or whose text changed
+  * courses whose list points at a changed, unpublished or deleted course
+  * courses where a changed course now beats the current k-th neighbour
+Every other list is kept. The vocabulary and IDF come from the whole
+catalogue on each run, so kept lists can drift slightly from a fresh
+build. --full recomputes everything. It is also chosen automatically
+when more than SIMILAR_FULL_REBUILD_RATIO of the courses changed.
+
+    python -m app.build_similar [--full]        (from backend/createCourse)
+
+Needs NumPy; only this job imports it, not the service.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Engine
+
+from app import database, models
+
+SIMILAR_TOP_K = int(os.getenv("SIMILAR_TOP_K", 10))
+SIMILAR_MAX_FEATURES = int(os.getenv("SIMILAR_MAX_FEATURES", 4096))
+SIMILAR_BLOCK_ROWS = int(os.getenv("SIMILAR_BLOCK_ROWS", 512))
+SIMILAR_FULL_REBUILD_RATIO = float(os.getenv("SIMILAR_FULL_REBUILD_RATIO", 0.2))
+
+# term weight per field; tags, category and department are whole-value terms
+FIELD_WEIGHTS = {"title": 3, "description": 1, "tags": 2, "category": 2, "department": 1}
+STOPWORDS = frozenset(
+    "about after all also an and any are as at be been but by can course courses for from has have how "
+    "in into introduction is it its of on or our students that the their this to will with you your".split()
+)
+_WORD_RE = re.compile(r"[^\W\d_]{2,}", re.UNICODE)
+
+# IN (...) lists per statement
+_CHUNK = 500
+
+
+def _tags(raw) -> list:
+    try:
+        return json.loads(raw) if raw else []
+    except ValueError:
+        return []
+
+
+def course_terms(row) -> Counter:
+    """Weighted term counts for one course row"""
+    terms = Counter()
+    for field in ("title", "description"):
+        words = (w for w in _WORD_RE.findall((getattr(row, field) or "").lower()) if w not in STOPWORDS)
+        for word in words:
+            terms[word] += FIELD_WEIGHTS[field]
+    for tag in _tags(row.tags):
+        terms["tag:" + str(tag).strip().lower()] += FIELD_WEIGHTS["tags"]
+    for field in ("category", "department"):
+        if getattr(row, field):
+            terms[f"{field}:{getattr(row, field).strip().lower()}"] += FIELD_WEIGHTS[field]
+    return terms
+
+
+def fingerprint(row) -> str:
+    text = json.dumps([row.title, row.description, row.tags, row.category, row.department])
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def vectorize(docs: list) -> np.ndarray:
+    """L2-normalised TF-IDF matrix, one row per document"""
+    df = Counter()
+    for terms in docs:
+        df.update(terms.keys())
+    # a term that only one course uses cannot make two courses similar
+    vocabulary = [term for term, n in df.most_common(SIMILAR_MAX_FEATURES * 2) if n > 1][:SIMILAR_MAX_FEATURES]
+    column = {term: j for j, term in enumerate(vocabulary)}
+    n = len(docs)
+    matrix = np.zeros((n, len(vocabulary)), dtype=np.float32)
+    for i, terms in enumerate(docs):
+        for term, count in terms.items():
+            j = column.get(term)
+            if j is not None:
+                matrix[i, j] = 1 + math.log(count)  # sublinear tf
+    idf = np.array([math.log((1 + n) / (1 + df[term])) + 1 for term in vocabulary], dtype=np.float32)
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix /= norms
+    return matrix
+
+
+def _blocks(rows: np.ndarray):
+    for start in range(0, len(rows), SIMILAR_BLOCK_ROWS):
+        yield rows[start:start + SIMILAR_BLOCK_ROWS]
+
+
+def top_neighbours(matrix: np.ndarray, rows: np.ndarray, k: int = SIMILAR_TOP_K):
+    """Yield (row, neighbour indices, scores) best first, for each of `rows`"""
+    k = min(k, len(matrix) - 1)
+    if k <= 0:
+        return
+    for block in _blocks(rows):
+        scores = matrix[block] @ matrix.T
+        scores[np.arange(len(block)), block] = -1  # a course is not its own neighbour
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        for row, neighbours, row_scores in zip(block, best, best_scores):
+            yield row, neighbours, row_scores
+
+
+def _dirty_rows(matrix, ids, changed, removed, stored) -> set:
+    """Rows to recompute in an incremental run"""
+    dirty = set(changed)
+    gone = {ids[i] for i in changed} | removed
+    kth = np.zeros(len(ids), dtype=np.float32)
+    for i, course_id in enumerate(ids):
+        neighbours = stored.get(course_id, [])
+        if any(similar_id in gone for similar_id, _ in neighbours):
+            dirty.add(i)
+        elif len(neighbours) >= SIMILAR_TOP_K:
+            kth[i] = neighbours[-1][1]
+    if changed:
+        # similarity is symmetric: row c of X[changed] @ X.T is how much
+        # changed course c scores in every other course's list
+        for block in _blocks(np.array(sorted(changed))):
+            beats = (matrix[block] @ matrix.T > kth).any(axis=0)
+            dirty.update(np.flatnonzero(beats).tolist())
+    return dirty
+
+
+def build_similar(engine: Engine, full: bool = False) -> dict:
+    """Refresh course_similar; returns a summary of what was recomputed"""
+    started = time.perf_counter()
+    course = models.Course.__table__
+    with engine.begin() as conn:
+        rows = conn.execute(
+            select(course.c.id, course.c.title, course.c.description, course.c.tags,
+                   course.c.category, course.c.department)
+            .where(course.c.is_published == True)
+            .order_by(course.c.id)
+        ).all()
+        ids = [row.id for row in rows]
+        prints = [fingerprint(row) for row in rows]
+        state = dict(conn.execute(select(models.CourseSimilarState.course_id, models.CourseSimilarState.fingerprint)).all())
+
+        changed = {i for i, course_id in enumerate(ids) if state.get(course_id) != prints[i]}
+        removed = set(state) - set(ids)
+        full = full or not state or len(changed) + len(removed) > SIMILAR_FULL_REBUILD_RATIO * max(len(ids), 1)
+
+        matrix = vectorize([course_terms(row) for row in rows])
+        if full:
+            dirty = set(range(len(ids)))
+        else:
+            stored = {}
+            for course_id, similar_id, score in conn.execute(
+                select(models.CourseSimilar.course_id, models.CourseSimilar.similar_id, models.CourseSimilar.score)
+                .order_by(models.CourseSimilar.course_id, models.CourseSimilar.rank)
+            ):
+                stored.setdefault(course_id, []).append((similar_id, score))
+            dirty = _dirty_rows(matrix, ids, changed, removed, stored)
+
+        lists = [
+            {"course_id": ids[row], "rank": rank, "similar_id": ids[j], "score": float(score)}
+            for row, neighbours, scores in top_neighbours(matrix, np.array(sorted(dirty), dtype=np.int64))
+            for rank, (j, score) in enumerate(((j, s) for j, s in zip(neighbours, scores) if s > 0), start=1)
+        ]
+
+        if full:
+            conn.execute(delete(models.CourseSimilar))
+            conn.execute(delete(models.CourseSimilarState))
+            refreshed_state = range(len(ids))
+        else:
+            stale = [ids[i] for i in dirty] + sorted(removed)
+            for start in range(0, len(stale), _CHUNK):
+                conn.execute(delete(models.CourseSimilar).where(models.CourseSimilar.course_id.in_(stale[start:start + _CHUNK])))
+            stale_state = [ids[i] for i in changed] + sorted(removed)
+            for start in range(0, len(stale_state), _CHUNK):
+                conn.execute(delete(models.CourseSimilarState).where(
+                    models.CourseSimilarState.course_id.in_(stale_state[start:start + _CHUNK])
+                ))
+            refreshed_state = changed
+        if lists:
+            conn.execute(insert(models.CourseSimilar), lists)
+        if refreshed_state:
+            conn.execute(insert(models.CourseSimilarState), [
+                {"course_id": ids[i], "fingerprint": prints[i]} for i in refreshed_state
+            ])
+
+    return {
+        "mode": "full" if full else "incremental",
+        "courses": len(ids),
+        "features": int(matrix.shape[1]),
+        "changed": len(changed),
+        "removed": len(removed),
+        "recomputed": len(dirty),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute similar-course lists")
+    parser.add_argument("--full", action="store_true", help="recompute every course, not just what changed")
+    args = parser.parse_args()
+    print(json.dumps(build_similar(database.engine, full=args.full), indent=2))
+
+
+if __name__ == "__main__":
+    main()
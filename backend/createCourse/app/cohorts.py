@@ -0,0 +1,39 @@
+# app/cohorts.py
+"""
+Program cohorts for bulk enrollment.
+
+Users (and their `program`) live in the auth service, so a cohort is
+resolved through GET /auth/programs/{program}/students. The caller's own
+bearer token is forwarded, so the auth service applies its own role check.
+"""
+import asyncio
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from fastapi import HTTPException
+
+from shared.revocation import AUTH_SERVICE_URL
+
+COHORT_LOOKUP_TIMEOUT_SECONDS = 10
+
+
+def _fetch_program(program: str, authorization: str) -> dict:
+    url = f"{AUTH_SERVICE_URL.rstrip('/')}/auth/programs/{urllib.parse.quote(program, safe='')}/students"
+    req = urllib.request.Request(url, headers={"Authorization": authorization})
+    with urllib.request.urlopen(req, timeout=COHORT_LOOKUP_TIMEOUT_SECONDS) as resp:
+        return json.load(resp)
+
+
+async def program_student_ids(program: str, authorization: str) -> list:
+    """Student ids in `program`, as the auth service reports them"""
+    try:
+        # urllib blocks; keep it off the event loop
+        body = await asyncio.to_thread(_fetch_program, program, authorization)
+    except urllib.error.HTTPError as e:
+        detail = "Not allowed to list this program" if e.code in (401, 403) else "Program lookup failed"
+        raise HTTPException(status_code=e.code if e.code in (401, 403) else 502, detail=detail)
+    except (urllib.error.URLError, TimeoutError, ValueError):
+        raise HTTPException(status_code=502, detail="Auth service unavailable")
+    return body["student_ids"]
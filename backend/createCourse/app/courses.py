@@ -1,49 +1,114 @@
 # app/routers/courses.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app import auth_utils
-from app import crud, database, schemas
+from app import cohorts, crud, database, schemas
+from app.response_cache import catalogue_cache
+from shared.streaming import STREAM_FORMATS, stream_format, stream_query
+
+# ?format=ndjson|json (or Accept: application/x-ndjson) streams unbounded
+# listings in chunks instead of building the whole list in memory
+StreamFormat = Query(None, pattern="^(" + "|".join(STREAM_FORMATS) + ")$")
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
+# List routes accept either skip/limit or an opaque `cursor`. When another
+# page exists its cursor is returned in this header; pass it back as
+# ?cursor= to continue.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _set_next_cursor(response: Response, cursor: str | None):
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+# ---------------------------------------------------------------------------
+# Cached catalogue reads
+# The public catalogue routes answer from catalogue_cache (ETag + 304, see
+# response_cache.py). Each loader below queries and serializes one response
+# and returns (body, headers); it only runs on a cache miss.
+# ---------------------------------------------------------------------------
+_course_list_json = TypeAdapter(List[schemas.CourseOut])
+
+def _course_list_body(items, next_cursor: str | None = None):
+    body = _course_list_json.dump_json(_course_list_json.validate_python(items, from_attributes=True))
+    return body, ({NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {})
+
+async def _catalogue_page(db: AsyncSession, skip: int, limit: int, cursor: str | None, tag: str | None = None):
+    items = await crud.list_courses_2(db, skip=skip, limit=limit, cursor=cursor, tag=tag)
+    return _course_list_body(items, crud.course_cursor(items, limit))
+
+async def _student_page(db: AsyncSession, filters: dict, skip: int, limit: int, cursor: str | None):
+    items = await crud.student_filtered_courses(db=db, **filters, skip=skip, limit=limit, cursor=cursor)
+    return _course_list_body(items, crud.course_cursor(items, limit))
+
+async def _all_courses(db: AsyncSession):
+    return _course_list_body(await crud.get_all_courses(db))
+
+async def _course_detail(db: AsyncSession, course_id: str):
+    c = await crud.get_course(db, course_id)
+    if not c:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return schemas.CourseOut.from_orm(c).model_dump_json().encode(), {}
+
+def _course_row_json(row) -> bytes:
+    return schemas.CourseOut.model_validate(row).model_dump_json().encode()
+
+def _enrollment_row_json(row) -> bytes:
+    return schemas.EnrollmentOut.model_validate(row).model_dump_json().encode()
+
+async def warm_catalogue_cache(db: AsyncSession):
+    """Build the default catalogue pages so first visitors hit the cache"""
+    await catalogue_cache.get_or_build(db, ("courses", 0, 50, None, None), lambda: _catalogue_page(db, 0, 50, None))
+    no_filters = dict(category=None, department=None, level=None, course_type=None, duration=None, tag=None)
+    await catalogue_cache.get_or_build(
+        db, ("student", tuple(no_filters.items()), 0, 50, None), lambda: _student_page(db, no_filters, 0, 50, None),
+    )
+    await catalogue_cache.get_or_build(db, ("all",), lambda: _all_courses(db))
+
 @router.post("", response_model=schemas.CourseOut, status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(auth_utils.require_role(["instructor", "admin"]))])
-def create_course(course_in: schemas.CourseCreate, db: Session = Depends(database.get_db),
+async def create_course(course_in: schemas.CourseCreate, db: AsyncSession = Depends(database.get_db),
                   token=Depends(auth_utils.get_current_user_token)):
     # token.sub contains instructor id
     # ensure unique code
-    if crud.get_course_by_code(db, course_in.code):
+    if await crud.get_course_by_code(db, course_in.code):
         raise HTTPException(status_code=400, detail="Course code already exists")
-    new = crud.create_course(db, course_in, instructor_id=token.sub)
+    new = await crud.create_course(db, course_in, instructor_id=token.sub)
     # convert tags string back to list
     out = schemas.CourseOut.from_orm(new)
     return out
 
 @router.get("", response_model=List[schemas.CourseOut])
-def list_courses(skip: int = 0, limit: int = 50, db: Session = Depends(database.get_db)):
-    items = crud.list_courses_2(db, skip=skip, limit=limit)
-    return [schemas.CourseOut.from_orm(i) for i in items]
+async def list_courses(request: Request, skip: int = 0, limit: int = 50, cursor: str | None = None,
+                       tag: str | None = None, db: AsyncSession = Depends(database.get_read_db)):
+    return await catalogue_cache.respond(
+        request, db, ("courses", skip, limit, cursor, tag), lambda: _catalogue_page(db, skip, limit, cursor, tag),
+    )
 
 @router.get("/me", response_model=List[schemas.CourseOut])
-def list_my_courses(db: Session = Depends(database.get_db), token=Depends(auth_utils.get_current_user_token),
-                    skip: int = 0, limit: int = 50):
-    items = crud.list_my_courses(db, instructor_id=token.sub, skip=skip, limit=limit)
+async def list_my_courses(response: Response, db: AsyncSession = Depends(database.get_db), token=Depends(auth_utils.get_current_user_token),
+                    skip: int = 0, limit: int = 50, cursor: str | None = None):
+    items = await crud.list_my_courses(db, instructor_id=token.sub, skip=skip, limit=limit, cursor=cursor)
+    _set_next_cursor(response, crud.course_cursor(items, limit))
     return [schemas.CourseOut.from_orm(i) for i in items]
 
 
 @router.get("/{category}/{department}/{level}/{type}", response_model=List[schemas.CourseOut])
-def list_my_filtered_courses(
-    db: Session = Depends(database.get_db),
+async def list_my_filtered_courses(
+    response: Response,
+    db: AsyncSession = Depends(database.get_db),
     token=Depends(auth_utils.get_current_user_token),
     category: str | None = None,
     department: str | None = None,
     level: str | None = None,
     type: str | None = None,
     skip: int = 0,
-    limit: int = 50
+    limit: int = 50,
+    cursor: str | None = None,
 ):
-    courses = crud.list_my_filtered_courses(
+    courses = await crud.list_my_filtered_courses(
         db=db,
         instructor_id=token.sub,
         category=category,
@@ -51,119 +116,174 @@ def list_my_filtered_courses(
         level=level,
         course_type=type,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
     )
+    _set_next_cursor(response, crud.course_cursor(courses, limit))
     return [schemas.CourseOut.from_orm(c) for c in courses]
 
 @router.get("/student", response_model=List[schemas.CourseOut])
-def student_filtered_courses(
-    db: Session = Depends(database.get_db),
+async def student_filtered_courses(
+    request: Request,
+    db: AsyncSession = Depends(database.get_read_db),
     category: str | None = Query(None),
     department: str | None = Query(None),
     level: str | None = Query(None),
     type: str | None = Query(None),
     duration: str | None = Query(None),
+    tag: str | None = Query(None),
     skip: int = 0,
     limit: int = 50,
+    cursor: str | None = None,
 ):
-    courses = crud.student_filtered_courses(
-        db=db,
-        category=category,
-        department=department,
-        level=level,
-        course_type=type,
-        duration=duration,
-        skip=skip,
-        limit=limit,
+    filters = dict(category=category, department=department, level=level, course_type=type, duration=duration, tag=tag)
+    return await catalogue_cache.respond(
+        request, db, ("student", tuple(filters.items()), skip, limit, cursor),
+        lambda: _student_page(db, filters, skip, limit, cursor),
     )
-    return [schemas.CourseOut.from_orm(c) for c in courses]
+
+
+@router.get("/facets", response_model=schemas.FacetCounts)
+async def get_facet_counts(db: AsyncSession = Depends(database.get_read_db)):
+    # per-value counts for the student catalogue filters
+    return await crud.get_facet_counts(db)
+
+
+@router.get("/tags", response_model=List[schemas.TagCount])
+async def get_tag_cloud(limit: int = Query(50, ge=1, le=500), db: AsyncSession = Depends(database.get_read_db)):
+    # most used tags on published courses, for the catalogue tag cloud
+    return await crud.get_tag_cloud(db, limit=limit)
 
 
 @router.get("/all", response_model=List[schemas.CourseOut])
-def get_all_courses(db: Session = Depends(database.get_db)):
-    courses = crud.get_all_courses(db)
-    return [schemas.CourseOut.from_orm(c) for c in courses]
+async def get_all_courses(request: Request, format: str | None = StreamFormat,
+                          db: AsyncSession = Depends(database.get_read_db)):
+    fmt = stream_format(request, format)
+    if fmt:
+        return stream_query(database.AsyncReadSessionLocal, crud.all_courses_query(), _course_row_json, fmt)
+    return await catalogue_cache.respond(request, db, ("all",), lambda: _all_courses(db))
 
 
 @router.get("/{course_id}/detail", response_model=schemas.CourseOut)
-def get_course(course_id: str, db: Session = Depends(database.get_db)):
-    c = crud.get_course(db, course_id)
-    if not c:
-        raise HTTPException(status_code=404, detail="Course not found")
-    return schemas.CourseOut.from_orm(c)
+async def get_course(course_id: str, request: Request, db: AsyncSession = Depends(database.get_read_db)):
+    return await catalogue_cache.respond(request, db, ("detail", course_id), lambda: _course_detail(db, course_id))
 
 @router.put("/{course_id}", response_model=schemas.CourseOut, dependencies=[Depends(auth_utils.require_role(["instructor", "admin"]))])
-def update_course(course_id: str, payload: schemas.CourseUpdate, db: Session = Depends(database.get_db), token=Depends(auth_utils.get_current_user_token)):
-    c = crud.get_course(db, course_id)
+async def update_course(course_id: str, payload: schemas.CourseUpdate, db: AsyncSession = Depends(database.get_db), token=Depends(auth_utils.get_current_user_token)):
+    c = await crud.get_course(db, course_id)
     if not c:
         raise HTTPException(status_code=404, detail="Course not found")
     # only owner or admin can update
     if token.role != "admin" and c.instructor_id != token.sub:
         raise HTTPException(status_code=403, detail="Not allowed to update this course")
-    updated = crud.update_course(db, course_id, payload)
+    updated = await crud.update_course(db, course_id, payload)
     return schemas.CourseOut.from_orm(updated)
 
 @router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT,
                dependencies=[Depends(auth_utils.require_role(["instructor", "admin"]))])
-def delete_course(course_id: str, db: Session = Depends(database.get_db), token=Depends(auth_utils.get_current_user_token)):
-    c = crud.get_course(db, course_id)
+async def delete_course(course_id: str, db: AsyncSession = Depends(database.get_db), token=Depends(auth_utils.get_current_user_token)):
+    c = await crud.get_course(db, course_id)
     if not c:
         raise HTTPException(status_code=404, detail="Course not found")
     if token.role != "admin" and c.instructor_id != token.sub:
         raise HTTPException(status_code=403, detail="Not allowed to delete")
-    crud.delete_course(db, course_id)
+    await crud.delete_course(db, course_id)
     return None
 
 @router.post("/{course_id}/enroll", 
              response_model=schemas.EnrollmentOut, 
              status_code=status.HTTP_201_CREATED,
              dependencies=[Depends(auth_utils.require_role(["student", "admin"]))])
-def enroll_in_course(course_id: str, db: Session = Depends(database.get_db),
+async def enroll_in_course(course_id: str, db: AsyncSession = Depends(database.get_db),
                      token=Depends(auth_utils.get_current_user_token)):
 
     enrollment_in = schemas.EnrollmentCreate(
         course_id=course_id,
         student_id=token.sub
     )
-    enrollment = crud.create_enrollment(db, enrollment_in)
+    enrollment = await crud.create_enrollment(db, enrollment_in)
     return schemas.EnrollmentOut.from_orm(enrollment)
 
+@router.post("/{course_id}/enroll/bulk", response_model=schemas.BulkEnrollResponse,
+             dependencies=[Depends(auth_utils.require_role(["instructor", "admin"]))])
+async def bulk_enroll_in_course(course_id: str, payload: schemas.BulkEnrollRequest, request: Request,
+                                db: AsyncSession = Depends(database.get_db),
+                                token=Depends(auth_utils.get_current_user_token)):
+    # only the course instructor or admin can enroll other students
+    course = await crud.get_course(db, course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if token.role != "admin" and course.instructor_id != token.sub:
+        raise HTTPException(status_code=403, detail="Not allowed to enroll students in this course")
+    student_ids = list(payload.student_ids)
+    if payload.program:
+        student_ids += await cohorts.program_student_ids(payload.program, request.headers["authorization"])
+    return await crud.bulk_create_enrollments(db, course_id, student_ids)
+
 @router.get("/enrollments/student", response_model=List[schemas.EnrollmentOut],
             dependencies=[Depends(auth_utils.require_role(["student", "instructor", "admin"]))])
-def list_enrollments(db: Session = Depends(database.get_db),
-                     token=Depends(auth_utils.get_current_user_token)): 
+async def list_enrollments(response: Response, db: AsyncSession = Depends(database.get_db),
+                     token=Depends(auth_utils.get_current_user_token),
+                     skip: int = 0, limit: int = 50, cursor: str | None = None):
     # students can only see their own enrollments
     student_id = token.sub
     if token.role == "student" and token.sub != student_id:
         raise HTTPException(status_code=403, detail="Not allowed to view these enrollments")
-    enrollments = crud.list_enrollments_by_student(db, student_id)      
+    enrollments = await crud.list_enrollments_by_student(db, student_id, skip=skip, limit=limit, cursor=cursor)
+    _set_next_cursor(response, crud.enrollment_cursor(enrollments, limit))
     return [schemas.EnrollmentOut.from_orm(e) for e in enrollments]
 
 @router.get("/enrollments/course/{course_id}", response_model=List[schemas.EnrollmentOut],
             dependencies=[Depends(auth_utils.require_role(["instructor", "admin"]))])
-def list_course_enrollments(course_id: str, db: Session = Depends(database.get_db),
-                            token=Depends(auth_utils.get_current_user_token)):
+async def list_course_enrollments(course_id: str, request: Request, response: Response,
+                            db: AsyncSession = Depends(database.get_db),
+                            token=Depends(auth_utils.get_current_user_token),
+                            skip: int = 0, limit: int = 50, cursor: str | None = None,
+                            format: str | None = StreamFormat):
     # only the course instructor or admin can view enrollments
-    course = crud.get_course(db, course_id)
+    course = await crud.get_course(db, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     if token.role != "admin" and course.instructor_id != token.sub:
         raise HTTPException(status_code=403, detail="Not allowed to view enrollments for this course")
-    enrollments = crud.list_enrollments_by_course(db, course_id)
+    fmt = stream_format(request, format)
+    if fmt:
+        # full roster, ignoring skip/limit/cursor
+        return stream_query(database.AsyncReadSessionLocal, crud.course_roster_query(course_id), _enrollment_row_json, fmt)
+    enrollments = await crud.list_enrollments_by_course(db, course_id, skip=skip, limit=limit, cursor=cursor)
+    _set_next_cursor(response, crud.enrollment_cursor(enrollments, limit))
     return [schemas.EnrollmentOut.from_orm(e) for e in enrollments]
 
+@router.delete("/enrollments/{enrollment_id}", status_code=status.HTTP_204_NO_CONTENT,
+               dependencies=[Depends(auth_utils.require_role(["student", "instructor", "admin"]))])
+async def delete_enrollment(enrollment_id: str, db: AsyncSession = Depends(database.get_db),
+                            token=Depends(auth_utils.get_current_user_token)):
+    # students may drop their own enrollment; instructors only in their courses
+    enrollment = await crud.get_enrollment(db, enrollment_id)
+    if not enrollment:
+        raise HTTPException(status_code=404, detail="Enrollment not found")
+    if token.role == "student" and enrollment.student_id != token.sub:
+        raise HTTPException(status_code=403, detail="Not allowed to drop this enrollment")
+    if token.role == "instructor":
+        course = await crud.get_course(db, enrollment.course_id)
+        if not course or course.instructor_id != token.sub:
+            raise HTTPException(status_code=403, detail="Not allowed to drop this enrollment")
+    # the freed seat goes to the next student on the waitlist
+    await crud.delete_enrollment(db, enrollment_id)
+    return None
+
 @router.get("/enrollments/student/courses", response_model=List[schemas.CourseOut],
             dependencies=[Depends(auth_utils.require_role(["student", "admin"]))])
-def get_enrolled_courses(db: Session = Depends(database.get_db),
+async def get_enrolled_courses(db: AsyncSession = Depends(database.get_db),
                          token=Depends(auth_utils.get_current_user_token)):
-    courses = crud.get_enrolled_courses_by_student(db, token.sub)
+    courses = await crud.get_enrolled_courses_by_student(db, token.sub)
     return [schemas.CourseOut.from_orm(c) for c in courses]
 
 @router.get("/enrollments/detail/{course_id}/{student_id}", response_model=schemas.EnrollmentOut,
             dependencies=[Depends(auth_utils.require_role(["student", "instructor", "admin"]))])
-def get_enrollment_detail(course_id: str, student_id: str, db: Session = Depends(database.get_db),
+async def get_enrollment_detail(course_id: str, student_id: str, db: AsyncSession = Depends(database.get_db),
                           token=Depends(auth_utils.get_current_user_token)):
-    enrollment = crud.get_student_enrollment(db, course_id, student_id)
+    enrollment = await crud.get_student_enrollment(db, course_id, student_id)
     if not enrollment:
         raise HTTPException(status_code=404, detail="Enrollment not found")
     # students can only view their own enrollment
@@ -171,25 +291,28 @@ def get_enrollment_detail(course_id: str, student_id: str, db: Session = Depends
         raise HTTPException(status_code=403, detail="Not allowed to view this enrollment")
     # instructors can only view enrollments for their courses
     if token.role == "instructor":
-        course = crud.get_course(db, enrollment.course_id)
+        course = await crud.get_course(db, enrollment.course_id)
         if course.instructor_id != token.sub:
             raise HTTPException(status_code=403, detail="Not allowed to view this enrollment")
     return schemas.EnrollmentOut.from_orm(enrollment)
 
 @router.put("/enrollments/{enrollment_id}", response_model=schemas.EnrollmentOut,
             dependencies=[Depends(auth_utils.require_role(["student", "instructor", "admin"]))])
-def update_enrollment(enrollment_id: str, payload: schemas.EnrollmentBase, db: Session = Depends(database.get_db),
+async def update_enrollment(enrollment_id: str, payload: schemas.EnrollmentBase, db: AsyncSession = Depends(database.get_db),
                       token=Depends(auth_utils.get_current_user_token)):
-    enrollment = crud.get_enrollment(db, enrollment_id)
+    enrollment = await crud.get_enrollment(db, enrollment_id)
     if not enrollment:
         raise HTTPException(status_code=404, detail="Enrollment not found")
     # students can only update their own enrollments
     if token.role == "student" and enrollment.student_id != token.sub:
         raise HTTPException(status_code=403, detail="Not allowed to update this enrollment")
+    # and cannot record their own progress: prerequisites trust `completed`
+    if token.role == "student" and crud.progress_changes(enrollment, payload):
+        raise HTTPException(status_code=403, detail="Only instructors and admins can record progress")
     # instructors can only update enrollments for their courses
     if token.role == "instructor":
-        course = crud.get_course(db, enrollment.course_id)
+        course = await crud.get_course(db, enrollment.course_id)
         if course.instructor_id != token.sub:
             raise HTTPException(status_code=403, detail="Not allowed to update this enrollment")
-    updated = crud.update_enrollment(db, enrollment_id, payload)
+    updated = await crud.update_enrollment(db, enrollment_id, payload)
     return schemas.EnrollmentOut.from_orm(updated)  
@@ -1,12 +1,27 @@
 # app/crud.py
+import time
 import uuid
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from collections import Counter
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import models
 from . import schemas
+from . import prerequisites, seats, waitlist
+from .autocomplete import course_index
+from .response_cache import catalogue_cache
+from shared.pagination import keyset, next_cursor
 import json
 
+# stable sort keys for keyset pagination (see shared/pagination.py)
+COURSE_ORDER = (models.Course.created_at, models.Course.id)
+COURSE_CURSOR_ATTRS = ("created_at", "id")
+ENROLLMENT_ORDER = (models.Enrollment.enrolled_at, models.Enrollment.id)
+ENROLLMENT_CURSOR_ATTRS = ("enrolled_at", "id")
+
 def _tags_to_str(tags: list | None):
     if tags is None:
         return None
@@ -20,7 +35,157 @@ def _str_to_tags(s: str | None):
     except Exception:
         return []
 
-def create_course(db: Session, course_in: schemas.CourseCreate, instructor_id: str):
+def _normalize_tags(tags: list | None) -> list:
+    """Strip, drop empties and duplicates, keep the given order"""
+    seen = []
+    for tag in tags or []:
+        tag = str(tag).strip()
+        if tag and tag not in seen:
+            seen.append(tag)
+    return seen
+
+def _set_tags(course: models.Course, tags: list | None):
+    """Point course_tags (and the JSON copy) at `tags`, reusing unchanged rows"""
+    normalized = _normalize_tags(tags)
+    existing = {link.tag: link for link in course.tag_links}
+    links = []
+    for position, tag in enumerate(normalized):
+        link = existing.get(tag) or models.CourseTag(tag=tag)
+        link.position = position
+        links.append(link)
+    course.tag_links = links
+    course.tags_json = _tags_to_str(normalized if tags is not None else None)
+
+def _with_tag(query, tag: str | None):
+    if not tag:
+        return query
+    return query.where(models.Course.id.in_(
+        select(models.CourseTag.course_id).where(models.CourseTag.tag == tag)
+    ))
+
+def _page(query, order_by, cursor: str | None, skip: int, limit: int):
+    try:
+        return keyset(query, order_by, cursor=cursor, skip=skip, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def course_cursor(items, limit: int):
+    return next_cursor(items, limit, COURSE_CURSOR_ATTRS)
+
+def enrollment_cursor(items, limit: int):
+    return next_cursor(items, limit, ENROLLMENT_CURSOR_ATTRS)
+
+# ---------------------------------------------------------------------------
+# Facet counts
+# course_facet_counts holds the number of published courses per filter
+# value. Writes adjust it in the same transaction as the course change, so
+# the catalogue page never needs a GROUP BY. rebuild_facet_counts
+# recomputes it from scratch (python -m app.rebuild_facets).
+# ---------------------------------------------------------------------------
+FACETS = ("category", "department", "level", "course_type", "duration")
+TAG_FACET = "tag"
+
+def _facet_values(course) -> Counter:
+    """(facet, value) pairs a course contributes to; empty if unpublished"""
+    if not course.is_published:
+        return Counter()
+    values = Counter((facet, getattr(course, facet)) for facet in FACETS if getattr(course, facet))
+    values.update((TAG_FACET, tag) for tag in course.tags)
+    return values
+
+async def _apply_facet_delta(db: AsyncSession, delta: Counter):
+    rows = [{"facet": f, "value": v, "count": n} for (f, v), n in delta.items() if n]
+    if not rows:
+        return
+    table = models.CourseFacetCount.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.facet, table.c.value],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+    await db.execute(stmt, rows)
+
+async def get_facet_counts(db: AsyncSession) -> dict:
+    rows = await db.execute(
+        select(models.CourseFacetCount.facet, models.CourseFacetCount.value, models.CourseFacetCount.count)
+        # tags can run into thousands of values; they are served by get_tag_cloud
+        .where(models.CourseFacetCount.count > 0, models.CourseFacetCount.facet != TAG_FACET)
+        .order_by(models.CourseFacetCount.facet, models.CourseFacetCount.value)
+    )
+    counts = {facet: {} for facet in FACETS}
+    for facet, value, count in rows:
+        counts.setdefault(facet, {})[value] = count
+    return counts
+
+async def get_tag_cloud(db: AsyncSession, limit: int = 50):
+    """Most used tags over published courses, with counts"""
+    rows = await db.execute(
+        select(models.CourseFacetCount.value, models.CourseFacetCount.count)
+        .where(models.CourseFacetCount.facet == TAG_FACET, models.CourseFacetCount.count > 0)
+        .order_by(models.CourseFacetCount.count.desc(), models.CourseFacetCount.value)
+        .limit(limit)
+    )
+    return [{"tag": tag, "count": count} for tag, count in rows]
+
+async def rebuild_facet_counts(db: AsyncSession) -> dict:
+    """Recompute every facet count from the courses table"""
+    totals = Counter()
+    for facet in FACETS:
+        column = getattr(models.Course, facet)
+        rows = await db.execute(
+            select(column, func.count())
+            .where(models.Course.is_published == True, column.isnot(None), column != "")
+            .group_by(column)
+        )
+        totals.update({(facet, value): n for value, n in rows})
+    rows = await db.execute(
+        select(models.CourseTag.tag, func.count())
+        .join(models.Course, models.Course.id == models.CourseTag.course_id)
+        .where(models.Course.is_published == True)
+        .group_by(models.CourseTag.tag)
+    )
+    totals.update({(TAG_FACET, tag): n for tag, n in rows})
+    await db.execute(delete(models.CourseFacetCount))
+    await _apply_facet_delta(db, totals)
+    await db.commit()
+    return await get_facet_counts(db)
+
+async def _bump_catalogue_version(db: AsyncSession) -> int:
+    """Invalidate cached catalogue responses in every worker (see response_cache.py);
+    callers run catalogue_cache.forget_version() once the transaction commits.
+    Returns the new version."""
+    table = models.CatalogueVersion.__table__
+    stmt = sqlite_insert(table).values(id=1, version=1)
+    return await db.scalar(stmt.on_conflict_do_update(
+        index_elements=[table.c.id], set_={"version": table.c.version + 1},
+    ).returning(table.c.version))
+
+async def ensure_course_tags(db: AsyncSession):
+    """One-off backfill of course_tags from the JSON column of older databases"""
+    if await db.scalar(select(models.CourseTag.course_id).limit(1)) is not None:
+        return
+    rows = (await db.execute(
+        select(models.Course.id, models.Course.tags_json)
+        .where(models.Course.tags_json.isnot(None), models.Course.tags_json.notin_(["", "[]"]))
+    )).all()
+    links = [
+        {"course_id": course_id, "tag": tag, "position": position}
+        for course_id, raw in rows
+        for position, tag in enumerate(_normalize_tags(_str_to_tags(raw)))
+    ]
+    if not links:
+        return
+    await db.execute(sqlite_insert(models.CourseTag.__table__).on_conflict_do_nothing(), links)
+    await db.commit()
+    # tag counts are part of the facet table
+    await rebuild_facet_counts(db)
+
+async def ensure_facet_counts(db: AsyncSession):
+    """Fill the counter table on first start against an existing database"""
+    if await db.scalar(select(models.CourseFacetCount.facet).limit(1)) is None:
+        await rebuild_facet_counts(db)
+
+async def create_course(db: AsyncSession, course_in: schemas.CourseCreate, instructor_id: str):
     new = models.Course(
         id=str(uuid.uuid4()),
         code=course_in.code,
@@ -38,162 +203,371 @@ def create_course(db: Session, course_in: schemas.CourseCreate, instructor_id: s
         allow_self_enrollment=course_in.allow_self_enrollment if course_in.allow_self_enrollment is not None else True,
         certificate=course_in.certificate if course_in.certificate is not None else True,
         max_students=course_in.max_students,
-        tags=_tags_to_str(course_in.tags),
     )
+    _set_tags(new, course_in.tags)
     db.add(new)
-    db.commit()
-    db.refresh(new)
+    if course_in.prerequisite_ids:
+        await prerequisites.set_prerequisites(db, new.id, course_in.prerequisite_ids)
+    await _apply_facet_delta(db, _facet_values(new))
+    version = await _bump_catalogue_version(db)
+    await db.commit()
+    catalogue_cache.forget_version()
+    course_index.apply(new, version)
+    await db.refresh(new)
     return new
 
 
-def get_course(db: Session, course_id: str):
-    return db.query(models.Course).filter(models.Course.id == course_id).first()
+async def get_course(db: AsyncSession, course_id: str):
+    return await db.scalar(select(models.Course).where(models.Course.id == course_id))
 
-def get_course_by_code(db: Session, code: str):
-    return db.query(models.Course).filter(models.Course.code == code).first()
+async def get_course_by_code(db: AsyncSession, code: str):
+    return await db.scalar(select(models.Course).where(models.Course.code == code))
 
-def list_courses_2(db: Session, skip: int = 0, limit: int = 50):
-    return db.query(models.Course).offset(skip).limit(limit).all()
+async def list_courses_2(db: AsyncSession, skip: int = 0, limit: int = 50, cursor: str | None = None,
+                         tag: str | None = None):
+    query = _page(_with_tag(select(models.Course), tag), COURSE_ORDER, cursor, skip, limit)
+    return (await db.scalars(query)).all()
 
-def list_my_filtered_courses(
-    db: Session,
+def my_filtered_courses_query(
     instructor_id: str,
     category: str | None,
     department: str | None,
     level: str | None,
     course_type: str | None,
-    skip: int = 0,
-    limit: int = 50
 ):
-    query = db.query(models.Course).filter(models.Course.instructor_id == instructor_id)
+    query = select(models.Course).where(models.Course.instructor_id == instructor_id)
 
     if category:
-        query = query.filter(models.Course.category == category)
+        query = query.where(models.Course.category == category)
     if department:
-        query = query.filter(models.Course.department == department)
+        query = query.where(models.Course.department == department)
     if level:
-        query = query.filter(models.Course.level == level)
+        query = query.where(models.Course.level == level)
     if course_type:
-        query = query.filter(models.Course.course_type == course_type)
+        query = query.where(models.Course.course_type == course_type)
+    return query
 
-    return query.offset(skip).limit(limit).all()
+async def list_my_filtered_courses(
+    db: AsyncSession,
+    instructor_id: str,
+    category: str | None,
+    department: str | None,
+    level: str | None,
+    course_type: str | None,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: str | None = None,
+):
+    query = my_filtered_courses_query(instructor_id, category, department, level, course_type)
+    return (await db.scalars(_page(query, COURSE_ORDER, cursor, skip, limit))).all()
 
-def student_filtered_courses(
-    db: Session,
+def student_filtered_courses_query(
     category: str | None,
     department: str | None,
     level: str | None,
     course_type: str | None,
     duration: str | None,
-    skip: int = 0,
-    limit: int = 50
+    tag: str | None = None,
 ):
-    query = db.query(models.Course).filter(models.Course.is_published == True)
+    query = select(models.Course).where(models.Course.is_published == True)
 
     if category:
-        query = query.filter(models.Course.category == category)
+        query = query.where(models.Course.category == category)
     if department:
-        query = query.filter(models.Course.department == department)
+        query = query.where(models.Course.department == department)
     if level:
-        query = query.filter(models.Course.level == level)
+        query = query.where(models.Course.level == level)
     if course_type:
-        query = query.filter(models.Course.course_type == course_type)
+        query = query.where(models.Course.course_type == course_type)
     if duration:
-        query = query.filter(models.Course.duration == duration)
+        query = query.where(models.Course.duration == duration)
+    return _with_tag(query, tag)
+
+async def student_filtered_courses(
+    db: AsyncSession,
+    category: str | None,
+    department: str | None,
+    level: str | None,
+    course_type: str | None,
+    duration: str | None,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: str | None = None,
+    tag: str | None = None,
+):
+    query = student_filtered_courses_query(category, department, level, course_type, duration, tag)
+    return (await db.scalars(_page(query, COURSE_ORDER, cursor, skip, limit))).all()
 
-    return query.offset(skip).limit(limit).all()    
+async def list_my_courses(db: AsyncSession, instructor_id: str,  skip: int = 0, limit: int = 50, cursor: str | None = None):
+    query = select(models.Course).where(models.Course.instructor_id == instructor_id)
+    return (await db.scalars(_page(query, COURSE_ORDER, cursor, skip, limit))).all()
 
+async def get_all_courses(db: AsyncSession):
+    return (await db.scalars(select(models.Course))).all()
 
-def list_my_courses(db: Session, instructor_id: str,  skip: int = 0, limit: int = 50):
-    return db.query(models.Course).filter(models.Course.instructor_id == instructor_id).offset(skip).limit(limit).all()
+# Core (non-ORM) selects for streamed exports; see shared/streaming.py
+def all_courses_query():
+    return select(models.Course.__table__).order_by(*COURSE_ORDER)
 
-def get_all_courses(db: Session):
-    return db.query(models.Course).all()
+def course_roster_query(course_id: str):
+    return (
+        select(models.Enrollment.__table__)
+        .where(models.Enrollment.course_id == course_id)
+        .order_by(*ENROLLMENT_ORDER)
+    )
 
-def update_course(db: Session, course_id: str, data: schemas.CourseUpdate):
-    course = get_course(db, course_id)
+async def update_course(db: AsyncSession, course_id: str, data: schemas.CourseUpdate):
+    course = await get_course(db, course_id)
     if not course:
         return None
-    for k, v in data.dict(exclude_unset=True).items():
+    before = _facet_values(course)
+    changes = data.dict(exclude_unset=True)
+    for k, v in changes.items():
         if k == "tags":
-            setattr(course, "tags", _tags_to_str(v))
+            _set_tags(course, v)
         else:
             setattr(course, k, v)
-    db.commit()
-    db.refresh(course)
+    delta = _facet_values(course)
+    delta.subtract(before)
+    await _apply_facet_delta(db, delta)
+    version = await _bump_catalogue_version(db)
+    if "max_students" in changes:
+        # more seats (or no cap any more): serve the waitlist first
+        await db.flush()
+        await waitlist.promote_waitlist(db, course_id)
+    await db.commit()
+    catalogue_cache.forget_version()
+    course_index.apply(course, version)
+    await db.refresh(course)
     return course
 
-def delete_course(db: Session, course_id: str):
-    course = get_course(db, course_id)
+async def delete_course(db: AsyncSession, course_id: str):
+    course = await get_course(db, course_id)
     if not course:
         return False
-    db.delete(course)
-    db.commit()
+    delta = Counter()
+    delta.subtract(_facet_values(course))
+    await _apply_facet_delta(db, delta)
+    version = await _bump_catalogue_version(db)
+    await waitlist.clear_waitlist(db, course_id)
+    await prerequisites.drop_course(db, course_id)
+    await db.delete(course)
+    await db.commit()
+    catalogue_cache.forget_version()
+    course_index.apply(course, version, deleted=True)
     return True
 
-def create_enrollment(db: Session, enrollment_in: schemas.EnrollmentCreate):
-    existing = db.query(models.Enrollment).filter(
-        models.Enrollment.course_id == enrollment_in.course_id,
-        models.Enrollment.student_id == enrollment_in.student_id
-    ).first()
-
-    if existing:
-        raise HTTPException(
-            status_code=400,
-            detail="Student already enrolled in this course"
-        )
-
-    new = models.Enrollment(
-        id=str(uuid.uuid4()),
-        course_id=enrollment_in.course_id,
-        student_id=enrollment_in.student_id,
-        progress=enrollment_in.progress or 0,
-        completed=enrollment_in.completed or False,
-        certificate_issued=enrollment_in.certificate_issued or False,
+async def create_enrollment(db: AsyncSession, enrollment_in: schemas.EnrollmentCreate):
+    """Enroll in one statement that only inserts while a seat is free"""
+    # one anti-join of the precomputed closure against completed courses
+    await prerequisites.require_eligible(db, enrollment_in.course_id, enrollment_in.student_id)
+    enrollment_id = str(uuid.uuid4())
+    inserted = (await db.execute(seats.SEAT_INSERT, {
+        "id": enrollment_id,
+        "course_id": enrollment_in.course_id,
+        "student_id": enrollment_in.student_id,
+        "progress": enrollment_in.progress or 0,
+        "completed": enrollment_in.completed or False,
+        "certificate_issued": enrollment_in.certificate_issued or False,
+    })).rowcount
+    await db.commit()
+
+    if not inserted:
+        # nothing was written; work out which condition stopped it
+        if await get_student_enrollment(db, enrollment_in.course_id, enrollment_in.student_id):
+            raise HTTPException(
+                status_code=400,
+                detail="Student already enrolled in this course"
+            )
+        if await db.scalar(select(models.Course.id).where(models.Course.id == enrollment_in.course_id)) is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        raise HTTPException(status_code=409, detail="Course is full; join the waitlist instead")
+    return await get_enrollment(db, enrollment_id)
+
+# ids per IN (...) lookup; stays well below SQLite's bound-parameter limit
+BULK_LOOKUP_CHUNK = 5000
+
+async def _enrolled_student_ids(db: AsyncSession, course_id: str) -> set:
+    rows = await db.scalars(select(models.Enrollment.student_id).where(models.Enrollment.course_id == course_id))
+    return set(rows)
+
+async def bulk_create_enrollments(db: AsyncSession, course_id: str, student_ids: list) -> schemas.BulkEnrollResponse:
+    """
+    Enroll many students in one transaction: one set query for the students
+    already enrolled, one grouped prerequisite check, one executemany of the
+    seat-checked insert, then a lookup of the generated ids to see which
+    rows made it in (the rest found the course full). Students who miss a
+    prerequisite are reported, not inserted. The waitlist is served before
+    the new students, so they cannot take seats ahead of it. Returns a
+    status per requested student, in request order.
+    """
+    started = time.perf_counter()
+    results = []
+    seen = set()
+    fresh = []
+    existing = await _enrolled_student_ids(db, course_id)
+    for student_id in student_ids:
+        if student_id in seen:
+            results.append((student_id, "duplicate"))
+            continue
+        seen.add(student_id)
+        if student_id in existing:
+            results.append((student_id, "already_enrolled"))
+        else:
+            results.append((student_id, None))
+            fresh.append(student_id)
+
+    ineligible = await prerequisites.ineligible_students(db, course_id, fresh)
+    fresh = [student_id for student_id in fresh if student_id not in ineligible]
+
+    inserted = set()
+    if fresh:
+        # queued students get free seats first; whatever is left goes to fresh
+        await waitlist.promote_waitlist(db, course_id)
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "course_id": course_id,
+                "student_id": student_id,
+                "progress": 0,
+                "completed": False,
+                "certificate_issued": False,
+            }
+            for student_id in fresh
+        ]
+        await db.execute(seats.SEAT_INSERT, rows)
+        # rows keep the ids we generated only if they were inserted; anything
+        # else found the course full or was enrolled concurrently meanwhile
+        for start in range(0, len(rows), BULK_LOOKUP_CHUNK):
+            ids = [row["id"] for row in rows[start:start + BULK_LOOKUP_CHUNK]]
+            inserted.update(await db.scalars(
+                select(models.Enrollment.student_id).where(models.Enrollment.id.in_(ids))
+            ))
+        await db.commit()
+        existing = await _enrolled_student_ids(db, course_id)
+
+    def outcome(student_id):
+        if student_id in ineligible:
+            return "ineligible"
+        if student_id in inserted:
+            return "enrolled"
+        return "already_enrolled" if student_id in existing else "course_full"
+
+    results = [
+        schemas.BulkEnrollResult(student_id=student_id, status=status or outcome(student_id))
+        for student_id, status in results
+    ]
+    tally = Counter(result.status for result in results)
+    return schemas.BulkEnrollResponse(
+        course_id=course_id,
+        requested=len(student_ids),
+        enrolled=tally["enrolled"],
+        already_enrolled=tally["already_enrolled"],
+        course_full=tally["course_full"],
+        ineligible=tally["ineligible"],
+        duplicates=tally["duplicate"],
+        results=results,
+        elapsed_seconds=round(time.perf_counter() - started, 4),
     )
 
-    db.add(new)
-    db.commit()
-    db.refresh(new)
-    return new
-
-def get_student_enrollment(db: Session, course_id: str, student_id: str):
-    return db.query(models.Enrollment).filter(
+async def get_student_enrollment(db: AsyncSession, course_id: str, student_id: str):
+    return await db.scalar(select(models.Enrollment).where(
         models.Enrollment.course_id == course_id,
         models.Enrollment.student_id == student_id
-    ).first()
+    ))
 
-def get_enrollment(db: Session, enrollment_id: str):
-    return db.query(models.Enrollment).filter(models.Enrollment.id == enrollment_id).first()
+async def get_enrollment(db: AsyncSession, enrollment_id: str):
+    return await db.scalar(select(models.Enrollment).where(models.Enrollment.id == enrollment_id))
 
-def list_enrollments_by_course(db: Session, course_id: str, skip: int = 0, limit: int = 50):
-    return db.query(models.Enrollment).filter(models.Enrollment.course_id == course_id).offset(skip).limit(limit).all()
+async def list_enrollments_by_course(db: AsyncSession, course_id: str, skip: int = 0, limit: int = 50, cursor: str | None = None):
+    query = select(models.Enrollment).where(models.Enrollment.course_id == course_id)
+    return (await db.scalars(_page(query, ENROLLMENT_ORDER, cursor, skip, limit))).all()
 
-def list_enrollments_by_student(db: Session, student_id: str, skip: int = 0, limit: int = 50):
-    return db.query(models.Enrollment).filter(models.Enrollment.student_id == student_id).offset(skip).limit(limit).all()
+async def list_enrollments_by_student(db: AsyncSession, student_id: str, skip: int = 0, limit: int = 50, cursor: str | None = None):
+    query = select(models.Enrollment).where(models.Enrollment.student_id == student_id)
+    return (await db.scalars(_page(query, ENROLLMENT_ORDER, cursor, skip, limit))).all()
 
-def get_enrolled_courses_by_student(db: Session, student_id: str):
-    enrollments = db.query(models.Enrollment).filter(models.Enrollment.student_id == student_id).all()
+async def get_enrolled_courses_by_student(db: AsyncSession, student_id: str):
+    enrollments = (await db.scalars(
+        select(models.Enrollment).where(models.Enrollment.student_id == student_id)
+    )).all()
     course_ids = [enrollment.course_id for enrollment in enrollments]
-    courses = db.query(models.Course).filter(models.Course.id.in_(course_ids)).all()
+    courses = (await db.scalars(select(models.Course).where(models.Course.id.in_(course_ids)))).all()
     return courses
 
-def update_enrollment(db: Session, enrollment_id: str, data: schemas.EnrollmentBase):
-    enrollment = get_enrollment(db, enrollment_id)
+# what an enrollment has achieved; prerequisites are checked against
+# `completed`, so only instructors and admins may write these
+PROGRESS_FIELDS = ("progress", "completed", "certificate_issued")
+
+def progress_changes(enrollment: models.Enrollment, data: schemas.EnrollmentBase) -> list:
+    """PROGRESS_FIELDS that `data` sets to a new value"""
+    sent = data.dict(exclude_unset=True)
+    return [field for field in PROGRESS_FIELDS if field in sent and sent[field] != getattr(enrollment, field)]
+
+async def update_enrollment(db: AsyncSession, enrollment_id: str, data: schemas.EnrollmentBase):
+    enrollment = await get_enrollment(db, enrollment_id)
     if not enrollment:
         return None
-    for k, v in data.dict(exclude_unset=True).items():
+    changes = data.dict(exclude_unset=True)
+    course_id = changes.get("course_id", enrollment.course_id)
+    student_id = changes.get("student_id", enrollment.student_id)
+    if (course_id, student_id) != (enrollment.course_id, enrollment.student_id):
+        return await _move_enrollment(db, enrollment, course_id, student_id, changes)
+    for k, v in changes.items():
         setattr(enrollment, k, v)
-    db.commit()
-    db.refresh(enrollment)
+    await db.commit()
+    await db.refresh(enrollment)
     return enrollment
 
-def delete_enrollment(db: Session, enrollment_id: str):
-    enrollment = get_enrollment(db, enrollment_id)
+async def _move_enrollment(db: AsyncSession, enrollment: models.Enrollment, course_id: str, student_id: str,
+                           changes: dict):
+    """
+    Move an enrollment to another course or student: delete it and enroll
+    again through the seat-checked insert, keeping its id, so a move can
+    neither fill a course past max_students nor duplicate a
+    (course, student) pair. Nothing is written unless the insert succeeds.
+    """
+    await prerequisites.require_eligible(db, course_id, student_id)
+    old_course_id = enrollment.course_id
+    # progress in one course says nothing about another, and carrying a
+    # completion over would satisfy prerequisites it never earned
+    kept = {field: getattr(enrollment, field) for field in PROGRESS_FIELDS} if course_id == old_course_id else {}
+    values = {
+        "id": enrollment.id,
+        "course_id": course_id,
+        "student_id": student_id,
+        "progress": changes.get("progress", kept.get("progress")) or 0,
+        "completed": changes.get("completed", kept.get("completed")) or False,
+        "certificate_issued": changes.get("certificate_issued", kept.get("certificate_issued")) or False,
+    }
+    await db.delete(enrollment)
+    await db.flush()
+    try:
+        inserted = (await db.execute(seats.SEAT_INSERT, values)).rowcount
+    except IntegrityError:
+        inserted = 0
+    if not inserted:
+        await db.rollback()
+        if await get_student_enrollment(db, course_id, student_id):
+            raise HTTPException(status_code=409, detail="Student already enrolled in this course")
+        if await db.scalar(select(models.Course.id).where(models.Course.id == course_id)) is None:
+            raise HTTPException(status_code=404, detail="Course not found")
+        raise HTTPException(status_code=409, detail="Course is full; join the waitlist instead")
+    if course_id != old_course_id:
+        # the seat left behind goes to the head of the old course's waitlist
+        await waitlist.promote_waitlist(db, old_course_id)
+    await db.commit()
+    return await get_enrollment(db, values["id"])
+
+async def delete_enrollment(db: AsyncSession, enrollment_id: str):
+    enrollment = await get_enrollment(db, enrollment_id)
     if not enrollment:
         return False
-    db.delete(enrollment)
-    db.commit()
+    await db.delete(enrollment)
+    # the freed seat goes to the head of the waitlist in the same transaction
+    await db.flush()
+    await waitlist.promote_waitlist(db, enrollment.course_id)
+    await db.commit()
     return True
 
 
@@ -1,11 +1,19 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from app import courses
+from .database import engine, Base, create_missing_indexes, AsyncSessionLocal
+from app import autocomplete, courses, crud, prerequisites, search, seats, similar, waitlist
+from app.auth_utils import start_revocation_sync, stop_revocation_sync
 
 # Create all tables in the database
 Base.metadata.create_all(bind=engine)
+# enrolled_count column and seat triggers for older databases; reports
+# duplicate enrollments that keep the unique index from being built
+blocked_indexes = seats.prepare_seat_counters(engine)
+# create_all skips indexes on tables that already exist
+create_missing_indexes(Base.metadata, engine, skip=blocked_indexes)
+# FTS5 index and sync triggers behind /api/search/courses
+search.create_search_index(engine)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -30,13 +38,57 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],    # Allow GET, POST, PUT, DELETE, etc.
     allow_headers=["*"],    # Allow all headers
+    expose_headers=[courses.NEXT_CURSOR_HEADER, "ETag"],  # let the frontend read cursors and ETags
 )
 
 # =========================
 # ROUTERS
 # =========================
 # All course routes prefixed with /api
+# before courses: /courses/{id}/waitlist/me would otherwise match the
+# four-segment /courses/{category}/{department}/{level}/{type} route
+app.include_router(autocomplete.router, prefix="/api", tags=["Autocomplete"])
+app.include_router(waitlist.router, prefix="/api", tags=["Waitlist"])
+app.include_router(prerequisites.router, prefix="/api", tags=["Prerequisites"])
+app.include_router(similar.router, prefix="/api", tags=["Similar"])
 app.include_router(courses.router, prefix="/api", tags=["Courses"])
+app.include_router(search.router, prefix="/api", tags=["Search"])
+
+# =========================
+# FACET COUNTS
+# =========================
+# Seed the counter table the first time the service starts on an
+# existing database; afterwards crud keeps it current
+@app.on_event("startup")
+async def seed_facet_counts():
+    async with AsyncSessionLocal() as db:
+        # course_tags is new; fill it from the JSON tags column first
+        await crud.ensure_course_tags(db)
+        await crud.ensure_facet_counts(db)
+
+# Build the default catalogue responses before the first visitor asks
+@app.on_event("startup")
+async def warm_catalogue_cache():
+    async with AsyncSessionLocal() as db:
+        await courses.warm_catalogue_cache(db)
+
+# Load the autocomplete prefix index; crud keeps it current afterwards
+@app.on_event("startup")
+async def load_autocomplete_index():
+    async with AsyncSessionLocal() as db:
+        await autocomplete.course_index.load(db)
+
+# =========================
+# TOKEN REVOCATION SYNC
+# =========================
+# Keeps the in-memory revocation filter in step with the auth service
+@app.on_event("startup")
+def start_token_revocation_sync():
+    start_revocation_sync()
+
+@app.on_event("shutdown")
+def stop_token_revocation_sync():
+    stop_revocation_sync()
 
 # =========================
 # ROOT ROUTE
@@ -0,0 +1,76 @@
+# app/merge_duplicate_enrollments.py
+"""
+One-off migration: merge duplicate (course, student) enrollments and build
+the unique enrollment index.
+
+Databases written by the old SELECT-then-INSERT enrollment path can hold
+the same student twice in a course. Until they are merged the service
+starts without ux_enrollments_course_student and cannot enroll anyone
+(see seats.py). For each duplicated pair this keeps the earliest row and
+gives it the highest progress, the earliest enrolled_at and completed /
+certificate_issued if any of the rows had them. It then deletes the other
+rows, logging every removed id. The merge and the index build happen in one
+transaction. With --dry-run it only reports.
+
+    python -m app.merge_duplicate_enrollments [--dry-run]   (from backend/createCourse)
+"""
+import argparse
+import logging
+
+from app import models
+from app.database import engine
+from app.seats import UNIQUE_ENROLLMENT_INDEX, find_duplicate_enrollments
+
+logger = logging.getLogger("merge_duplicate_enrollments")
+
+ROWS_SQL = """SELECT id, enrolled_at, progress, completed, certificate_issued FROM enrollments
+WHERE course_id = ? AND student_id = ? ORDER BY rowid"""
+
+
+def merge_pair(conn, course_id: str, student_id: str) -> list:
+    """Fold every enrollment of the pair into the earliest one; returns the removed ids"""
+    keep, *extra = conn.exec_driver_sql(ROWS_SQL, (course_id, student_id)).all()
+    rows = [keep, *extra]
+    enrolled = [row.enrolled_at for row in rows if row.enrolled_at is not None]
+    conn.exec_driver_sql(
+        "UPDATE enrollments SET progress = ?, completed = ?, certificate_issued = ?, enrolled_at = ? WHERE id = ?",
+        (
+            max(row.progress or 0 for row in rows),
+            any(row.completed for row in rows),
+            any(row.certificate_issued for row in rows),
+            min(enrolled) if enrolled else keep.enrolled_at,
+            keep.id,
+        ),
+    )
+    removed = [row.id for row in extra]
+    for row in extra:
+        logger.info("removed enrollment %s (course %s, student %s, progress %s, completed %s, "
+                    "certificate %s); merged into %s",
+                    row.id, course_id, student_id, row.progress, bool(row.completed),
+                    bool(row.certificate_issued), keep.id)
+        conn.exec_driver_sql("DELETE FROM enrollments WHERE id = ?", (row.id,))
+    return removed
+
+
+def main(dry_run: bool = False) -> None:
+    with engine.begin() as conn:
+        duplicates = find_duplicate_enrollments(conn)
+        logger.info("%d (course, student) pairs are enrolled more than once", len(duplicates))
+        if dry_run:
+            for course_id, student_id, rows in duplicates:
+                logger.info("course %s, student %s: %d enrollments", course_id, student_id, rows)
+            return
+        removed = 0
+        for course_id, student_id, _ in duplicates:
+            removed += len(merge_pair(conn, course_id, student_id))
+        for index in models.Enrollment.__table__.indexes:
+            if index.name == UNIQUE_ENROLLMENT_INDEX:
+                index.create(conn, checkfirst=True)
+    logger.info("removed %d enrollments; %s is in place", removed, UNIQUE_ENROLLMENT_INDEX)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report duplicates without changing anything")
+    main(parser.parse_args().dry_run)
@@ -1,5 +1,6 @@
 # app/models.py
-from sqlalchemy import Column, String, Text, Integer, Boolean, DateTime
+from sqlalchemy import Column, String, Text, Integer, Float, Boolean, DateTime, Index, PrimaryKeyConstraint, ForeignKey
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -20,12 +21,64 @@ class Course(Base):
     allow_self_enrollment = Column(Boolean, default=True)
     certificate = Column(Boolean, default=True)
     max_students = Column(Integer, nullable=True)
+    # maintained by triggers on enrollments (see seats.py)
+    enrolled_count = Column(Integer, nullable=False, default=0, server_default="0")
     prerequisites = Column(Text, nullable=True)  # store as comma-separated or JSON string
     learning_outcomes = Column(Text, nullable=True)  # store as comma-separated or JSON
-    tags = Column(Text, nullable=True)  # store as comma-separated or JSON string
+    # JSON copy of the tags; the FTS index (search.py) and streamed exports
+    # read it. Everything else goes through course_tags / `tags` below.
+    tags_json = Column("tags", Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
 
+    # keyset pagination: (created_at, id) is the catalogue sort key
+    #
+    # Catalogue filters: SQLite uses one index per query, so each optional
+    # student filter gets its own (is_published, <filter>) index ending in
+    # the sort key. The planner picks the most selective one (ANALYZE
+    # stats) and checks the remaining filters on the matching rows, and
+    # the page still comes out of the index in order without a sort.
+    # The instructor route always sends all four filters, so it gets one
+    # exact index.
+    __table_args__ = (
+        Index("ix_courses_created_id", "created_at", "id"),
+        Index("ix_courses_published_created_id", "is_published", "created_at", "id"),
+        Index("ix_courses_published_category", "is_published", "category", "created_at", "id"),
+        Index("ix_courses_published_department", "is_published", "department", "created_at", "id"),
+        Index("ix_courses_published_level", "is_published", "level", "created_at", "id"),
+        Index("ix_courses_published_type", "is_published", "course_type", "created_at", "id"),
+        Index("ix_courses_published_duration", "is_published", "duration", "created_at", "id"),
+        Index("ix_courses_instructor_created_id", "instructor_id", "created_at", "id"),
+        Index(
+            "ix_courses_instructor_filters",
+            "instructor_id", "category", "department", "level", "course_type", "created_at", "id",
+        ),
+    )
+
+    # selectin: a page of courses loads all of its tags with one
+    # `WHERE course_id IN (...)` query
+    tag_links = relationship(
+        "CourseTag", order_by="CourseTag.position", cascade="all, delete-orphan", lazy="selectin",
+    )
+
+    @property
+    def tags(self) -> list:
+        return [link.tag for link in self.tag_links]
+
+
+class CourseTag(Base):
+    __tablename__ = "course_tags"
+
+    tag = Column(String, nullable=False)
+    course_id = Column(String, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False, default=0)  # order the instructor gave
+
+    # (tag, course_id) answers ?tag= filters; course_id serves tag hydration
+    __table_args__ = (
+        PrimaryKeyConstraint("tag", "course_id"),
+        Index("ix_course_tags_course_id", "course_id"),
+    )
+
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
@@ -37,4 +90,96 @@ class Enrollment(Base):
     progress = Column(Integer, default=0)  # percentage of course completed
     completed = Column(Boolean, default=False)
     certificate_issued = Column(Boolean, default=False)
-    
\ No newline at end of file
+
+    # keyset pagination: (enrolled_at, id) within a course or a student
+    __table_args__ = (
+        Index("ix_enrollments_course_enrolled_id", "course_id", "enrolled_at", "id"),
+        Index("ix_enrollments_student_enrolled_id", "student_id", "enrolled_at", "id"),
+        # one enrollment per student and course; the ON CONFLICT target in
+        # crud.create_enrollment
+        Index("ux_enrollments_course_student", "course_id", "student_id", unique=True),
+    )
+
+
+class CoursePrerequisite(Base):
+    """Direct edge: course_id requires prerequisite_id (see prerequisites.py)"""
+    __tablename__ = "course_prerequisites"
+
+    course_id = Column(String, nullable=False)
+    prerequisite_id = Column(String, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("course_id", "prerequisite_id"),
+        Index("ix_course_prerequisites_prerequisite", "prerequisite_id"),
+    )
+
+
+class CoursePrerequisiteClosure(Base):
+    """Every course that course_id requires, directly or transitively"""
+    __tablename__ = "course_prerequisite_closure"
+
+    course_id = Column(String, nullable=False)
+    required_id = Column(String, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("course_id", "required_id"),
+        # courses that depend on a given course, for recomputation
+        Index("ix_course_prerequisite_closure_required", "required_id"),
+    )
+
+
+class CourseSimilar(Base):
+    """Precomputed "similar courses" list, written by app.build_similar"""
+    __tablename__ = "course_similar"
+
+    course_id = Column(String, nullable=False)
+    rank = Column(Integer, nullable=False)  # 1 = most similar
+    similar_id = Column(String, nullable=False)
+    score = Column(Float, nullable=False)  # cosine similarity
+
+    __table_args__ = (PrimaryKeyConstraint("course_id", "rank"),)
+
+
+class CourseSimilarState(Base):
+    """Fingerprint of the text each course's vector was built from, for incremental runs"""
+    __tablename__ = "course_similar_state"
+
+    course_id = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+
+
+class WaitlistEntry(Base):
+    """A student queued for a full course (see waitlist.py)"""
+    __tablename__ = "course_waitlist"
+
+    id = Column(String, primary_key=True)
+    course_id = Column(String, nullable=False)
+    student_id = Column(String, nullable=False)
+    ticket = Column(Integer, nullable=False)  # per-course, contiguous; the lowest is next in line
+    joined_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # one place per student; also the position lookup
+        Index("ux_course_waitlist_student", "course_id", "student_id", unique=True),
+        # head/tail of each queue (min/max ticket) and FIFO order
+        Index("ix_course_waitlist_ticket", "course_id", "ticket"),
+    )
+
+
+class CourseFacetCount(Base):
+    """Published-course count per filter value, kept current by crud"""
+    __tablename__ = "course_facet_counts"
+
+    facet = Column(String, nullable=False)   # "category", "department", ...
+    value = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (PrimaryKeyConstraint("facet", "value"),)
+
+
+class CatalogueVersion(Base):
+    """Single row (id=1) bumped on every course write; keys the response cache"""
+    __tablename__ = "catalogue_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,193 @@
+# app/prerequisites.py
+"""
+Course prerequisite graph (GET/PUT /api/courses/{id}/prerequisites).
+
+course_prerequisites holds the direct edges: course_id needs
+prerequisite_id. course_prerequisite_closure holds every course each
+course transitively requires. Writes keep it current, so an eligibility
+check at enrollment is one indexed anti-join of the closure against the
+student's completed enrollments. Nothing is walked recursively per
+request.
+
+Writes are rare, so they do the expensive part. A new edge course -> p
+would close a cycle exactly when p already requires course, which is a
+single closure lookup. After edges change, the closure rows of the
+course and of everything that requires it are rebuilt in dependency
+order. Each row set is its direct prerequisites plus their (already
+rebuilt) closures, so no recursive walk of the graph is needed.
+
+A prerequisite counts as met when the student's enrollment in it is
+`completed`. Only instructors and admins can set that flag (see
+crud.PROGRESS_FIELDS), and it does not follow an enrollment to another
+course.
+
+The free-text Course.prerequisites column stays as a description for
+humans; only these edges are enforced.
+"""
+from graphlib import TopologicalSorter
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import auth_utils, database, models, schemas
+
+router = APIRouter(prefix="/courses", tags=["Prerequisites"])
+
+Edge = models.CoursePrerequisite
+Closure = models.CoursePrerequisiteClosure
+
+# student ids per IN (...) in ineligible_students
+ELIGIBILITY_CHUNK = 5000
+
+# closure of one course from its direct prerequisites and their closures;
+# correct as long as those closures already are
+CLOSURE_INSERT = text("""
+    INSERT OR IGNORE INTO course_prerequisite_closure (course_id, required_id)
+    SELECT :course_id, prerequisite_id FROM course_prerequisites WHERE course_id = :course_id
+    UNION
+    SELECT :course_id, closure.required_id
+    FROM course_prerequisites AS edge
+    JOIN course_prerequisite_closure AS closure ON closure.course_id = edge.prerequisite_id
+    WHERE edge.course_id = :course_id
+""")
+
+
+async def _dependents(db: AsyncSession, course_id: str) -> set:
+    """Courses that require `course_id`, directly or not"""
+    return set(await db.scalars(select(Closure.course_id).where(Closure.required_id == course_id)))
+
+
+async def _recompute(db: AsyncSession, affected: set):
+    """Rebuild the closure rows of `affected`, prerequisites before dependents"""
+    if not affected:
+        return
+    affected = list(affected)
+    await db.execute(delete(Closure).where(Closure.course_id.in_(affected)))
+    inner = await db.execute(
+        select(Edge.course_id, Edge.prerequisite_id)
+        .where(Edge.course_id.in_(affected), Edge.prerequisite_id.in_(affected))
+    )
+    order = TopologicalSorter({course_id: set() for course_id in affected})
+    for course_id, prerequisite_id in inner:
+        order.add(course_id, prerequisite_id)
+    # executemany runs in order, so each course sees the rows just written
+    # for the prerequisites before it
+    await db.execute(CLOSURE_INSERT, [{"course_id": course_id} for course_id in order.static_order()])
+
+
+async def get_prerequisites(db: AsyncSession, course_id: str) -> schemas.PrerequisiteSet:
+    direct = await db.scalars(select(Edge.prerequisite_id).where(Edge.course_id == course_id).order_by(Edge.prerequisite_id))
+    required = await db.scalars(select(Closure.required_id).where(Closure.course_id == course_id).order_by(Closure.required_id))
+    return schemas.PrerequisiteSet(course_id=course_id, direct=list(direct), required=list(required))
+
+
+async def set_prerequisites(db: AsyncSession, course_id: str, prerequisite_ids: List[str]):
+    """Replace the direct prerequisites of a course; the caller commits"""
+    wanted = set(prerequisite_ids)
+    if course_id in wanted:
+        raise HTTPException(status_code=400, detail="A course cannot be its own prerequisite")
+    if wanted:
+        known = set(await db.scalars(select(models.Course.id).where(models.Course.id.in_(wanted))))
+        if known != wanted:
+            raise HTTPException(status_code=400, detail=f"Unknown prerequisite courses: {', '.join(sorted(wanted - known))}")
+        # p -> ... -> course already exists, so course -> p would close a loop
+        loops = list(await db.scalars(
+            select(Closure.course_id).where(Closure.course_id.in_(wanted), Closure.required_id == course_id)
+        ))
+        if loops:
+            raise HTTPException(status_code=400, detail=f"Prerequisite cycle through: {', '.join(sorted(loops))}")
+
+    current = set(await db.scalars(select(Edge.prerequisite_id).where(Edge.course_id == course_id)))
+    if current == wanted:
+        return
+    if current - wanted:
+        await db.execute(delete(Edge).where(Edge.course_id == course_id, Edge.prerequisite_id.in_(current - wanted)))
+    if wanted - current:
+        await db.execute(insert(Edge), [{"course_id": course_id, "prerequisite_id": p} for p in wanted - current])
+    await _recompute(db, {course_id} | await _dependents(db, course_id))
+
+
+async def drop_course(db: AsyncSession, course_id: str):
+    """Remove a deleted course from the graph; the caller commits"""
+    dependents = await _dependents(db, course_id)
+    await db.execute(delete(Edge).where((Edge.course_id == course_id) | (Edge.prerequisite_id == course_id)))
+    await db.execute(delete(Closure).where(Closure.course_id == course_id))
+    await _recompute(db, dependents)
+
+
+async def missing_prerequisites(db: AsyncSession, course_id: str, student_id: str) -> List[str]:
+    """Codes of required courses the student has not completed; empty when eligible"""
+    completed = select(models.Enrollment.course_id).where(
+        models.Enrollment.student_id == student_id, models.Enrollment.completed == True,
+    )
+    rows = await db.scalars(
+        select(models.Course.code)
+        .join(Closure, Closure.required_id == models.Course.id)
+        .where(Closure.course_id == course_id, Closure.required_id.notin_(completed))
+        .order_by(models.Course.code)
+    )
+    return list(rows)
+
+
+async def require_eligible(db: AsyncSession, course_id: str, student_id: str):
+    missing = await missing_prerequisites(db, course_id, student_id)
+    if missing:
+        raise HTTPException(status_code=403, detail=f"Missing prerequisites: {', '.join(missing)}")
+
+
+async def ineligible_students(db: AsyncSession, course_id: str, student_ids: List[str]) -> set:
+    """
+    Students among `student_ids` who have not completed every course that
+    `course_id` requires. Bulk enrollment uses it instead of one
+    require_eligible per student: a single grouped join of the closure
+    with completed enrollments finds the eligible ones.
+    """
+    required = await db.scalar(select(func.count()).select_from(Closure).where(Closure.course_id == course_id))
+    if not required or not student_ids:
+        return set()
+    eligible = set()
+    for start in range(0, len(student_ids), ELIGIBILITY_CHUNK):
+        eligible.update(await db.scalars(
+            select(models.Enrollment.student_id)
+            .join(Closure, Closure.required_id == models.Enrollment.course_id)
+            .where(
+                Closure.course_id == course_id,
+                models.Enrollment.completed == True,
+                models.Enrollment.student_id.in_(student_ids[start:start + ELIGIBILITY_CHUNK]),
+            )
+            .group_by(models.Enrollment.student_id)
+            .having(func.count(func.distinct(models.Enrollment.course_id)) == required)
+        ))
+    return set(student_ids) - eligible
+
+
+async def rebuild_closure(db: AsyncSession):
+    """Recompute the whole closure table, e.g. after editing edges by hand"""
+    await db.execute(delete(Closure))
+    courses = set(await db.scalars(select(Edge.course_id).distinct()))
+    await _recompute(db, courses)
+    await db.commit()
+
+
+@router.get("/{course_id}/prerequisites", response_model=schemas.PrerequisiteSet)
+async def read_prerequisites(course_id: str, db: AsyncSession = Depends(database.get_read_db)):
+    if await db.scalar(select(models.Course.id).where(models.Course.id == course_id)) is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return await get_prerequisites(db, course_id)
+
+
+@router.put("/{course_id}/prerequisites", response_model=schemas.PrerequisiteSet,
+            dependencies=[Depends(auth_utils.require_role(["instructor", "admin"]))])
+async def replace_prerequisites(course_id: str, payload: schemas.PrerequisiteUpdate,
+                                db: AsyncSession = Depends(database.get_db),
+                                token=Depends(auth_utils.get_current_user_token)):
+    instructor_id = await db.scalar(select(models.Course.instructor_id).where(models.Course.id == course_id))
+    if instructor_id is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if token.role != "admin" and instructor_id != token.sub:
+        raise HTTPException(status_code=403, detail="Not allowed to edit this course")
+    await set_prerequisites(db, course_id, payload.course_ids)
+    await db.commit()
+    return await get_prerequisites(db, course_id)
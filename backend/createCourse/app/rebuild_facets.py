@@ -0,0 +1,24 @@
+# app/rebuild_facets.py
+"""
+Recompute course_facet_counts from the courses table.
+
+The counts are maintained incrementally by crud; run this after writing to
+`courses` outside the service or if the counts are ever suspected to drift:
+
+    python -m app.rebuild_facets        (from backend/createCourse)
+"""
+import asyncio
+import json
+
+from app import crud, database
+
+
+async def main():
+    async with database.AsyncSessionLocal() as db:
+        counts = await crud.rebuild_facet_counts(db)
+    await database.async_engine.dispose()
+    print(json.dumps(counts, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+# app/response_cache.py
+"""
+Server-side response cache with ETags for the published catalogue.
+
+The catalogue changes a few times a day but is read on every page view.
+CatalogueCache keeps each serialized response body keyed by (route
+parameters, catalogue version). The version lives in the database
+(catalogue_version table). crud bumps it in the same transaction as every
+course write. A cache hit costs a dict lookup; nothing is re-queried or
+re-serialized. The version itself is re-read at most every
+CATALOGUE_VERSION_TTL_SECONDS. Writes made by this process drop the
+remembered version at once, and other workers see them within that
+interval.
+
+Every body carries a strong ETag (a hash of its bytes). A matching
+If-None-Match gets a 304 with no body. The ETag depends only on the
+content, so clients keep getting 304s across writes that did not change
+what they are looking at.
+
+Entries also expire after CATALOGUE_CACHE_TTL_SECONDS, which bounds
+staleness after writes that bypass crud, e.g. scripts editing courses.db.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, NamedTuple
+
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+CATALOGUE_CACHE_SIZE = int(os.getenv("CATALOGUE_CACHE_SIZE", 1024))
+CATALOGUE_CACHE_TTL_SECONDS = int(os.getenv("CATALOGUE_CACHE_TTL_SECONDS", 300))
+CATALOGUE_VERSION_TTL_SECONDS = float(os.getenv("CATALOGUE_VERSION_TTL_SECONDS", 1.0))
+
+# browsers and proxies may store the body but must revalidate each time
+CACHE_CONTROL = "public, no-cache"
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: bytes
+    headers: dict
+    expires_at: float
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # weak comparison, as RFC 9110 specifies for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+async def get_catalogue_version(db: AsyncSession) -> int:
+    return await db.scalar(select(models.CatalogueVersion.version).where(models.CatalogueVersion.id == 1)) or 0
+
+
+class CatalogueCache:
+    """LRU of serialized responses, keyed by (version, route key)"""
+
+    def __init__(
+        self,
+        maxsize: int = CATALOGUE_CACHE_SIZE,
+        ttl_seconds: int = CATALOGUE_CACHE_TTL_SECONDS,
+        version_ttl_seconds: float = CATALOGUE_VERSION_TTL_SECONDS,
+    ):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.version_ttl_seconds = version_ttl_seconds
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._building: dict = {}
+        self._version = None
+        self._version_read_at = 0.0
+
+    async def current_version(self, db: AsyncSession) -> int:
+        now = time.monotonic()
+        if self._version is None or now - self._version_read_at >= self.version_ttl_seconds:
+            self._version = await get_catalogue_version(db)
+            self._version_read_at = now
+        return self._version
+
+    def forget_version(self) -> None:
+        """Call after committing a course write so this process re-reads the version"""
+        self._version = None
+
+    def _get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: tuple, body: bytes, headers: dict) -> CachedResponse:
+        entry = CachedResponse(_etag(body), body, headers, time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    async def get_or_build(
+        self,
+        db: AsyncSession,
+        route_key: Hashable,
+        build: Callable[[], Awaitable[tuple]],
+    ) -> CachedResponse:
+        """Cached entry for `route_key` at the current version; `build()` returns (body, headers) on a miss"""
+        key = (await self.current_version(db), route_key)
+        entry = self._get(key)
+        if entry is not None:
+            return entry
+
+        # single flight: concurrent misses for one key wait for the first build
+        pending = self._building.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._building[key] = future
+        try:
+            body, headers = await build()
+            entry = self._put(key, body, headers)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # nobody may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        finally:
+            del self._building[key]
+
+    async def respond(
+        self,
+        request: Request,
+        db: AsyncSession,
+        route_key: Hashable,
+        build: Callable[[], Awaitable[tuple]],
+    ) -> Response:
+        entry = await self.get_or_build(db, route_key, build)
+        headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+        if _if_none_match(request, entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers={**entry.headers, **headers})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self._version = None
+
+
+catalogue_cache = CatalogueCache()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, field_validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 import json
 
@@ -21,6 +21,7 @@ class CourseBase(BaseModel):
 class CourseCreate(CourseBase):
     prerequisites: Optional[str] = None
     learning_outcomes: Optional[str] = None
+    prerequisite_ids: Optional[List[str]] = None  # enforced prerequisite courses
 
 class CourseUpdate(CourseBase):
     pass
@@ -46,6 +47,13 @@ class CourseOut(CourseBase):
                 return []
         return v
     
+# facet -> value -> number of published courses
+FacetCounts = Dict[str, Dict[str, int]]
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
 class EnrollmentBase(BaseModel):
     course_id: str
     student_id: str
@@ -61,4 +69,56 @@ class EnrollmentOut(EnrollmentBase):
     enrolled_at: datetime
 
     class Config:
-        from_attributes = True        
+        from_attributes = True
+
+# Bulk (cohort) enrollment: explicit ids, a whole program, or both
+class BulkEnrollRequest(BaseModel):
+    student_ids: List[str] = []
+    program: Optional[str] = None
+
+class BulkEnrollResult(BaseModel):
+    student_id: str
+    status: str  # enrolled | already_enrolled | course_full | ineligible | duplicate
+
+class BulkEnrollResponse(BaseModel):
+    course_id: str
+    requested: int
+    enrolled: int
+    already_enrolled: int
+    course_full: int
+    ineligible: int  # missing a prerequisite; not enrolled
+    duplicates: int
+    results: List[BulkEnrollResult]
+    elapsed_seconds: float
+
+# A student's place on a course waitlist; position is 1 for next in line
+class WaitlistStatus(BaseModel):
+    course_id: str
+    student_id: str
+    status: str  # enrolled | waitlisted
+    position: Optional[int] = None
+    waiting: int  # students currently queued for the course
+
+# Enforced prerequisites of a course: its direct edges and the full
+# transitive set a student must have completed
+class PrerequisiteSet(BaseModel):
+    course_id: str
+    direct: List[str]
+    required: List[str]
+
+class PrerequisiteUpdate(BaseModel):
+    course_ids: List[str]
+
+# "Students also looked at" suggestion on a course page
+class SimilarCourse(BaseModel):
+    id: str
+    code: str
+    title: str
+    category: Optional[str] = None
+    score: float
+
+# autocomplete match (see app/autocomplete.py)
+class CourseSuggestion(BaseModel):
+    id: str
+    code: str
+    title: str
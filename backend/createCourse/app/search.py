@@ -0,0 +1,137 @@
+# app/search.py
+"""
+Full-text course search (GET /api/search/courses).
+
+courses_fts is an FTS5 index over title, code, description, tags and
+learning_outcomes. It is an external-content table: it stores only the
+index, keyed by the courses rowid, and reads column values back from
+`courses`. Triggers on `courses` keep it in sync for every writer, not
+just this service's CRUD. The update trigger only fires when an indexed
+column changes.
+
+Results are ranked by BM25 with per-column weights (a hit in the title
+outranks a hit in the description). The user's text is reduced to quoted
+tokens, with a prefix match on the last one for search-as-you-type, so
+stray FTS syntax in the query can never raise an error.
+
+VACUUM may renumber rowids of tables without an INTEGER PRIMARY KEY; run
+rebuild_search_index() after a VACUUM.
+"""
+import re
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, literal_column, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database, models, schemas
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+# column -> BM25 weight, in FTS column order
+FTS_COLUMNS = {
+    "title": 10.0,
+    "code": 8.0,
+    "description": 1.0,
+    "tags": 4.0,
+    "learning_outcomes": 2.0,
+}
+
+_columns = ", ".join(FTS_COLUMNS)
+_new_values = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+_old_values = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+
+SEARCH_INDEX_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5(
+        {_columns},
+        content='courses', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS courses_fts_ai AFTER INSERT ON courses BEGIN
+        INSERT INTO courses_fts(rowid, {_columns}) VALUES (new.rowid, {_new_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS courses_fts_ad AFTER DELETE ON courses BEGIN
+        INSERT INTO courses_fts(courses_fts, rowid, {_columns}) VALUES ('delete', old.rowid, {_old_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS courses_fts_au AFTER UPDATE OF {_columns} ON courses BEGIN
+        INSERT INTO courses_fts(courses_fts, rowid, {_columns}) VALUES ('delete', old.rowid, {_old_values});
+        INSERT INTO courses_fts(rowid, {_columns}) VALUES (new.rowid, {_new_values});
+    END""",
+]
+
+# Query-side handle on the virtual table; kept out of Base.metadata so
+# create_all never tries to create it as a regular table
+courses_fts = Table(
+    "courses_fts", MetaData(),
+    Column("rowid", Integer),
+    Column("courses_fts", String),
+)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def create_search_index(engine: Engine) -> None:
+    """Create the FTS table and triggers, indexing existing courses the first time"""
+    with engine.begin() as conn:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'courses_fts'"
+        ).first()
+        for statement in SEARCH_INDEX_DDL:
+            conn.exec_driver_sql(statement)
+        if not exists:
+            conn.exec_driver_sql("INSERT INTO courses_fts(courses_fts) VALUES ('rebuild')")
+
+
+def rebuild_search_index(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO courses_fts(courses_fts) VALUES ('rebuild')")
+
+
+def to_match_expression(text: str) -> str | None:
+    """'Data struct' -> '"data" "struct"*' (all tokens required, last one as a prefix)"""
+    tokens = [t.lower() for t in _TOKEN_RE.findall(text)]
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"' for t in tokens) + "*"
+
+
+async def search_courses(
+    db: AsyncSession,
+    text: str,
+    category: str | None = None,
+    level: str | None = None,
+    skip: int = 0,
+    limit: int = 20,
+):
+    match = to_match_expression(text)
+    if match is None:
+        return []
+    rank = func.bm25(literal_column("courses_fts"), *FTS_COLUMNS.values())
+    query = (
+        select(models.Course)
+        .join(courses_fts, courses_fts.c.rowid == literal_column("courses.rowid"))
+        .where(courses_fts.c.courses_fts.match(match))
+        .where(models.Course.is_published == True)
+    )
+    if category:
+        query = query.where(models.Course.category == category)
+    if level:
+        query = query.where(models.Course.level == level)
+    query = query.order_by(rank).offset(skip).limit(limit)
+    return (await db.scalars(query)).all()
+
+
+@router.get("/courses", response_model=List[schemas.CourseOut])
+async def search_courses_route(
+    query: str = Query(..., min_length=1),
+    category: str | None = None,
+    level: str | None = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(database.get_read_db),
+):
+    courses = await search_courses(
+        db, query, category=category, level=level, skip=(page - 1) * page_size, limit=page_size,
+    )
+    return [schemas.CourseOut.from_orm(c) for c in courses]
@@ -0,0 +1,125 @@
+# app/seats.py
+"""
+Seat counting for enrollment.
+
+courses.enrolled_count holds the number of enrollments per course.
+Triggers on `enrollments` keep it current for every writer, so the
+counter moves in the same statement as the row that changes it.
+SEAT_INSERT enrolls with a single conditional INSERT ... SELECT ...
+ON CONFLICT DO NOTHING. The SELECT only yields a row while
+enrolled_count < max_students, and the unique (course_id, student_id)
+index turns a repeat into a no-op. SQLite runs one writer at a time and
+the check happens inside the writing statement, so concurrent requests
+can neither take the same seat twice nor go past max_students. No read-then-write window exists.
+
+prepare_seat_counters upgrades databases created before this module
+existed. It adds the column, installs the triggers and counts the
+existing enrollments. Call it before create_missing_indexes. The old
+SELECT-then-INSERT path could leave duplicate (course, student)
+enrollments, and the unique index cannot be built over them. Startup
+never deletes them. It reports them and returns the index so that
+create_missing_indexes skips it. Merge them once with
+`python -m app.merge_duplicate_enrollments`; the index is built then.
+"""
+import logging
+
+from sqlalchemy import bindparam, inspect, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+UNIQUE_ENROLLMENT_INDEX = "ux_enrollments_course_student"
+
+SEAT_COUNTER_DDL = [
+    """CREATE TRIGGER IF NOT EXISTS enrollments_seats_ai AFTER INSERT ON enrollments BEGIN
+        UPDATE courses SET enrolled_count = enrolled_count + 1 WHERE id = new.course_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS enrollments_seats_ad AFTER DELETE ON enrollments BEGIN
+        UPDATE courses SET enrolled_count = enrolled_count - 1 WHERE id = old.course_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS enrollments_seats_au AFTER UPDATE OF course_id ON enrollments
+    WHEN new.course_id IS NOT old.course_id BEGIN
+        UPDATE courses SET enrolled_count = enrolled_count - 1 WHERE id = old.course_id;
+        UPDATE courses SET enrolled_count = enrolled_count + 1 WHERE id = new.course_id;
+    END""",
+]
+
+
+def _seat_insert():
+    """INSERT ... SELECT that only yields a row while the course has a free
+    seat; a repeat (course_id, student_id) is a no-op"""
+    course = models.Course.__table__
+    seat = select(
+        bindparam("id"),
+        course.c.id,
+        bindparam("student_id"),
+        bindparam("progress"),
+        bindparam("completed"),
+        bindparam("certificate_issued"),
+    ).where(
+        course.c.id == bindparam("course_id"),
+        or_(course.c.max_students.is_(None), course.c.enrolled_count < course.c.max_students),
+    )
+    return sqlite_insert(models.Enrollment.__table__).from_select(
+        ["id", "course_id", "student_id", "progress", "completed", "certificate_issued"], seat,
+    ).on_conflict_do_nothing(index_elements=["course_id", "student_id"])
+
+
+# used by crud.create_enrollment, enrollment moves, bulk enrollment and
+# waitlist promotion
+SEAT_INSERT = _seat_insert()
+
+RECOUNT_SQL = """UPDATE courses SET enrolled_count = (
+    SELECT count(*) FROM enrollments WHERE enrollments.course_id = courses.id
+)"""
+
+DUPLICATES_SQL = """SELECT course_id, student_id, count(*) FROM enrollments
+GROUP BY course_id, student_id HAVING count(*) > 1"""
+
+
+def find_duplicate_enrollments(conn) -> list:
+    """(course_id, student_id, rows) for every pair enrolled more than once"""
+    return conn.exec_driver_sql(DUPLICATES_SQL).all()
+
+
+def prepare_seat_counters(engine: Engine) -> set:
+    """
+    Add enrolled_count and its triggers, counting existing enrollments the
+    first time. Returns the names of indexes create_missing_indexes must
+    skip: the unique enrollment index while duplicates remain.
+    """
+    inspector = inspect(engine)
+    columns = {c["name"] for c in inspector.get_columns("courses")}
+    unique_indexes = {ix["name"] for ix in inspector.get_indexes("enrollments") if ix["unique"]}
+    blocked = set()
+    with engine.begin() as conn:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'enrollments_seats_ai'"
+        ).first()
+        if "enrolled_count" not in columns:
+            conn.exec_driver_sql("ALTER TABLE courses ADD COLUMN enrolled_count INTEGER NOT NULL DEFAULT 0")
+        if UNIQUE_ENROLLMENT_INDEX not in unique_indexes:
+            duplicates = find_duplicate_enrollments(conn)
+            if duplicates:
+                blocked.add(UNIQUE_ENROLLMENT_INDEX)
+                logger.error(
+                    "Not building %s: %d (course, student) pairs are enrolled more than once, e.g. %s. "
+                    "Enrollment writes will fail until they are merged with "
+                    "`python -m app.merge_duplicate_enrollments`.",
+                    UNIQUE_ENROLLMENT_INDEX, len(duplicates),
+                    ", ".join(f"{course_id}/{student_id} x{rows}" for course_id, student_id, rows in duplicates[:5]),
+                )
+        for statement in SEAT_COUNTER_DDL:
+            conn.exec_driver_sql(statement)
+        if not exists:
+            conn.exec_driver_sql(RECOUNT_SQL)
+    return blocked
+
+
+def recount_seats(engine: Engine) -> None:
+    """Recompute enrolled_count, e.g. after triggers were dropped for a bulk import"""
+    with engine.begin() as conn:
+        conn.exec_driver_sql(RECOUNT_SQL)
@@ -0,0 +1,37 @@
+# app/similar.py
+"""
+"Students also looked at" suggestions (GET /api/courses/{id}/similar).
+
+The lists are precomputed by the app.build_similar batch job and stored in
+course_similar, so serving one is a primary-key range read. Courses
+unpublished since the last build are filtered out at read time.
+"""
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database, models, schemas
+
+router = APIRouter(prefix="/courses", tags=["Similar"])
+
+
+async def get_similar_courses(db: AsyncSession, course_id: str, limit: int = 10):
+    rows = await db.execute(
+        select(models.Course.id, models.Course.code, models.Course.title, models.Course.category,
+               models.CourseSimilar.score)
+        .join(models.Course, models.Course.id == models.CourseSimilar.similar_id)
+        .where(models.CourseSimilar.course_id == course_id, models.Course.is_published == True)
+        .order_by(models.CourseSimilar.rank)
+        .limit(limit)
+    )
+    return [schemas.SimilarCourse(**row._mapping) for row in rows]
+
+
+@router.get("/{course_id}/similar", response_model=List[schemas.SimilarCourse])
+async def similar_courses(course_id: str, limit: int = Query(10, ge=1, le=50),
+                          db: AsyncSession = Depends(database.get_read_db)):
+    if await db.scalar(select(models.Course.id).where(models.Course.id == course_id)) is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return await get_similar_courses(db, course_id, limit)
@@ -0,0 +1,209 @@
+# app/waitlist.py
+"""
+FIFO waitlists for full courses.
+
+A student who finds a course full joins its queue once and is enrolled
+automatically when a seat frees up. There is nothing to retry and
+nothing to poll.
+
+Each queue entry holds a ticket. Tickets are per course and contiguous:
+the lowest is next in line. A student's position is therefore
+ticket - head + 1 and the queue length is tail - head + 1. Both come
+from a few probes of the (course_id, student_id) and (course_id, ticket)
+indexes, whatever the length of the queue. Leaving the queue shifts the
+tickets behind the leaver down by one, to keep them contiguous.
+
+promote_waitlist moves students from the head of the queue into free
+seats with the same seat-checked insert as a normal enrollment
+(seats.SEAT_INSERT). crud runs it in the same transaction as anything
+that frees capacity: deleting or moving an enrollment, or raising or
+removing max_students.
+"""
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import bindparam, case, delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import auth_utils, database, models, prerequisites, schemas, seats
+
+router = APIRouter(prefix="/courses", tags=["Waitlist"])
+
+Entry = models.WaitlistEntry
+
+# students promoted per round; bounds the IN (...) lookups
+PROMOTE_BATCH = 1000
+
+# append at the tail in one statement; the unique index makes rejoining a no-op
+JOIN_INSERT = sqlite_insert(Entry.__table__).from_select(
+    ["id", "course_id", "student_id", "ticket"],
+    select(
+        bindparam("id"),
+        bindparam("course_id"),
+        bindparam("student_id"),
+        func.coalesce(func.max(Entry.ticket), 0) + 1,
+    ).where(Entry.course_id == bindparam("course_id")),
+).on_conflict_do_nothing(index_elements=["course_id", "student_id"])
+
+
+async def _head_and_tail(db: AsyncSession, course_id: str):
+    # separate subqueries so SQLite answers each min/max from the index
+    head = select(func.min(Entry.ticket)).where(Entry.course_id == course_id).scalar_subquery()
+    tail = select(func.max(Entry.ticket)).where(Entry.course_id == course_id).scalar_subquery()
+    return (await db.execute(select(head, tail))).one()
+
+
+async def _is_enrolled(db: AsyncSession, course_id: str, student_id: str) -> bool:
+    return await db.scalar(select(models.Enrollment.id).where(
+        models.Enrollment.course_id == course_id, models.Enrollment.student_id == student_id,
+    )) is not None
+
+
+async def _remove(db: AsyncSession, course_id: str, tickets: list):
+    """Delete entries and close the gaps they leave behind the head"""
+    if not tickets:
+        return
+    await db.execute(delete(Entry).where(Entry.course_id == course_id, Entry.ticket.in_(tickets)))
+    head, _ = await _head_and_tail(db, course_id)
+    if head is None:
+        return
+    # tickets below the new head just move the head; only holes need closing
+    holes = sorted(t for t in tickets if t > head)
+    if holes:
+        shift = sum(case((Entry.ticket > t, 1), else_=0) for t in holes)
+        await db.execute(
+            update(Entry)
+            .where(Entry.course_id == course_id, Entry.ticket > holes[0])
+            .values(ticket=Entry.ticket - shift)
+        )
+
+
+async def _enrolled_status(db: AsyncSession, course_id: str, student_id: str) -> schemas.WaitlistStatus:
+    head, tail = await _head_and_tail(db, course_id)
+    return schemas.WaitlistStatus(
+        course_id=course_id, student_id=student_id, status="enrolled",
+        waiting=0 if head is None else tail - head + 1,
+    )
+
+
+async def get_position(db: AsyncSession, course_id: str, student_id: str) -> schemas.WaitlistStatus | None:
+    ticket = await db.scalar(select(Entry.ticket).where(Entry.course_id == course_id, Entry.student_id == student_id))
+    if ticket is None:
+        return None
+    head, tail = await _head_and_tail(db, course_id)
+    return schemas.WaitlistStatus(
+        course_id=course_id, student_id=student_id, status="waitlisted",
+        position=ticket - head + 1, waiting=tail - head + 1,
+    )
+
+
+async def join_waitlist(db: AsyncSession, course_id: str, student_id: str) -> schemas.WaitlistStatus:
+    """Enroll at once if a seat is free and nobody is queued, else take the next ticket"""
+    if await _is_enrolled(db, course_id, student_id):
+        raise HTTPException(status_code=400, detail="Student already enrolled in this course")
+    # queue only students who could take the seat when it comes
+    await prerequisites.require_eligible(db, course_id, student_id)
+    head, tail = await _head_and_tail(db, course_id)
+    if head is None:
+        # empty queue: a free seat can be taken without jumping the line
+        inserted = (await db.execute(seats.SEAT_INSERT, {
+            "id": str(uuid.uuid4()), "course_id": course_id, "student_id": student_id,
+            "progress": 0, "completed": False, "certificate_issued": False,
+        })).rowcount
+        if inserted:
+            await db.commit()
+            return await _enrolled_status(db, course_id, student_id)
+    await db.execute(JOIN_INSERT, {"id": str(uuid.uuid4()), "course_id": course_id, "student_id": student_id})
+    # seats can be free behind a non-empty queue if capacity was changed
+    # outside crud; serve the line before reporting a position
+    await promote_waitlist(db, course_id)
+    await db.commit()
+    return await get_position(db, course_id, student_id) or await _enrolled_status(db, course_id, student_id)
+
+
+async def leave_waitlist(db: AsyncSession, course_id: str, student_id: str) -> bool:
+    ticket = await db.scalar(select(Entry.ticket).where(Entry.course_id == course_id, Entry.student_id == student_id))
+    if ticket is None:
+        return False
+    await _remove(db, course_id, [ticket])
+    await db.commit()
+    return True
+
+
+async def promote_waitlist(db: AsyncSession, course_id: str) -> int:
+    """Enroll students from the head of the queue while seats are free; the caller commits"""
+    promoted = 0
+    while True:
+        course = (await db.execute(
+            select(models.Course.max_students, models.Course.enrolled_count).where(models.Course.id == course_id)
+        )).first()
+        if course is None:
+            break
+        free = PROMOTE_BATCH if course.max_students is None else min(course.max_students - course.enrolled_count, PROMOTE_BATCH)
+        if free <= 0:
+            break
+        heads = (await db.execute(
+            select(Entry.student_id, Entry.ticket).where(Entry.course_id == course_id).order_by(Entry.ticket).limit(free)
+        )).all()
+        if not heads:
+            break
+        await db.execute(seats.SEAT_INSERT, [
+            {
+                "id": str(uuid.uuid4()), "course_id": course_id, "student_id": student_id,
+                "progress": 0, "completed": False, "certificate_issued": False,
+            }
+            for student_id, _ in heads
+        ])
+        # heads that now hold an enrollment leave the queue, including any
+        # that were enrolled some other way while they waited
+        enrolled = set(await db.scalars(select(models.Enrollment.student_id).where(
+            models.Enrollment.course_id == course_id,
+            models.Enrollment.student_id.in_([student_id for student_id, _ in heads]),
+        )))
+        served = [ticket for student_id, ticket in heads if student_id in enrolled]
+        await _remove(db, course_id, served)
+        promoted += len(served)
+        if len(served) < len(heads):
+            # the rest found the course full again
+            break
+    return promoted
+
+
+async def clear_waitlist(db: AsyncSession, course_id: str):
+    await db.execute(delete(Entry).where(Entry.course_id == course_id))
+
+
+async def _require_course(db: AsyncSession, course_id: str):
+    if await db.scalar(select(models.Course.id).where(models.Course.id == course_id)) is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+
+@router.post("/{course_id}/waitlist", response_model=schemas.WaitlistStatus,
+             dependencies=[Depends(auth_utils.require_role(["student", "admin"]))])
+async def join(course_id: str, db: AsyncSession = Depends(database.get_db),
+               token=Depends(auth_utils.get_current_user_token)):
+    await _require_course(db, course_id)
+    return await join_waitlist(db, course_id, token.sub)
+
+
+@router.get("/{course_id}/waitlist/me", response_model=schemas.WaitlistStatus,
+            dependencies=[Depends(auth_utils.require_role(["student", "admin"]))])
+async def my_position(course_id: str, db: AsyncSession = Depends(database.get_read_db),
+                      token=Depends(auth_utils.get_current_user_token)):
+    position = await get_position(db, course_id, token.sub)
+    if position is not None:
+        return position
+    if await _is_enrolled(db, course_id, token.sub):
+        # promoted since the client last looked
+        return await _enrolled_status(db, course_id, token.sub)
+    raise HTTPException(status_code=404, detail="Not on the waitlist for this course")
+
+
+@router.delete("/{course_id}/waitlist/me", status_code=status.HTTP_204_NO_CONTENT,
+               dependencies=[Depends(auth_utils.require_role(["student", "admin"]))])
+async def leave(course_id: str, db: AsyncSession = Depends(database.get_db),
+                token=Depends(auth_utils.get_current_user_token)):
+    if not await leave_waitlist(db, course_id, token.sub):
+        raise HTTPException(status_code=404, detail="Not on the waitlist for this course")
+    return None
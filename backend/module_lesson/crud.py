@@ -1,84 +1,166 @@
 # crud/module.py
-from sqlalchemy.orm import Session
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import Optional
 from models.modules import Module
 from models.lessons import Lesson
-from schemas import ModuleCreate, LessonCreate, LessonUpdate, LessonReorderItem, ModuleReorderItem
+from schemas import (
+    ModuleCreate, LessonCreate, LessonUpdate, LessonReorderItem, ModuleReorderItem, CourseOutline, OutlineModule,
+)
+from outline import outline_cache
+from fields import only
+from lesson_blocks import resolve_media_urls
 from typing import List
 import uuid
 
+# ids per bulk reorder UPDATE (three bound parameters each)
+REORDER_CHUNK = 500
+
 
 # -----------------------
 # MODULE CRUD
 # -----------------------
 
-def create_module(db: Session, data: ModuleCreate):
+async def create_module(db: AsyncSession, data: ModuleCreate):
     module = Module(id=str(uuid.uuid4()), **data.model_dump())
     db.add(module)
-    db.commit()
-    db.refresh(module)
+    await db.commit()
+    outline_cache.forget(module.course_id)
+    await db.refresh(module)
     return module
 
 
-def get_modules(db: Session):
-    return db.query(Module).all()
+async def get_modules(db: AsyncSession, fields: Optional[List[str]] = None):
+    return (await db.scalars(select(Module).options(*only(Module, fields)))).all()
 
 
-def get_module(db: Session, module_id: str):
-    return db.query(Module).filter(Module.id == module_id).first()
+async def get_module(db: AsyncSession, module_id: str, fields: Optional[List[str]] = None):
+    return await db.scalar(select(Module).where(Module.id == module_id).options(*only(Module, fields)))
 
-def get_course_modules(db: Session, course_id: str):
-    return db.query(Module).filter(Module.course_id == course_id).order_by(Module.order).all()
+async def get_course_modules(db: AsyncSession, course_id: str, fields: Optional[List[str]] = None):
+    return (await db.scalars(
+        select(Module).where(Module.course_id == course_id).order_by(Module.order).options(*only(Module, fields))
+    )).all()
 
-def update_module(db: Session, module_id: str, data: ModuleCreate):
-    module = get_module(db, module_id)
+async def update_module(db: AsyncSession, module_id: str, data: ModuleCreate):
+    module = await get_module(db, module_id)
     if not module:
         return None
 
+    old_course_id = module.course_id
     for key, value in data.model_dump().items():
         setattr(module, key, value)
 
-    db.commit()
-    db.refresh(module)
+    await db.commit()
+    outline_cache.forget(old_course_id, module.course_id)
+    await db.refresh(module)
     return module
 
 
-def delete_module(db: Session, module_id: str):
-    module = get_module(db, module_id)
+async def delete_module(db: AsyncSession, module_id: str):
+    module = await get_module(db, module_id)
     if not module:
         return None
 
-    db.delete(module)
-    db.commit()
+    await db.delete(module)
+    await db.commit()
+    outline_cache.forget(module.course_id)
     return True
 
-def reorder_modules(db: Session, modules_order: List[ModuleReorderItem]):
+async def _set_orders(db: AsyncSession, model, orders: dict, *where, returning=None) -> set:
+    """Write {id: order} with one UPDATE ... SET order = CASE id ... per chunk;
+    ids that fail `where` (or no longer exist) are left alone. Returns the
+    distinct values of the `returning` column over the updated rows."""
+    ids = list(orders)
+    returned = set()
+    for start in range(0, len(ids), REORDER_CHUNK):
+        chunk = ids[start:start + REORDER_CHUNK]
+        stmt = (
+            update(model)
+            .where(model.id.in_(chunk), *where)
+            .values(order=case({i: orders[i] for i in chunk}, value=model.id))
+            .execution_options(synchronize_session=False)
+        )
+        if returning is None:
+            await db.execute(stmt)
+        else:
+            returned.update(await db.scalars(stmt.returning(returning)))
+    return returned
+
+
+async def reorder_modules(db: AsyncSession, modules_order: List[ModuleReorderItem]):
     """
     Update the order of modules based on the list of { module_id, order }.
+    One bulk UPDATE, committed as a single transaction.
     """
-    for item in modules_order:
-        module = db.query(Module).filter(Module.id == item.module_id).first()
-        if module:
-            module.order = item.order
+    orders = {item.module_id: item.order for item in modules_order}
+    if len(orders) != len(modules_order):
+        return False  # the same module listed twice
 
-    db.commit()
+    course_ids = await _set_orders(db, Module, orders, returning=Module.course_id)
+    await db.commit()
+    outline_cache.forget(*course_ids)
     return True
 
 
+# -----------------------
+# COURSE OUTLINE
+# -----------------------
+
+# the only lesson columns the outline needs; the contentBlocks,
+# quizQuestions and settings JSON are never read for it
+LESSON_HEADER_COLUMNS = (Lesson.id, Lesson.module_id, Lesson.title, Lesson.order,
+                         Lesson.estimatedDuration, Lesson.difficulty)
+
+
+async def _forget_module_outlines(db: AsyncSession, *module_ids):
+    """Drop the cached outlines of the courses owning `module_ids` (after a lesson write)"""
+    course_ids = await db.scalars(select(Module.course_id).where(Module.id.in_(set(module_ids))))
+    outline_cache.forget(*course_ids)
+
+
+async def get_course_outline(db: AsyncSession, course_id: str) -> CourseOutline:
+    """Modules of a course in order, each with its lesson headers: one SELECT
+    for the modules and one selectinload SELECT for all their lessons"""
+    modules = (await db.scalars(
+        select(Module)
+        .where(Module.course_id == course_id)
+        .order_by(Module.order)
+        .options(selectinload(Module.lessons).load_only(*LESSON_HEADER_COLUMNS))
+    )).all()
+    outline = []
+    for module in modules:
+        entry = OutlineModule.model_validate(module)
+        entry.lessons.sort(key=lambda lesson: lesson.order or 0)
+        outline.append(entry)
+    return CourseOutline(course_id=course_id, modules=outline)
+
+
+async def get_course_outline_json(db: AsyncSession, course_id: str) -> bytes:
+    """Serialized outline, answered from outline_cache when possible"""
+    body = outline_cache.get(course_id)
+    if body is None:
+        generation = outline_cache.generation()
+        body = (await get_course_outline(db, course_id)).model_dump_json().encode()
+        outline_cache.put(course_id, body, generation)
+    return body
+
+
 # -----------------------
 # LESSON CRUD
 # -----------------------
 
-def create_lesson(db: Session, module_id: str, data: LessonCreate) -> Lesson:
+async def create_lesson(db: AsyncSession, module_id: str, data: LessonCreate) -> Lesson:
     """
     Create a new lesson with automatic ordering and full nested settings.
     """
 
     # 1. Count existing lessons under this module
-    existing_lessons = (
-        db.query(Lesson)
-        .filter(Lesson.module_id == module_id)
-        .count()
+    existing_lessons = await db.scalar(
+        select(func.count())
+        .select_from(Lesson)
+        .where(Lesson.module_id == module_id)
     )
 
     # 2. New lesson order (1, 2, 3, ...)
@@ -106,122 +188,100 @@ def create_lesson(db: Session, module_id: str, data: LessonCreate) -> Lesson:
     )
 
     db.add(lesson)
-    db.commit()
-    db.refresh(lesson)
+    await db.flush()
+    await resolve_media_urls(db, [lesson.id])
+    await db.commit()
+    await _forget_module_outlines(db, module_id)
+    await db.refresh(lesson)
     return lesson
 
 
 
-def get_lessons_by_module(db: Session, module_id: str):
-    return db.query(Lesson).filter(Lesson.module_id == module_id).order_by(Lesson.order).all()
+async def get_lessons_by_module(db: AsyncSession, module_id: str, fields: Optional[List[str]] = None):
+    return (await db.scalars(
+        select(Lesson).where(Lesson.module_id == module_id).order_by(Lesson.order).options(*only(Lesson, fields))
+    )).all()
 
-Base_url = "http://localhost:8000"
+# empty value served for a NULL JSON column
+LESSON_JSON_DEFAULTS = {
+    "tags": list, "contentBlocks": list, "quizQuestions": list,
+    "discussion": dict, "progressSettings": dict, "accessibility": dict, "feedbackSettings": dict,
+}
 
 
-def get_lesson(db: Session, lesson_id: str, base_url: Optional[str] = None):
-    # Return an ORM object or a dict with full content URLs
-    lesson_obj = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+async def get_lesson(db: AsyncSession, lesson_id: str, fields: Optional[List[str]] = None):
+    # Return a dict of the lesson; media URLs in contentBlocks were made
+    # absolute when the lesson was written (see lesson_blocks.py)
+    lesson_obj = await db.scalar(select(Lesson).where(Lesson.id == lesson_id).options(*only(Lesson, fields)))
     if not lesson_obj:
         return None
 
-    # Convert ORM to dict (only include fields you want)
-    lesson_data = {
-        "id": lesson_obj.id,
-        "module_id": lesson_obj.module_id,
-        "title": lesson_obj.title,
-        "objectives": lesson_obj.objectives,
-        "prerequisites": lesson_obj.prerequisites,
-        "estimatedDuration": lesson_obj.estimatedDuration,
-        "difficulty": lesson_obj.difficulty,
-        "tags": lesson_obj.tags or [],
-        "contentBlocks": lesson_obj.contentBlocks or [],
-        "quizQuestions": lesson_obj.quizQuestions or [],
-        "discussion": lesson_obj.discussion or {},
-        "progressSettings": lesson_obj.progressSettings or {},
-        "accessibility": lesson_obj.accessibility or {},
-        "feedbackSettings": lesson_obj.feedbackSettings or {},
-        "order": lesson_obj.order,
-        "created_at": lesson_obj.created_at,
-        "updated_at": lesson_obj.updated_at,
-    }
-
-    # If base_url provided, convert local upload paths to absolute URLs
-    if base_url:
-        cb = []
-        MEDIA_TYPES = ["image", "video", "audio", "pdf", "ppt", "pptx", "doc", "docx", "document"]
-        for block in lesson_data.get("contentBlocks", []):
-            if not block:
-                continue
-            block = block.copy()
-            content = block.get("content")
-            
-            if content and block.get("type") in MEDIA_TYPES and not content.startswith("http"):
-                # ensure leading slash for safety
-                path = content if content.startswith("/") else f"/{content}"
-                block["content"] = f"{base_url.rstrip('/')}{path}"
-            cb.append(block)
-        lesson_data["contentBlocks"] = cb
+    # Convert ORM to dict: every column, or just the requested ones
+    names = fields or [
+        "id", "module_id", "title", "objectives", "prerequisites", "estimatedDuration", "difficulty", "tags",
+        "contentBlocks", "quizQuestions", "discussion", "progressSettings", "accessibility", "feedbackSettings",
+        "order", "created_at", "updated_at",
+    ]
+    lesson_data = {}
+    for name in names:
+        value = getattr(lesson_obj, name)
+        if not value and name in LESSON_JSON_DEFAULTS:
+            value = LESSON_JSON_DEFAULTS[name]()
+        lesson_data[name] = value
 
     return lesson_data
 
 
-def get_lesson_instance(db: Session, lesson_id: str) -> Optional[Lesson]:
-    return db.query(Lesson).filter(Lesson.id == lesson_id).first()
+async def get_lesson_instance(db: AsyncSession, lesson_id: str) -> Optional[Lesson]:
+    return await db.scalar(select(Lesson).where(Lesson.id == lesson_id))
 
       
   
 
-def update_lesson(db: Session, lesson_id: str, data: LessonUpdate):
-    lesson = get_lesson_instance(db, lesson_id)
+async def update_lesson(db: AsyncSession, lesson_id: str, data: LessonUpdate):
+    lesson = await get_lesson_instance(db, lesson_id)
     if not lesson:
         return None
 
-    for key, value in data.dict(exclude_unset=True).items():
+    old_module_id = lesson.module_id
+    changes = data.dict(exclude_unset=True)
+    for key, value in changes.items():
         if key in ['contentBlocks', 'quizQuestions', 'discussion', 'progressSettings', 'accessibility', 'feedbackSettings'] and value is not None:
             setattr(lesson, key, value.dict() if hasattr(value, 'dict') else value)
         else:
             setattr(lesson, key, value)
 
-    db.commit()
-    db.refresh(lesson)
+    if changes.get("contentBlocks"):
+        await db.flush()
+        await resolve_media_urls(db, [lesson_id])
+    await db.commit()
+    await _forget_module_outlines(db, old_module_id, lesson.module_id)
+    await db.refresh(lesson)
     return lesson
 
-def delete_lesson(db: Session, lesson_id: str):
-    lesson = get_lesson_instance(db, lesson_id)
+async def delete_lesson(db: AsyncSession, lesson_id: str):
+    lesson = await get_lesson_instance(db, lesson_id)
     if not lesson:
         return None
 
-    db.delete(lesson)
-    db.commit()
+    await db.delete(lesson)
+    await db.commit()
+    await _forget_module_outlines(db, lesson.module_id)
     return True
 
-def reorder_lessons(db: Session, module_id: str, lessons_order: List[LessonReorderItem]):
+async def reorder_lessons(db: AsyncSession, module_id: str, lessons_order: List[LessonReorderItem]):
     """
-    Ensures proper lesson reordering with flush & refresh.
-    Avoids duplicate order conflicts.
+    Apply the new lesson order with one bulk UPDATE.
+    `order` has no unique constraint, so no temporary values are needed, and
+    the whole reorder commits atomically: a concurrent reorder of the same
+    module wins or loses as a whole, never interleaved lesson by lesson.
+    Lessons that are not in this module are ignored.
     """
-    # STEP 1 — Set a temporary order to avoid duplicates
-    for item in lessons_order:
-        lesson = db.query(Lesson).filter(
-            Lesson.id == item.lesson_id,
-            Lesson.module_id == module_id
-        ).first()
-
-        if lesson:
-            lesson.order = -1  # temporary value
-
-    db.flush()
+    orders = {item.lesson_id: item.order for item in lessons_order}
+    if len(orders) != len(lessons_order):
+        return False  # the same lesson listed twice
 
-    # STEP 2 — Apply correct final order
-    for item in lessons_order:
-        lesson = db.query(Lesson).filter(
-            Lesson.id == item.lesson_id,
-            Lesson.module_id == module_id
-        ).first()
-
-        if lesson:
-            lesson.order = item.order
-
-    db.commit()
+    await _set_orders(db, Lesson, orders, Lesson.module_id == module_id)
+    await db.commit()
+    await _forget_module_outlines(db, module_id)
     return True
-
@@ -0,0 +1,60 @@
+# fields.py
+"""
+Sparse fieldsets for read routes: ?fields=title,order
+
+A route declares `fields: Optional[List[str]] = Depends(sparse_fields(Lesson))`.
+The dependency checks the names against the model's columns (400 on an
+unknown one) and always adds the primary key. crud turns the list into
+load_only(), so the SELECT names only those columns. The JSON columns
+left out (contentBlocks, quizQuestions, accessibility, ...) are never
+read from SQLite or decoded. The route then answers with only those
+keys (see sparse_response). Without ?fields= nothing changes.
+"""
+from typing import List, Optional
+
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+
+def column_names(model) -> List[str]:
+    return [attr.key for attr in inspect(model).column_attrs]
+
+
+def sparse_fields(model, always=("id",)):
+    """Dependency parsing ?fields= into a list of column names (None when absent)"""
+    allowed = column_names(model)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. title,order"),
+    ) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = sorted(set(names) - set(allowed))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(allowed)}",
+            )
+        return list(dict.fromkeys([*always, *names]))
+
+    return dependency
+
+
+def only(model, fields: Optional[List[str]]):
+    """Loader options for a query; no options when every column is wanted"""
+    if fields is None:
+        return []
+    return [load_only(*(getattr(model, name) for name in fields), raiseload=True)]
+
+
+def pick(obj, fields: List[str]) -> dict:
+    return {name: getattr(obj, name) for name in fields}
+
+
+def sparse_response(content) -> JSONResponse:
+    """Send picked dicts as-is; the route's full response_model would reject them"""
+    return JSONResponse(content=jsonable_encoder(content))
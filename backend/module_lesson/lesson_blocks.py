@@ -0,0 +1,137 @@
+# lesson_blocks.py
+"""
+Content blocks of large lessons: ranged reads and write-time media URLs.
+
+GET /modules/lessons/{lesson_id}/blocks?cursor=&limit= returns one page of
+contentBlocks, so the player can render the first screen and fetch the
+rest lazily. SQLite's json_each walks the stored array and hands back
+only the requested range. The rest of the column is never decoded in
+Python. The opaque cursor (shared/pagination.py) holds the next block
+index, the lesson's updated_at and the block count. If the lesson is
+edited mid-way, block indexes may have shifted, so the next page gets a
+409 instead of duplicated or skipped blocks.
+
+Media blocks (image, video, pdf, ...) stored with a relative upload path
+are rewritten to absolute URLs under MEDIA_BASE_URL when they are
+written, by resolve_media_urls. Reads serve the stored JSON as-is.
+MEDIA_BASE_URL is this service's public address, since it serves
+/uploads; set it wherever the service is not reached at
+http://localhost:8002. Lessons saved before this keep their paths until
+resolve_media_urls.py is run once.
+"""
+import os
+from typing import Iterable, Optional
+
+from sqlalchemy import String, func, select, type_coerce, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.lessons import Lesson
+from schemas import ContentBlock, LessonBlockPage
+from shared.pagination import decode_cursor, encode_cursor
+
+# where this service (and so /uploads) is reached from learners' browsers;
+# 8002 is the module/lesson service in development (frontend/.env)
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL", "http://localhost:8002")
+
+MEDIA_TYPES = ["image", "video", "audio", "pdf", "ppt", "pptx", "doc", "docx", "document"]
+
+# path/value pairs per json_set call; SQLite allows at most 127 arguments
+JSON_SET_PAIRS = 60
+
+
+class StaleCursor(Exception):
+    """The lesson changed since the cursor was issued"""
+
+
+def media_url(content: str, base_url: str = MEDIA_BASE_URL) -> str:
+    # ensure leading slash for safety
+    path = content if content.startswith("/") else f"/{content}"
+    return f"{base_url.rstrip('/')}{path}"
+
+
+def _blocks():
+    """json_each over a lesson's contentBlocks (columns key, value)"""
+    doc = func.coalesce(type_coerce(Lesson.contentBlocks, String), "[]")
+    return func.json_each(doc).table_valued("key", "value", joins_implicitly=True).alias("block")
+
+
+async def resolve_media_urls(db: AsyncSession, lesson_ids: Optional[Iterable[str]] = None, updated_at=None) -> int:
+    """Rewrite relative media paths in contentBlocks to absolute URLs (all
+    lessons when `lesson_ids` is None); returns the number of lessons changed.
+    The caller commits."""
+    block = _blocks()
+    content = func.json_extract(block.c.value, "$.content")
+    query = select(Lesson.id, block.c.key, content).where(
+        func.json_extract(block.c.value, "$.type").in_(MEDIA_TYPES),
+        func.coalesce(content, "") != "",
+        func.substr(content, 1, 4) != "http",
+    )
+    if lesson_ids is not None:
+        query = query.where(Lesson.id.in_(list(lesson_ids)))
+
+    fixes = {}
+    for lesson_id, key, path in (await db.execute(query)).all():
+        fixes.setdefault(lesson_id, []).extend([f"$[{key}].content", media_url(path)])
+    for lesson_id, args in fixes.items():
+        doc = type_coerce(Lesson.contentBlocks, String)
+        for i in range(0, len(args), 2 * JSON_SET_PAIRS):
+            doc = func.json_set(doc, *args[i:i + 2 * JSON_SET_PAIRS])
+        values = {"contentBlocks": doc}
+        if updated_at is not None:
+            values["updated_at"] = updated_at
+        await db.execute(
+            update(Lesson).where(Lesson.id == lesson_id).values(values)
+            .execution_options(synchronize_session=False)
+        )
+    return len(fixes)
+
+
+async def _lesson_head(db: AsyncSession, lesson_id: str):
+    """(version, updated_at, total) of a lesson, or None"""
+    total = func.json_array_length(func.coalesce(type_coerce(Lesson.contentBlocks, String), "[]"))
+    return (await db.execute(
+        select(type_coerce(Lesson.updated_at, String).label("version"), Lesson.updated_at, total.label("total"))
+        .where(Lesson.id == lesson_id)
+    )).first()
+
+
+async def get_block_page(db: AsyncSession, lesson_id: str, cursor: Optional[str] = None, limit: int = 20):
+    """One page of a lesson's content blocks, or None if the lesson does not exist"""
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 3 or not all(isinstance(v, int) and v >= 0 for v in (values[0], values[2])):
+            raise ValueError("Invalid cursor")
+        start, version, total = values
+    else:
+        head = await _lesson_head(db, lesson_id)
+        if head is None:
+            return None
+        start, version, total = 0, head.version, head.total
+
+    # every statement parses the whole column, so later pages take the
+    # length from the cursor (valid while the version matches) and check
+    # the version in the same statement as the blocks
+    block = _blocks()
+    rows = (await db.execute(
+        select(block.c.value, type_coerce(Lesson.updated_at, String).label("version"), Lesson.updated_at)
+        .where(Lesson.id == lesson_id, block.c.key >= start)
+        .order_by(block.c.key)
+        .limit(limit)
+    )).all()
+    current = rows[0] if rows else await _lesson_head(db, lesson_id)
+    if current is None:
+        return None
+    if current.version != version:
+        raise StaleCursor()
+
+    # json_each yields each object as JSON text
+    blocks = [ContentBlock.model_validate_json(row.value) for row in rows]
+    end = start + len(blocks)
+    return LessonBlockPage(
+        lesson_id=lesson_id,
+        updated_at=current.updated_at,
+        total=total,
+        start=start,
+        blocks=blocks,
+        next_cursor=encode_cursor([end, version, total]) if end < total else None,
+    )
@@ -0,0 +1,191 @@
+# lesson_patch.py
+"""
+Partial edits of a lesson's contentBlocks and quizQuestions
+(PATCH /modules/lessons/{lesson_id}).
+
+The editor sends RFC 6902 style operations instead of the whole column:
+
+    {"op": "replace", "path": "/contentBlocks/3/content", "value": "..."}
+    {"op": "add",     "path": "/contentBlocks/-",         "value": {...}}
+    {"op": "add",     "path": "/quizQuestions/0",         "value": {...}}
+    {"op": "remove",  "path": "/contentBlocks/5"}
+
+Paths are JSON pointers rooted at the lesson. Each value is validated
+against the schema type at its path (ContentBlock, QuizQuestion or one of
+their fields). Each operation becomes one UPDATE that edits the column in
+place with json_replace, json_set, json_insert or json_remove. Its WHERE
+clause checks that the target exists (replace, remove) or that the parent
+has the right shape (add). An UPDATE that matches no row rejects the patch.
+Only an insertion in the middle of an array reads anything back: SQLite
+cannot shift array elements, so the parent array is fetched with
+json_extract, spliced and written back.
+
+Concurrency is optimistic. The client sends the updated_at it last saw.
+The first statement moves updated_at on only if it still holds that
+value, so of two concurrent patches from the same version one gets a
+PatchConflict. All statements of a patch run in one transaction.
+"""
+import json
+import typing
+from datetime import datetime, timezone
+from typing import List
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import String, func, select, type_coerce, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lesson_blocks import resolve_media_urls
+from models.lessons import Lesson, utcnow
+from schemas import ContentBlock, PatchOperation, QuizQuestion
+
+# patchable columns and the type of one element
+PATCHABLE = {"contentBlocks": ContentBlock, "quizQuestions": QuizQuestion}
+
+
+class PatchError(ValueError):
+    """An operation is malformed or does not apply to the lesson"""
+
+
+class PatchConflict(Exception):
+    """The lesson changed since the version the client edited"""
+
+    def __init__(self, current: datetime | None):
+        super().__init__("Lesson was modified by someone else")
+        self.current = current
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """'/contentBlocks/3/content' -> ['contentBlocks', '3', 'content'] (RFC 6901)"""
+    if not pointer.startswith("/"):
+        raise PatchError(f"Path must start with '/': {pointer!r}")
+    return [part.replace("~1", "/").replace("~0", "~") for part in pointer[1:].split("/")]
+
+
+def _unwrap(annotation):
+    """Optional[X] -> X"""
+    if typing.get_origin(annotation) is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _resolve(parts: List[str]) -> tuple:
+    """(column, sqlite json path, parent path, last step, value type, required)"""
+    column, steps = parts[0], parts[1:]
+    if column not in PATCHABLE:
+        raise PatchError(f"Only {', '.join(PATCHABLE)} can be patched")
+    if not steps:
+        raise PatchError("Patch an element or field, not the whole column")
+    annotation, required, path, parent = List[PATCHABLE[column]], True, "$", "$"
+    for i, step in enumerate(steps):
+        annotation = _unwrap(annotation)
+        last = i == len(steps) - 1
+        parent = path
+        if typing.get_origin(annotation) in (list, List):
+            if step == "-" and last:
+                path += "[#]"
+            elif step.isdigit():
+                path += f"[{int(step)}]"
+            else:
+                raise PatchError(f"Expected an array index at {step!r}")
+            annotation, required = typing.get_args(annotation)[0], False
+        elif isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            field = annotation.model_fields.get(step)
+            if field is None:
+                raise PatchError(f"{annotation.__name__} has no field {step!r}")
+            path += f'."{step}"'
+            annotation, required = field.annotation, field.is_required()
+        else:
+            raise PatchError(f"Cannot descend into {step!r}")
+    return column, path, parent, steps[-1], annotation, required
+
+
+def _value_json(annotation, value) -> str:
+    adapter = TypeAdapter(annotation)
+    try:
+        return json.dumps(adapter.dump_python(adapter.validate_python(value), mode="json"))
+    except ValidationError as e:
+        raise PatchError(str(e)) from None
+
+
+def _normalize_version(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def _apply(db: AsyncSession, lesson_id: str, op: PatchOperation, now: datetime) -> None:
+    column, path, parent, last, annotation, required = _resolve(parse_pointer(op.path))
+    col = getattr(Lesson, column)
+    # raw JSON text, so "[]" is bound as text rather than JSON-encoded
+    doc = func.coalesce(type_coerce(col, String), "[]")
+    exists = func.json_type(doc, path).isnot(None)
+    if op.op == "remove":
+        if required:
+            raise PatchError(f"{op.path} is required and cannot be removed")
+        new, guard = func.json_remove(doc, path), exists
+    elif op.op == "replace":
+        new, guard = func.json_replace(doc, path, func.json(_value_json(annotation, op.value))), exists
+    elif last == "-":
+        new = func.json_insert(doc, path, func.json(_value_json(annotation, op.value)))
+        guard = func.json_type(doc, parent) == "array"
+    elif last.isdigit():
+        # array insertion shifts later elements, which json_insert cannot do
+        value = json.loads(_value_json(annotation, op.value))
+        raw = await db.scalar(select(func.json_extract(doc, parent)).where(Lesson.id == lesson_id))
+        array = json.loads(raw) if raw else None
+        if not isinstance(array, list) or int(last) > len(array):
+            raise PatchError(f"{op.path} is out of range")
+        array.insert(int(last), value)
+        new = func.json_set(doc, parent, func.json(json.dumps(array)))
+        guard = func.json_type(doc, parent) == "array"
+    else:
+        new = func.json_set(doc, path, func.json(_value_json(annotation, op.value)))
+        guard = func.json_type(doc, parent) == "object"
+
+    result = await db.execute(
+        update(Lesson)
+        .where(Lesson.id == lesson_id, guard)
+        .values({column: new, "updated_at": now})
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        raise PatchError(f"{op.op} {op.path}: no such location in this lesson")
+
+
+async def patch_lesson(db: AsyncSession, lesson_id: str, expected: datetime, operations: List[PatchOperation]):
+    """Apply `operations` atomically; returns the new updated_at, or None if the lesson does not exist"""
+    stored = type_coerce(Lesson.updated_at, String)
+    found = (await db.execute(select(Lesson.id, stored.label("raw")).where(Lesson.id == lesson_id))).first()
+    if found is None:
+        return None
+    current = datetime.fromisoformat(found.raw) if found.raw else None
+    if current != _normalize_version(expected):
+        raise PatchConflict(current)
+    if not operations:
+        # nothing to change: keep the version, so other editors and block
+        # page cursors stay valid
+        return current
+
+    now = utcnow()
+    try:
+        # claim the version: a concurrent patch from the same version now matches no row
+        claimed = await db.execute(
+            update(Lesson)
+            .where(Lesson.id == lesson_id, stored == found.raw)
+            .values(updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if claimed.rowcount == 0:
+            raise PatchConflict(None)
+        for op in operations:
+            await _apply(db, lesson_id, op, now)
+        if any(parse_pointer(op.path)[0] == "contentBlocks" for op in operations):
+            await resolve_media_urls(db, [lesson_id], updated_at=now)
+    except Exception:
+        await db.rollback()
+        raise
+    await db.commit()
+    return now
@@ -1,5 +1,5 @@
 from fastapi import FastAPI
-from database import Base, engine
+from database import Base, engine, create_missing_indexes
 from routers.modules import router as module_router
 from starlette.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -8,6 +8,8 @@ import os
 app = FastAPI()
 
 Base.metadata.create_all(bind=engine)
+# create_all skips indexes on tables that already exist
+create_missing_indexes(Base.metadata, engine)
 
 # CORS
 app.add_middleware(
@@ -1,13 +1,20 @@
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Boolean, Integer, func
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Integer, func
 from sqlalchemy.dialects.sqlite import JSON
 from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
 from database import Base
 
+
+def utcnow() -> datetime:
+    """Naive UTC with microseconds; CURRENT_TIMESTAMP only has whole seconds,
+    too coarse for updated_at to tell two quick edits apart"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 class Lesson(Base):
     __tablename__ = "lessons"
 
     id = Column(String, primary_key=True)
-    module_id = Column(String, ForeignKey("modules.id"), nullable=False)
+    module_id = Column(String, ForeignKey("modules.id"), nullable=False, index=True)
 
     title = Column(String, nullable=False)
     objectives = Column(Text)
@@ -28,6 +35,6 @@ class Lesson(Base):
     # -------------------------------------------
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=utcnow)
 
     module = relationship("Module", back_populates="lessons")
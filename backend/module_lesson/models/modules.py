@@ -11,6 +11,6 @@ class Module(Base):
     description = Column(Text)
     order = Column(Integer, default=1)
     visibility = Column(String, default="public")
-    course_id = Column(String, nullable=False)  # FK to course service
+    course_id = Column(String, nullable=False, index=True)  # FK to course service
 
     lessons = relationship("Lesson", back_populates="module", cascade="all, delete-orphan")
@@ -0,0 +1,69 @@
+# outline.py
+"""
+Per-course outline cache for GET /modules/course/{course_id}/outline.
+
+The outline (modules plus lesson headers) is read on every page of the
+learner sidebar. It changes only when an instructor edits a module or a
+lesson. OutlineCache keeps the serialized JSON body per course id. crud
+calls forget() for each affected course once a module or lesson write
+commits. Entries also expire after OUTLINE_CACHE_TTL_SECONDS, which
+bounds how long another worker, or a script writing module_service.db
+directly, can leave this process serving a stale outline.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+OUTLINE_CACHE_SIZE = int(os.getenv("OUTLINE_CACHE_SIZE", 1024))
+OUTLINE_CACHE_TTL_SECONDS = int(os.getenv("OUTLINE_CACHE_TTL_SECONDS", 60))
+
+
+class OutlineCache:
+    """LRU of serialized outlines keyed by course id"""
+
+    def __init__(self, maxsize: int = OUTLINE_CACHE_SIZE, ttl_seconds: int = OUTLINE_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # bumped by forget(); a build that started before a write must not be stored
+        self._generation = 0
+
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, course_id: str):
+        with self._lock:
+            entry = self._entries.get(course_id)
+            if entry is None:
+                return None
+            body, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[course_id]
+                return None
+            self._entries.move_to_end(course_id)
+            return body
+
+    def put(self, course_id: str, body: bytes, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return  # a write committed while this body was being built
+            self._entries[course_id] = (body, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(course_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def forget(self, *course_ids) -> None:
+        with self._lock:
+            self._generation += 1
+            for course_id in course_ids:
+                self._entries.pop(course_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+outline_cache = OutlineCache()
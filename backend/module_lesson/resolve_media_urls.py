@@ -0,0 +1,35 @@
+# resolve_media_urls.py
+"""
+One-off migration: make the media URLs of existing lessons absolute.
+
+Lessons written since media URLs are resolved on write already store
+absolute URLs. Older rows still hold relative upload paths and are served
+as stored until this is run. It rewrites them under MEDIA_BASE_URL (see
+lesson_blocks.py), so set that first if the service is not reached at the
+default address. With --dry-run it only counts the lessons.
+
+    python resolve_media_urls.py [--dry-run]   (from backend/module_lesson)
+"""
+import argparse
+import asyncio
+
+from database import AsyncSessionLocal, async_engine
+from lesson_blocks import MEDIA_BASE_URL, resolve_media_urls
+from models.modules import Module  # noqa: F401  (Lesson's relationship needs it mapped)
+
+
+async def main(dry_run: bool):
+    async with AsyncSessionLocal() as db:
+        changed = await resolve_media_urls(db)
+        if dry_run:
+            await db.rollback()
+        else:
+            await db.commit()
+    await async_engine.dispose()
+    print(f"{'would resolve' if dry_run else 'resolved'} media URLs in {changed} lessons under {MEDIA_BASE_URL}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="count the lessons without changing them")
+    asyncio.run(main(parser.parse_args().dry_run))
@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from fastapi import Request
-from sqlalchemy.orm import Session
-from database import get_db
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db, get_read_db
 from crud import (
-    create_module, get_modules, get_module, update_module, delete_module, get_course_modules,
+    create_module, get_modules, get_module, update_module, delete_module, get_course_modules, get_course_outline_json,
     create_lesson, get_lessons_by_module, get_lesson, update_lesson, delete_lesson, reorder_lessons,
     reorder_modules
 )
 from schemas import ( ModuleCreate, LessonCreate, LessonUpdate, LessonResponse,
-    LessonReorderRequest, ModuleReorderRequest)
-from typing import List
+    LessonReorderRequest, ModuleReorderRequest, CourseOutline, LessonPatch, LessonPatchResult, LessonBlockPage)
+from fields import pick, sparse_fields, sparse_response
+from lesson_blocks import StaleCursor, get_block_page
+from lesson_patch import PatchConflict, PatchError, patch_lesson
+from models.lessons import Lesson
+from models.modules import Module
+from typing import List, Optional
 import shutil
 import os
 import uuid
@@ -22,44 +27,64 @@ router = APIRouter()
 module_router = APIRouter(prefix="/modules", tags=["Modules"])
 
 @module_router.post("/", summary="Create module")
-def create_module_route(data: ModuleCreate, db: Session = Depends(get_db)):
-    return create_module(db, data)
+async def create_module_route(data: ModuleCreate, db: AsyncSession = Depends(get_db)):
+    return await create_module(db, data)
+
+# Read routes take ?fields=a,b (see fields.py): only those columns are
+# loaded and returned
+ModuleFields = Depends(sparse_fields(Module))
+LessonFields = Depends(sparse_fields(Lesson))
 
 @module_router.get("/", summary="Get all modules")
-def get_all_modules_route(db: Session = Depends(get_db)):
-    return get_modules(db)
+async def get_all_modules_route(fields: Optional[List[str]] = ModuleFields, db: AsyncSession = Depends(get_db)):
+    modules = await get_modules(db, fields=fields)
+    if fields:
+        return sparse_response([pick(m, fields) for m in modules])
+    return modules
 
 @module_router.get("/{module_id}", summary="Get module by ID")
-def get_module_route(module_id: str, db: Session = Depends(get_db)):
-    module = get_module(db, module_id)
+async def get_module_route(module_id: str, fields: Optional[List[str]] = ModuleFields,
+                           db: AsyncSession = Depends(get_db)):
+    module = await get_module(db, module_id, fields=fields)
     if not module:
         raise HTTPException(404, "Module not found")
+    if fields:
+        return sparse_response(pick(module, fields))
     return module
 
 @module_router.get("/course/{course_id}")
-def query_course_modules(course_id: str, db: Session = Depends(get_db)):
-    modules = get_course_modules(course_id=course_id, db=db)
+async def query_course_modules(course_id: str, fields: Optional[List[str]] = ModuleFields,
+                               db: AsyncSession = Depends(get_db)):
+    modules = await get_course_modules(course_id=course_id, db=db, fields=fields)
     if not modules:
         raise HTTPException(404, "No Module found")
+    if fields:
+        return sparse_response([pick(m, fields) for m in modules])
     return modules
 
+@module_router.get("/course/{course_id}/outline", response_model=CourseOutline,
+                   summary="Modules and lesson headers of a course (cached)")
+async def course_outline_route(course_id: str, db: AsyncSession = Depends(get_read_db)):
+    # cached bytes are already the CourseOutline JSON; skip re-validation
+    return Response(content=await get_course_outline_json(db, course_id), media_type="application/json")
+
 @module_router.put("/update/{module_id}", summary="Update module")
-def update_module_route(module_id: str, data: ModuleCreate, db: Session = Depends(get_db)):
-    module = update_module(db, module_id, data)
+async def update_module_route(module_id: str, data: ModuleCreate, db: AsyncSession = Depends(get_db)):
+    module = await update_module(db, module_id, data)
     if not module:
         raise HTTPException(404, "Module not found")
     return module
 
 @module_router.delete("/{module_id}", summary="Delete module")
-def delete_module_route(module_id: str, db: Session = Depends(get_db)):
-    success = delete_module(db, module_id)
+async def delete_module_route(module_id: str, db: AsyncSession = Depends(get_db)):
+    success = await delete_module(db, module_id)
     if not success:
         raise HTTPException(404, "Module not found")
     return {"message": "Module deleted"}
 
 @module_router.put("/reorder", summary="Reorder modules in bulk")
-def reorder_modules_route(data: ModuleReorderRequest, db: Session = Depends(get_db)):
-    success = reorder_modules(db, data.modules)
+async def reorder_modules_route(data: ModuleReorderRequest, db: AsyncSession = Depends(get_db)):
+    success = await reorder_modules(db, data.modules)
     if not success:
         raise HTTPException(status_code=400, detail="Failed to reorder modules")
     return {"message": "Modules reordered successfully"}
@@ -69,40 +94,75 @@ def reorder_modules_route(data: ModuleReorderRequest, db: Session = Depends(get_
 # ---------------------
 
 @module_router.post("/{module_id}/lessons", response_model=LessonResponse)
-def create_lesson_route(data: LessonCreate, module_id: str, db: Session = Depends(get_db)):
-    return create_lesson(db, module_id, data)
+async def create_lesson_route(data: LessonCreate, module_id: str, db: AsyncSession = Depends(get_db)):
+    return await create_lesson(db, module_id, data)
 
 @module_router.get("/lessons/{module_id}/lessons", response_model=List[LessonResponse])
-def get_lessons_by_module_route(module_id: str, db: Session = Depends(get_db)):
-    return get_lessons_by_module(db, module_id)
+async def get_lessons_by_module_route(module_id: str, fields: Optional[List[str]] = LessonFields,
+                                      db: AsyncSession = Depends(get_db)):
+    lessons = await get_lessons_by_module(db, module_id, fields=fields)
+    if fields:
+        return sparse_response([pick(lesson, fields) for lesson in lessons])
+    return lessons
 
 @module_router.get("/lessons/{lesson_id}", response_model=LessonResponse)
-def get_one_lesson_route(lesson_id: str, request: Request, db: Session = Depends(get_db)):
-    base_url = str(request.base_url).rstrip("/")
-    lesson = get_lesson(db, lesson_id, base_url=base_url)
+async def get_one_lesson_route(lesson_id: str, fields: Optional[List[str]] = LessonFields,
+                               db: AsyncSession = Depends(get_db)):
+    lesson = await get_lesson(db, lesson_id, fields=fields)
     if not lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
 
+    if fields:
+        return sparse_response(lesson)
     return lesson
 
 
+@module_router.get("/lessons/{lesson_id}/blocks", response_model=LessonBlockPage,
+                   summary="Page through a lesson's content blocks")
+async def get_lesson_blocks_route(lesson_id: str, cursor: Optional[str] = None,
+                                  limit: int = Query(20, ge=1, le=200), db: AsyncSession = Depends(get_read_db)):
+    # pass next_cursor back as ?cursor= until it is null
+    try:
+        page = await get_block_page(db, lesson_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    except StaleCursor:
+        raise HTTPException(409, "Lesson changed since the first page; start again without a cursor")
+    if page is None:
+        raise HTTPException(404, "Lesson not found")
+    return page
+
 @module_router.put("/lessons/update/{lesson_id}", response_model=LessonResponse)
-def update_lesson_route(lesson_id: str, data: LessonUpdate, db: Session = Depends(get_db)):
-    lesson = update_lesson(db, lesson_id, data)
+async def update_lesson_route(lesson_id: str, data: LessonUpdate, db: AsyncSession = Depends(get_db)):
+    lesson = await update_lesson(db, lesson_id, data)
     if not lesson:
         raise HTTPException(404, "Lesson not found")
     return lesson
 
+@module_router.patch("/lessons/{lesson_id}", response_model=LessonPatchResult,
+                     summary="Edit contentBlocks / quizQuestions with JSON-patch operations")
+async def patch_lesson_route(lesson_id: str, data: LessonPatch, db: AsyncSession = Depends(get_db)):
+    try:
+        updated_at = await patch_lesson(db, lesson_id, data.updated_at, data.operations)
+    except PatchConflict as e:
+        # 409 with the current version; reload the lesson and reapply the edit
+        raise HTTPException(409, {"message": str(e), "updated_at": e.current.isoformat() if e.current else None})
+    except PatchError as e:
+        raise HTTPException(422, str(e))
+    if updated_at is None:
+        raise HTTPException(404, "Lesson not found")
+    return LessonPatchResult(id=lesson_id, updated_at=updated_at)
+
 @module_router.delete("/lessons/delete/{lesson_id}")
-def delete_lesson_route(lesson_id: str, db: Session = Depends(get_db)):
-    success = delete_lesson(db, lesson_id)
+async def delete_lesson_route(lesson_id: str, db: AsyncSession = Depends(get_db)):
+    success = await delete_lesson(db, lesson_id)
     if not success:
         raise HTTPException(404, "Lesson not found")
     return {"message": "Lesson deleted"}
 
 @module_router.put("/{module_id}/lessons/reorder")
-def reorder_lessons_route(module_id: str, data: LessonReorderRequest, db: Session = Depends(get_db)):
-    success = reorder_lessons(db, module_id, data.lessons)
+async def reorder_lessons_route(module_id: str, data: LessonReorderRequest, db: AsyncSession = Depends(get_db)):
+    success = await reorder_lessons(db, module_id, data.lessons)
     if not success:
         raise HTTPException(status_code=400, detail="Failed to reorder lessons")
     return {"message": "Lessons reordered successfully"}
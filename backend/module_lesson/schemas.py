@@ -1,6 +1,6 @@
 # schemas/module.py
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, List, Literal, Optional
 from datetime import datetime
 
 # ----------------------------
@@ -128,4 +128,61 @@ class LessonResponse(LessonBase):
     updated_at: Optional[datetime]
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+# -------------------------
+# Course Outline (learner sidebar)
+# -------------------------
+
+class LessonHeader(BaseModel):
+    id: str
+    title: str
+    order: Optional[int] = None
+    estimatedDuration: Optional[str] = None
+    difficulty: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class OutlineModule(BaseModel):
+    id: str
+    title: str
+    description: Optional[str] = None
+    order: Optional[int] = None
+    visibility: Optional[str] = None
+    lessons: List[LessonHeader] = []
+
+    class Config:
+        from_attributes = True
+
+class CourseOutline(BaseModel):
+    course_id: str
+    modules: List[OutlineModule]
+
+# -------------------------
+# Lesson Patch (see lesson_patch.py)
+# -------------------------
+
+class PatchOperation(BaseModel):
+    op: Literal["add", "remove", "replace"]
+    path: str  # JSON pointer, e.g. /contentBlocks/3/content
+    value: Any = None
+
+class LessonPatch(BaseModel):
+    updated_at: datetime  # the version the edits were made against
+    operations: List[PatchOperation]
+
+class LessonPatchResult(BaseModel):
+    id: str
+    updated_at: datetime
+
+# -------------------------
+# Lesson Blocks page (see lesson_blocks.py)
+# -------------------------
+
+class LessonBlockPage(BaseModel):
+    lesson_id: str
+    updated_at: Optional[datetime]
+    total: int  # blocks in the whole lesson
+    start: int  # index of blocks[0]
+    blocks: List[ContentBlock]
+    next_cursor: Optional[str] = None
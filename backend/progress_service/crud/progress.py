@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import (
     student_lesson_progress,
     student_course_progress,
@@ -11,25 +12,25 @@ from models import (
 # LESSON PROGRESS
 # --------------------------------
 
-def get_lesson_progress(
-    db: Session,
+async def get_lesson_progress(
+    db: AsyncSession,
     student_id: str,
     lesson_id: str
 ):
-    return db.query(student_lesson_progress.StudentLessonProgress).filter_by(
+    return await db.scalar(select(student_lesson_progress.StudentLessonProgress).filter_by(
         student_id=student_id,
         lesson_id=lesson_id
-    ).first()
+    ))
 
 
-def start_lesson(
-    db: Session,
+async def start_lesson(
+    db: AsyncSession,
     student_id: str,
     course_id: str,
     module_id: str,
     lesson_id: str
 ):
-    progress = get_lesson_progress(db, student_id, lesson_id)
+    progress = await get_lesson_progress(db, student_id, lesson_id)
 
     if progress:
         return progress
@@ -44,13 +45,13 @@ def start_lesson(
     )
 
     db.add(progress)
-    db.commit()
-    db.refresh(progress)
+    await db.commit()
+    await db.refresh(progress)
     return progress
 
 
-def complete_lesson(
-    db: Session,
+async def complete_lesson(
+    db: AsyncSession,
     student_id: str,
     course_id: str,
     module_id: str,
@@ -58,10 +59,10 @@ def complete_lesson(
     quiz_score: int | None,
     time_spent_seconds: int | None
 ):
-    progress = get_lesson_progress(db, student_id, lesson_id)
+    progress = await get_lesson_progress(db, student_id, lesson_id)
 
     if not progress:
-        progress = start_lesson(
+        progress = await start_lesson(
             db, student_id, course_id, module_id, lesson_id
         )
 
@@ -74,22 +75,22 @@ def complete_lesson(
     progress.is_completed = True
     progress.completed_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(progress)
+    await db.commit()
+    await db.refresh(progress)
     return progress
 
 
-def reset_lesson_progress(
-    db: Session,
+async def reset_lesson_progress(
+    db: AsyncSession,
     student_id: str,
     lesson_id: str
 ):
-    progress = get_lesson_progress(db, student_id, lesson_id)
+    progress = await get_lesson_progress(db, student_id, lesson_id)
     if not progress:
         return None
 
-    db.delete(progress)
-    db.commit()
+    await db.delete(progress)
+    await db.commit()
     return True
 
 
@@ -97,27 +98,27 @@ def reset_lesson_progress(
 # MODULE PROGRESS
 # --------------------------------
 
-def get_module_progress(
-    db: Session,
+async def get_module_progress(
+    db: AsyncSession,
     student_id: str,
     module_id: str
 ):
-    return db.query(student_module_progress.StudentModuleProgress).filter_by(
+    return await db.scalar(select(student_module_progress.StudentModuleProgress).filter_by(
         student_id=student_id,
         module_id=module_id
-    ).first()
+    ))
 
 
 # --------------------------------
 # COURSE PROGRESS
 # --------------------------------
 
-def get_course_progress(
-    db: Session,
+async def get_course_progress(
+    db: AsyncSession,
     student_id: str,
     course_id: str
 ):
-    return db.query(student_course_progress.StudentCourseProgress).filter_by(
+    return await db.scalar(select(student_course_progress.StudentCourseProgress).filter_by(
         student_id=student_id,
         course_id=course_id
-    ).first()
+    ))
@@ -1,5 +1,6 @@
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import (
     student_course_progress,
     student_lesson_progress,
@@ -7,25 +8,25 @@ from models import (
 )
 
 
-def recalculate_module_progress(
-    db: Session,
+async def recalculate_module_progress(
+    db: AsyncSession,
     student_id: str,
     course_id: str,
     module_id: str,
     total_lessons: int
 ):
-    completed = db.query(student_lesson_progress.StudentLessonProgress).filter(
+    completed = await db.scalar(select(func.count()).select_from(student_lesson_progress.StudentLessonProgress).where(
         student_lesson_progress.StudentLessonProgress.student_id == student_id,
         student_lesson_progress.StudentLessonProgress.module_id == module_id,
         student_lesson_progress.StudentLessonProgress.is_completed == True
-    ).count()
+    ))
 
     progress = int((completed / total_lessons) * 100) if total_lessons else 0
 
-    module_progress = db.query(student_module_progress.StudentModuleProgress).filter_by(
+    module_progress = await db.scalar(select(student_module_progress.StudentModuleProgress).filter_by(
         student_id=student_id,
         module_id=module_id
-    ).first()
+    ))
 
     if not module_progress:
         module_progress = student_module_progress.StudentModuleProgress(
@@ -44,34 +45,34 @@ def recalculate_module_progress(
     if module_progress.is_completed:
         module_progress.completed_at = datetime.utcnow()
 
-    db.commit()
+    await db.commit()
 
 
-def recalculate_course_progress(
-    db: Session,
+async def recalculate_course_progress(
+    db: AsyncSession,
     student_id: str,
     course_id: str,
     total_modules: int,
     total_lessons: int
 ):
-    completed_modules = db.query(student_module_progress.StudentModuleProgress).filter(
+    completed_modules = await db.scalar(select(func.count()).select_from(student_module_progress.StudentModuleProgress).where(
         student_module_progress.StudentModuleProgress.student_id == student_id,
         student_module_progress.StudentModuleProgress.course_id == course_id,
         student_module_progress.StudentModuleProgress.is_completed == True
-    ).count()
+    ))
 
-    completed_lessons = db.query(student_lesson_progress.StudentLessonProgress).filter(
+    completed_lessons = await db.scalar(select(func.count()).select_from(student_lesson_progress.StudentLessonProgress).where(
         student_lesson_progress.StudentLessonProgress.student_id == student_id,
         student_lesson_progress.StudentLessonProgress.course_id == course_id,
         student_lesson_progress.StudentLessonProgress.is_completed == True
-    ).count()
+    ))
 
     progress = int((completed_lessons / total_lessons) * 100) if total_lessons else 0
 
-    course_progress = db.query(student_course_progress.StudentCourseProgress).filter_by(
+    course_progress = await db.scalar(select(student_course_progress.StudentCourseProgress).filter_by(
         student_id=student_id,
         course_id=course_id
-    ).first()
+    ))
 
     if not course_progress:
         course_progress = student_course_progress.StudentCourseProgress(
@@ -92,4 +93,4 @@ def recalculate_course_progress(
     if course_progress.is_completed:
         course_progress.completed_at = datetime.utcnow()
 
-    db.commit()
+    await db.commit()
@@ -0,0 +1,149 @@
+"""
+Engine factory shared by every service.
+
+Each service used to build a bare create_engine("sqlite:///...") with the
+default rollback journal, so a single writer blocked every reader. make_engine
+switches SQLite to WAL (readers and one writer proceed concurrently), relaxes
+fsync to synchronous=NORMAL (safe under WAL), waits on locks instead of
+failing immediately, and enables mmap and a larger page cache. Pool sizes come
+from APP_ENV and can be overridden per deployment.
+
+make_read_engine optionally adds a second, query-only pool for GET routes so
+that read bursts cannot use up the connections writers need. It is off unless
+DB_READ_POOL=1; when off it returns the writer engine.
+
+make_async_engine / make_async_read_engine are the AsyncSession (aiosqlite)
+counterparts used by the async route handlers; they share the same pragmas
+and pool settings.
+
+create_missing_indexes adds indexes declared on models to databases whose
+tables already exist (create_all only indexes tables it creates itself).
+"""
+
+import os
+from typing import Iterable
+
+from sqlalchemy import MetaData, create_engine, event, inspect
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+APP_ENV = os.getenv("APP_ENV", "development")
+
+# (pool_size, max_overflow) per environment
+POOL_SIZES = {
+    "development": (5, 10),
+    "test": (2, 0),
+    "production": (20, 30),
+}
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", POOL_SIZES.get(APP_ENV, POOL_SIZES["development"])[0]))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", POOL_SIZES.get(APP_ENV, POOL_SIZES["development"])[1]))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_READ_POOL = os.getenv("DB_READ_POOL", "0") == "1"
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", DB_POOL_SIZE))
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KIB = int(os.getenv("SQLITE_CACHE_SIZE_KIB", 64 * 1024))
+
+
+def _is_sqlite_file(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def _install_sqlite_pragmas(engine: Engine, read_only: bool) -> None:
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        if not read_only:
+            # journal_mode is persistent in the file; only writers may set it
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def make_engine(database_url: str, *, read_only: bool = False, pool_size: int = DB_POOL_SIZE, **kwargs) -> Engine:
+    """Create an engine with the shared SQLite pragmas and pool settings"""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        kwargs.setdefault("connect_args", {"check_same_thread": False})
+        if not _is_sqlite_file(url):
+            # in-memory databases live in a single connection; no pool tuning
+            return create_engine(database_url, **kwargs)
+
+    engine = create_engine(
+        database_url,
+        pool_size=pool_size,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=url.get_backend_name() != "sqlite",
+        **kwargs,
+    )
+    if url.get_backend_name() == "sqlite":
+        _install_sqlite_pragmas(engine, read_only)
+    return engine
+
+
+def make_read_engine(database_url: str, writer: Engine) -> Engine:
+    """Query-only engine for GET routes, or `writer` itself when DB_READ_POOL is off"""
+    if not DB_READ_POOL or not _is_sqlite_file(make_url(database_url)):
+        return writer
+    return make_engine(database_url, read_only=True, pool_size=DB_READ_POOL_SIZE)
+
+
+def _async_url(database_url: str):
+    url = make_url(database_url)
+    if url.drivername == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def make_async_engine(database_url: str, *, read_only: bool = False, pool_size: int = DB_POOL_SIZE, **kwargs) -> AsyncEngine:
+    """Async (aiosqlite) engine with the same pragmas and pool settings as make_engine"""
+    url = _async_url(database_url)
+    if url.get_backend_name() == "sqlite" and not _is_sqlite_file(url):
+        return create_async_engine(url, **kwargs)
+
+    engine = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=url.get_backend_name() != "sqlite",
+        **kwargs,
+    )
+    if url.get_backend_name() == "sqlite":
+        _install_sqlite_pragmas(engine.sync_engine, read_only)
+    return engine
+
+
+def make_async_read_engine(database_url: str, writer: AsyncEngine) -> AsyncEngine:
+    """Query-only async engine for GET routes, or `writer` itself when DB_READ_POOL is off"""
+    if not DB_READ_POOL or not _is_sqlite_file(make_url(database_url)):
+        return writer
+    return make_async_engine(database_url, read_only=True, pool_size=DB_READ_POOL_SIZE)
+
+
+def create_missing_indexes(metadata: MetaData, engine: Engine, skip: Iterable[str] = ()) -> None:
+    """CREATE INDEX for every index in `metadata` that the database lacks, except those named in `skip`"""
+    inspector = inspect(engine)
+    created = False
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name)} if inspector.has_table(table.name) else set()
+            for index in table.indexes:
+                if index.name not in existing and index.name not in skip:
+                    index.create(conn, checkfirst=True)
+                    created = True
+        if created and engine.dialect.name == "sqlite":
+            # refresh sqlite_stat1 so the planner can choose between the
+            # new indexes by selectivity
+            conn.exec_driver_sql("ANALYZE")
@@ -0,0 +1,74 @@
+"""
+Keyset (cursor) pagination helpers shared by the services.
+
+offset(skip) makes SQLite walk and discard every skipped row, so deep pages
+get linearly slower. A keyset page instead continues from the last row of
+the previous page:
+
+    WHERE (created_at, id) > (:last_created_at, :last_id)
+    ORDER BY created_at, id LIMIT :limit
+
+With an index on the sort key, each page costs the same no matter how deep
+it is. The position is handed to the client as an opaque cursor (URL-safe
+base64 of the sort-key values of the last row). Clients send it back
+unchanged and must not parse it.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import String, literal, tuple_
+
+
+def _dump(value: Any):
+    if isinstance(value, datetime):
+        # SQLite stores server_default=func.now() as "YYYY-MM-DD HH:MM:SS"
+        # text and compares it as text, so the cursor keeps that exact form
+        return {"dt": value.strftime("%Y-%m-%d %H:%M:%S.%f" if value.microsecond else "%Y-%m-%d %H:%M:%S")}
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_dump(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """Inverse of encode_cursor; raises ValueError on anything malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _bind(value: Any):
+    if isinstance(value, dict) and "dt" in value:
+        return literal(value["dt"], String)
+    return literal(value)
+
+
+def keyset(query, order_by: Sequence, cursor: Optional[str] = None, skip: int = 0, limit: int = 50):
+    """Order `query` by `order_by` and page it by `cursor`, falling back to skip/limit"""
+    query = query.order_by(*order_by)
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(order_by):
+            raise ValueError("Invalid cursor")
+        query = query.where(tuple_(*order_by) > tuple_(*(_bind(v) for v in values)))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def next_cursor(items: Sequence, limit: int, attrs: Sequence[str]) -> Optional[str]:
+    """Cursor for the page after `items`, or None when this was the last page"""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, attr) for attr in attrs])
@@ -0,0 +1,186 @@
+"""
+In-memory token revocation filter shared by every service.
+
+Logging out revokes a refresh-token family in the auth service. Every token
+in that family (access and refresh) carries the family id in its `fam`
+claim, so a service only has to ask "is this family revoked?" to reject it.
+
+RevocationFilter answers that without I/O: a Bloom filter in front of an
+exact set. Almost every token belongs to a live family, and those are turned
+away by a few bit probes; the exact set is only consulted on a Bloom hit, so
+false positives never reject a valid token. Entries are kept until the
+family's refresh tokens would have expired anyway.
+
+Services other than the auth service keep their filter current with
+RevocationSync, a daemon thread that polls GET /auth/revocations every
+REVOCATION_SYNC_SECONDS. Nothing on the request path touches the network or
+a database. The feed is for services only: every process shares the
+SERVICE_TOKEN secret and the poller sends it in the X-Service-Token header.
+Without it the auth service refuses the feed and the poller does not start.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+AUTH_SERVICE_URL = os.getenv("AUTH_SERVICE_URL", "http://localhost:8000")
+REVOCATION_SYNC_SECONDS = int(os.getenv("REVOCATION_SYNC_SECONDS", 30))
+REVOCATION_FILTER_CAPACITY = int(os.getenv("REVOCATION_FILTER_CAPACITY", 100000))
+REVOCATION_FILTER_ERROR_RATE = 0.001
+
+# shared secret for service-to-service calls; unset disables the feed
+SERVICE_TOKEN = os.getenv("SERVICE_TOKEN")
+SERVICE_TOKEN_HEADER = "X-Service-Token"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)"""
+
+    def __init__(self, capacity: int, error_rate: float = REVOCATION_FILTER_ERROR_RATE):
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationFilter:
+    """Set of revoked token families, each remembered until `expires_at` (epoch seconds)"""
+
+    def __init__(self, capacity: int = REVOCATION_FILTER_CAPACITY):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._expires: dict = {}
+        self._bloom = BloomFilter(capacity)
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def add(self, family_id: str, expires_at: float) -> None:
+        with self._lock:
+            self._expires[family_id] = expires_at
+            self._bloom.add(family_id)
+            if len(self._expires) > self.capacity:
+                self._rebuild(time.time())
+
+    def add_many(self, entries: Iterable[tuple]) -> None:
+        for family_id, expires_at in entries:
+            self.add(family_id, expires_at)
+
+    def is_revoked(self, family_id: Optional[str]) -> bool:
+        if not family_id or family_id not in self._bloom:
+            return False
+        expires_at = self._expires.get(family_id)
+        return expires_at is not None and expires_at > time.time()
+
+    def is_token_revoked(self, claims: dict) -> bool:
+        return self.is_revoked(claims.get("fam"))
+
+    def prune(self) -> None:
+        """Forget families whose tokens have all expired"""
+        now = time.time()
+        with self._lock:
+            if any(exp <= now for exp in self._expires.values()):
+                self._rebuild(now)
+
+    def _rebuild(self, now: float) -> None:
+        self._expires = {fam: exp for fam, exp in self._expires.items() if exp > now}
+        # grow rather than let the false-positive rate climb
+        self.capacity = max(self.capacity, len(self._expires) * 2)
+        self._bloom = BloomFilter(self.capacity)
+        for family_id in self._expires:
+            self._bloom.add(family_id)
+
+
+# One filter per process; the auth service writes to it directly on logout,
+# every other service fills it through RevocationSync.
+revocations = RevocationFilter()
+
+
+class RevocationSync(threading.Thread):
+    """Background poller that copies new revocations from the auth service"""
+
+    def __init__(
+        self,
+        target: RevocationFilter = revocations,
+        base_url: str = AUTH_SERVICE_URL,
+        interval: int = REVOCATION_SYNC_SECONDS,
+        token: Optional[str] = SERVICE_TOKEN,
+    ):
+        super().__init__(name="revocation-sync", daemon=True)
+        self.target = target
+        self.base_url = base_url.rstrip("/")
+        self.interval = interval
+        self.token = token
+        self.since: Optional[float] = None
+        self._stopped = threading.Event()
+
+    def sync_once(self) -> int:
+        query = "" if self.since is None else "?" + urllib.parse.urlencode({"since": self.since})
+        request = urllib.request.Request(
+            f"{self.base_url}/auth/revocations{query}", headers={SERVICE_TOKEN_HEADER: self.token or ""}
+        )
+        with urllib.request.urlopen(request, timeout=5) as resp:
+            body = json.load(resp)
+        self.target.add_many((item["family_id"], item["expires_at"]) for item in body["revoked"])
+        # overlap one interval so revocations committed during the previous
+        # poll are not missed; re-adding a family is harmless
+        self.since = body["server_time"] - self.interval
+        return len(body["revoked"])
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.sync_once()
+                self.target.prune()
+            except Exception as e:  # the auth service may be down; keep the last known state
+                logger.warning("revocation sync failed: %s", e)
+            self._stopped.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+_sync: Optional[RevocationSync] = None
+
+
+def start_revocation_sync() -> Optional[RevocationSync]:
+    """Start the per-process sync thread (idempotent); None without SERVICE_TOKEN"""
+    global _sync
+    if not SERVICE_TOKEN:
+        logger.error("SERVICE_TOKEN is not set: sessions revoked in the auth service "
+                     "will not be rejected by this service")
+        return None
+    if _sync is None or not _sync.is_alive():
+        _sync = RevocationSync()
+        _sync.start()
+    return _sync
+
+
+def stop_revocation_sync() -> None:
+    global _sync
+    if _sync is not None:
+        _sync.stop()
+        _sync = None
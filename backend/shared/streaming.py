@@ -0,0 +1,66 @@
+"""
+Streaming JSON exports for unbounded listings.
+
+A plain list route loads every row, builds every response model and then
+serializes one large body, so memory grows with the table. stream_query
+pulls rows in chunks of STREAM_CHUNK_SIZE through a server-side cursor
+(yield_per) and writes each chunk to the client as soon as it is
+serialized. Rows are fetched as plain Core rows rather than ORM objects,
+so nothing accumulates in a session identity map, and memory stays flat
+however large the table is.
+
+Two wire formats:
+  ndjson  one JSON object per line (application/x-ndjson)
+  json    a single JSON array, written incrementally (application/json)
+
+The generator opens its own session, so the stream does not depend on
+when a route's yield dependencies are torn down.
+"""
+
+import os
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 500))
+STREAM_FORMATS = ("ndjson", "json")
+
+
+def stream_format(request: Request, format: Optional[str]) -> Optional[str]:
+    """'ndjson' / 'json' when the client asked for a stream, else None"""
+    if format in STREAM_FORMATS:
+        return format
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return "ndjson"
+    return None
+
+
+async def _chunks(session_factory, query, serialize: Callable, fmt: str, chunk_size: int) -> AsyncIterator[bytes]:
+    async with session_factory() as db:
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        if fmt == "json":
+            yield b"["
+        first = True
+        async for rows in result.partitions():
+            parts = [serialize(row) for row in rows]
+            if fmt == "ndjson":
+                yield b"\n".join(parts) + b"\n"
+            else:
+                yield (b"" if first else b",") + b",".join(parts)
+            first = False
+        if fmt == "json":
+            yield b"]"
+
+
+def stream_query(
+    session_factory,
+    query,
+    serialize: Callable[[object], bytes],
+    fmt: str = "ndjson",
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> StreamingResponse:
+    """StreamingResponse of `query`'s rows, each turned into JSON bytes by `serialize`"""
+    media_type = NDJSON_MEDIA_TYPE if fmt == "ndjson" else "application/json"
+    return StreamingResponse(_chunks(session_factory, query, serialize, fmt, chunk_size), media_type=media_type)
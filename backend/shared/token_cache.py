@@ -0,0 +1,116 @@
+"""
+Verified-JWT cache shared by every service.
+
+A student session sends the same bearer token on every request, and each
+service used to re-run the HS256 signature check and rebuild its TokenData
+for it. VerifiedTokenCache keeps a bounded LRU of tokens that already passed
+verification, keyed by a digest of the token (raw tokens are never stored),
+and drops each entry at the token's own `exp` so an expired token is never
+served from the cache.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from jose import JWTError, jwt
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+# Upper bound for tokens that carry no `exp` claim
+TOKEN_CACHE_MAX_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_MAX_TTL_SECONDS", 300))
+
+
+def token_digest(token: str) -> bytes:
+    """Cache key for a raw bearer token"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified token claims.
+
+    `build` turns the verified claims into whatever the service hands to its
+    routes (a TokenData model, a plain dict, ...); the built value is what
+    gets cached, so a hit skips both jwt.decode and model construction.
+    Cached values are shared between requests and must be treated as
+    read-only.
+
+    Example:
+        cache = VerifiedTokenCache(SECRET_KEY, "HS256", build=lambda c: TokenData(**c))
+        td = cache.decode(token)   # raises JWTError like jwt.decode
+    """
+
+    def __init__(
+        self,
+        secret_key: str,
+        algorithm: str,
+        build: Optional[Callable[[dict], Any]] = None,
+        maxsize: int = TOKEN_CACHE_SIZE,
+    ):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.build = build or (lambda claims: claims)
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, tuple[float, dict, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, token: str) -> Optional[tuple[dict, Any]]:
+        """Return (claims, value) for a cached, unexpired token, else None"""
+        key = token_digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims, value = entry
+            if now >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims, value
+
+    def decode(self, token: str) -> Any:
+        """Verify `token` (or reuse an earlier verification) and return the built value"""
+        return self.decode_with_claims(token)[1]
+
+    def decode_with_claims(self, token: str) -> tuple[dict, Any]:
+        """Like decode(), but also return the verified claims"""
+        cached = self.lookup(token)
+        if cached is not None:
+            return cached
+
+        claims = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        value = self.build(claims)
+        now = time.time()
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            expires_at = now + TOKEN_CACHE_MAX_TTL_SECONDS
+
+        key = token_digest(token)
+        with self._lock:
+            self._entries[key] = (float(expires_at), claims, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return claims, value
+
+    def discard(self, token: str) -> None:
+        """Forget a single token (e.g. after it has been revoked)"""
+        with self._lock:
+            self._entries.pop(token_digest(token), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+